@@ -69,13 +69,22 @@ async def wait_for_server(timeout: float = 5) -> "LaucherServer":
 
 
 @_logger.call
-def run_server(port: int, loop: asyncio.AbstractEventLoop) -> None:
+def run_server(
+    port: int,
+    loop: asyncio.AbstractEventLoop,
+    event_queue_size: int = 10000,
+    event_overflow_policy: str = "block",
+) -> None:
     from ..jsonrpc2.server import TcpParams
-    from .server import LaucherServer
+    from .server import EventOverflowPolicy, LaucherServer
 
     asyncio.set_event_loop(loop)
 
-    with LaucherServer(tcp_params=TcpParams("127.0.0.1", port)) as server:
+    with LaucherServer(
+        tcp_params=TcpParams("127.0.0.1", port),
+        event_queue_size=event_queue_size,
+        event_overflow_policy=EventOverflowPolicy(event_overflow_policy),
+    ) as server:
         set_server(cast(LaucherServer, server))
         try:
             server.run()
@@ -105,13 +114,22 @@ async def run_robot(
     output_log: bool = False,
     group_output: bool = False,
     stop_on_entry: bool = False,
+    keyword_events: str = "all",
+    keyword_events_sample_rate: int = 100,
+    log_events_level: str = "TRACE",
+    event_batch_interval: float = 0,
+    event_queue_size: int = 10000,
+    event_overflow_policy: str = "block",
+    processes: int = 1,
+    split_by: str = "suite",
+    profile_dir: Optional[str] = None,
 ) -> Any:
     import robot
 
     from ..utils.debugpy import enable_debugpy, wait_for_debugpy_connected
     from ..utils.net import check_free_port
     from .dap_types import Event
-    from .debugger import Debugger
+    from .debugger import Debugger, KeywordEvents
 
     @_logger.call
     async def start_debugpy_async() -> None:
@@ -134,7 +152,11 @@ async def run_robot(
 
     loop = asyncio.new_event_loop()
 
-    thread = threading.Thread(name="RobotCode Debugger", target=run_server, args=(port, loop))
+    thread = threading.Thread(
+        name="RobotCode Debugger",
+        target=run_server,
+        args=(port, loop, event_queue_size, event_overflow_policy),
+    )
     thread.daemon = True
     thread.start()
 
@@ -169,6 +191,7 @@ async def run_robot(
 
         await start_debugpy_async()
 
+        robot_args = args
         args = [
             "--listener",
             f"robotcode.debugger.listeners.ListenerV2:no_debug={repr(no_debug)}",
@@ -182,10 +205,46 @@ async def run_robot(
         Debugger.instance().output_log = output_log
         Debugger.instance().group_output = group_output
         Debugger.instance().no_debug = no_debug
+        Debugger.instance().keyword_events = KeywordEvents(keyword_events)
+        Debugger.instance().keyword_events_sample_rate = keyword_events_sample_rate
+        Debugger.instance().log_events_level = log_events_level
+        Debugger.instance().event_batch_interval = event_batch_interval
+        Debugger.instance().profile_dir = profile_dir
         Debugger.instance().set_main_thread(threading.current_thread())
         Debugger.instance().start()
 
-        exit_code = robot.run_cli(args, False)
+        if processes > 1 and no_debug:
+            from .parallel import ParallelRun
+
+            parallel_run = ParallelRun(
+                server.protocol,
+                robot_args,
+                processes,
+                cast(Any, split_by),
+                launcher_args=[
+                    *(["-om"] if output_messages else []),
+                    *(["-ol"] if output_log else []),
+                    *(["-og"] if group_output else []),
+                    *["--keyword-events", keyword_events],
+                    *["--keyword-events-sample-rate", str(keyword_events_sample_rate)],
+                    *["--log-events-level", log_events_level],
+                    *["--event-batch-interval", str(event_batch_interval)],
+                ],
+                connect_timeout=wait_for_client_timeout,
+                profile_dir=profile_dir,
+            )
+            Debugger.instance().worker_threads = parallel_run.threads
+
+            exit_code = await parallel_run.run()
+
+            Debugger.instance().robot_output_file = parallel_run.output_file
+            Debugger.instance().robot_log_file = parallel_run.log_file
+            Debugger.instance().robot_report_file = parallel_run.report_file
+        else:
+            if processes > 1:
+                _logger.warning("parallel execution is only supported without debugging, running sequentially")
+
+            exit_code = robot.run_cli(args, False)
 
         if server.protocol.connected:
             await asyncio.wrap_future(
@@ -308,6 +367,65 @@ def main() -> None:
         "-og", "--group-output", action="store_true", help="Fold messages/log from robotframework to client."
     )
     parser.add_argument("-soe", "--stop-on-entry", action="store_true", help="Stops on entry.")
+    parser.add_argument(
+        "--keyword-events",
+        default="all",
+        choices=["all", "sampled", "none"],
+        help="Which robotStarted/robotEnded events for keywords are sent to client.",
+    )
+    parser.add_argument(
+        "--keyword-events-sample-rate",
+        default=100,
+        type=int,
+        help="If keyword events are sampled, only the events of every N-th keyword are sent to client.",
+        metavar="N",
+    )
+    parser.add_argument(
+        "--log-events-level",
+        default="TRACE",
+        choices=["TRACE", "DEBUG", "INFO", "WARN", "ERROR", "NONE"],
+        help="Minimum level of log messages sent as robotLog events to client.",
+        metavar="LEVEL",
+    )
+    parser.add_argument(
+        "--event-batch-interval",
+        default=0,
+        type=float,
+        help="Collects robot events and sends them in bulk every SECONDS, only if debugging is disabled.",
+        metavar="SECONDS",
+    )
+    parser.add_argument(
+        "--event-queue-size",
+        default=10000,
+        type=int,
+        help="Maximum number of events waiting to be sent to the client.",
+        metavar="SIZE",
+    )
+    parser.add_argument(
+        "--event-overflow-policy",
+        default="block",
+        choices=["block", "drop-oldest", "coalesce-logs"],
+        help="What happens if the event queue is full.",
+    )
+    parser.add_argument(
+        "--processes",
+        default=1,
+        type=int,
+        help="Runs the tests in N parallel processes, only if debugging is disabled.",
+        metavar="N",
+    )
+    parser.add_argument(
+        "--split-by",
+        default="suite",
+        choices=["suite", "test"],
+        help="How the tests are distributed to the parallel processes.",
+    )
+    parser.add_argument(
+        "--profile",
+        default=None,
+        help="Records the execution times of keywords and writes flame graph data and a summary to DIR.",
+        metavar="DIR",
+    )
 
     parser.add_argument("--", help="RobotFramework arguments. (see robot --help)", dest="robot args", nargs="*")
 
@@ -390,6 +508,15 @@ def main() -> None:
             args.output_log,
             args.group_output,
             args.stop_on_entry,
+            args.keyword_events,
+            args.keyword_events_sample_rate,
+            args.log_events_level,
+            args.event_batch_interval,
+            args.event_queue_size,
+            args.event_overflow_policy,
+            args.processes,
+            args.split_by,
+            args.profile,
         )
     )
 
@@ -1,18 +1,25 @@
 from __future__ import annotations
 
+import io
 import itertools
 import re
+import reprlib
 import threading
+import token
+import tokenize
 import weakref
-from collections import deque
+from collections import OrderedDict, deque
 from enum import Enum
 from pathlib import Path
+from types import CodeType
 from typing import (
     Any,
     Deque,
     Dict,
+    Iterable,
     List,
     Literal,
+    Mapping,
     NamedTuple,
     Optional,
     Set,
@@ -74,6 +81,15 @@ class State(Enum):
     Paused = 2
 
 
+RUNNING_STATES = frozenset({State.Running, State.Stopped})
+
+
+class KeywordEvents(Enum):
+    ALL = "all"
+    SAMPLED = "sampled"
+    NONE = "none"
+
+
 class RequestedState(Enum):
     Nothing = 0
     Pause = 1
@@ -82,9 +98,93 @@ class RequestedState(Enum):
     StepOut = 4
 
 
+class BreakpointCondition:
+    _ROBOT_VARIABLE = re.compile(r"[$@&%]\{")
+    CODE_CACHE_SIZE = 32
+
+    def __init__(self, expression: str) -> None:
+        self.expression = expression
+        self._code: Optional[CodeType] = None
+        self._code_cache: OrderedDict[str, CodeType] = OrderedDict()
+        self._error: Optional[BaseException] = None
+
+        # expressions with robot variables like `${a} == 1` must be replaced at runtime,
+        # all other expressions (also with `$a` variables) can be compiled only once
+        if not self._ROBOT_VARIABLE.search(expression):
+            try:
+                self._code = self._compile(expression)
+            except BaseException as e:
+                self._error = e
+
+    @staticmethod
+    def _decorate_variables(expression: str) -> str:
+        variable_started = False
+        variable_found = False
+        tokens: List[Tuple[int, str]] = []
+
+        for toknum, tokval, _, _, _ in tokenize.generate_tokens(io.StringIO(expression).readline):
+            if variable_started:
+                if toknum == token.NAME:
+                    tokval = "RF_VAR_" + tokval
+                    variable_found = True
+                else:
+                    tokens.append((token.ERRORTOKEN, "$"))
+                variable_started = False
+            if toknum == token.ERRORTOKEN and tokval == "$":
+                variable_started = True
+            else:
+                tokens.append((toknum, tokval))
+
+        return str(tokenize.untokenize(tokens)).strip() if variable_found else expression
+
+    @classmethod
+    def _compile(cls, expression: str) -> CodeType:
+        if "$" in expression:
+            expression = cls._decorate_variables(expression)
+
+        code: CodeType = compile(expression.strip(), "<breakpoint condition>", "eval")
+        return code
+
+    def evaluate(self, variables: Any) -> bool:
+        from robot.variables.evaluation import EvaluationNamespace
+
+        if self._error is not None:
+            raise self._error
+
+        code = self._code
+        if code is None:
+            expression = variables.replace_string(self.expression)
+            # the replaced expression changes with the values of the variables, like a loop counter,
+            # so only the most recently used ones are kept
+            code = self._code_cache.get(expression, None)
+            if code is None:
+                code = self._code_cache[expression] = self._compile(expression)
+                if len(self._code_cache) > self.CODE_CACHE_SIZE:
+                    self._code_cache.popitem(last=False)
+            else:
+                self._code_cache.move_to_end(expression)
+
+        return bool(eval(code, {}, EvaluationNamespace(variables.store, {})))
+
+
+class CompiledBreakpoint:
+    def __init__(self, breakpoint: SourceBreakpoint) -> None:
+        self.breakpoint = breakpoint
+        self.condition = BreakpointCondition(breakpoint.condition) if breakpoint.condition is not None else None
+        self.hit_condition: Optional[int] = None
+        self.hit_condition_valid = True
+
+        if breakpoint.hit_condition is not None:
+            try:
+                self.hit_condition = int(breakpoint.hit_condition)
+            except ValueError:
+                self.hit_condition_valid = False
+
+
 class BreakpointsEntry(NamedTuple):
     breakpoints: Tuple[SourceBreakpoint, ...]
     lines: Tuple[int, ...]
+    by_line: Dict[int, Tuple[CompiledBreakpoint, ...]]
 
 
 class ExceptionBreakpointsEntry(NamedTuple):
@@ -130,6 +230,32 @@ class StackFrameEntry:
         return id(self._global_marker)
 
 
+class VariableRepr(reprlib.Repr):
+    def __init__(self) -> None:
+        super().__init__()
+        self.maxlevel = 3
+        self.maxdict = self.maxlist = self.maxtuple = self.maxset = self.maxfrozenset = self.maxdeque = 20
+        self.maxstring = self.maxother = 1000
+
+    def repr1(self, x: Any, level: int) -> str:
+        # robot uses subclasses like DotDict, reprlib only knows the exact builtin types
+        if isinstance(x, str) and type(x) is not str:
+            return self.repr_str(str(x), level)
+        if isinstance(x, Mapping) and type(x) is not dict:
+            return self.repr_dict(x, level)  # type: ignore
+        if isinstance(x, list) and type(x) is not list:
+            return self.repr_list(x, level)
+
+        return str(super().repr1(x, level))
+
+
+class ScopeKind(Enum):
+    LOCAL = "local"
+    TEST = "test"
+    SUITE = "suite"
+    GLOBAL = "global"
+
+
 class HitCountEntry(NamedTuple):
     source: str
     line: int
@@ -167,6 +293,7 @@ class Debugger:
 
     def __init__(self) -> None:
         self.breakpoints: Dict[str, BreakpointsEntry] = {}
+        self._resolved_sources: Dict[str, str] = {}
         self.exception_breakpoints: Set[ExceptionBreakpointsEntry] = set()
 
         self.main_thread: Optional[threading.Thread] = None
@@ -185,6 +312,18 @@ class Debugger:
         self.last_fail_message: Optional[str] = None
         self.stop_on_entry = False
         self.no_debug = False
+        self.keyword_events = KeywordEvents.ALL
+        self._variable_repr = VariableRepr()
+        self._variable_handles: Dict[int, Any] = {}
+        self._variable_handles_by_id: Dict[int, int] = {}
+        self._scope_items: Dict[int, List[Tuple[str, Any]]] = {}
+        self._frame_handles: Dict[int, StackFrameEntry] = {}
+        self._scope_handles: Dict[int, Tuple[StackFrameEntry, ScopeKind]] = {}
+        self.keyword_events_sample_rate = 100
+        self.log_events_level = "TRACE"
+        self.event_batch_interval = 0.0
+        self.worker_threads: Optional[List[Thread]] = None
+        self.profile_dir: Optional[str] = None
 
     @property
     def debug(self) -> bool:
@@ -214,9 +353,17 @@ class Debugger:
     def robot_output_file(self, value: Optional[str]) -> None:
         self._robot_output_file = value
 
+    def _clear_stop_state(self) -> None:
+        self._variable_handles.clear()
+        self._variable_handles_by_id.clear()
+        self._scope_items.clear()
+        self._frame_handles.clear()
+        self._scope_handles.clear()
+
     @_logger.call
     def start(self) -> None:
         with self.condition:
+            self._clear_stop_state()
             self.state = State.Running
             self.condition.notify_all()
 
@@ -241,6 +388,7 @@ class Debugger:
             raise RuntimeError("Invalid threadId")
 
         with self.condition:
+            self._clear_stop_state()
             self.state = State.Running
             self.condition.notify_all()
 
@@ -261,6 +409,7 @@ class Debugger:
             raise RuntimeError("Invalid threadId")
 
         with self.condition:
+            self._clear_stop_state()
             self.state = State.Running
 
             if self.stack_frames and self.stack_frames[0].type in ["TEST", "SUITE"]:
@@ -282,6 +431,7 @@ class Debugger:
             raise RuntimeError("Invalid threadId")
 
         with self.condition:
+            self._clear_stop_state()
             self.requested_state = RequestedState.StepIn
             self.state = State.Running
 
@@ -293,6 +443,7 @@ class Debugger:
             raise RuntimeError("Invalid threadId")
 
         with self.condition:
+            self._clear_stop_state()
             self.requested_state = RequestedState.StepOut
             self.state = State.Running
             self.stop_stack_len = len(self.stack_frames) - 1
@@ -327,8 +478,12 @@ class Debugger:
         if path in self.breakpoints and not breakpoints and not lines:
             self.breakpoints.pop(path)
         elif path:
+            by_line: Dict[int, Tuple[CompiledBreakpoint, ...]] = {}
+            for b in breakpoints or ():
+                by_line[b.line] = by_line.get(b.line, ()) + (CompiledBreakpoint(b),)
+
             self.breakpoints[path] = result = BreakpointsEntry(
-                tuple(breakpoints) if breakpoints else (), tuple(lines) if lines else ()
+                tuple(breakpoints) if breakpoints else (), tuple(lines) if lines else (), by_line
             )
             return [
                 Breakpoint(id=id(v), source=Source(path=path), verified=True, line=v.line) for v in result.breakpoints
@@ -338,14 +493,23 @@ class Debugger:
 
         return []
 
-    def process_start_state(self, source: str, line_no: int, type: str, status: str) -> None:
-        from robot.running.context import EXECUTION_CONTEXTS
-        from robot.variables.evaluation import evaluate_expression
+    def resolve_source(self, source: str) -> str:
+        result = self._resolved_sources.get(source, None)
+        if result is None:
+            result = self._resolved_sources[source] = str(Path(source).resolve())
+        return result
 
+    def process_start_state(self, source: str, line_no: int, type: str, status: str) -> None:
         if self.state == State.Stopped:
             return
 
-        elif self.requested_state == RequestedState.Pause:
+        # fast path: nothing is requested and no breakpoints are set
+        if self.requested_state == RequestedState.Nothing and not self.breakpoints:
+            return
+
+        from robot.running.context import EXECUTION_CONTEXTS
+
+        if self.requested_state == RequestedState.Pause:
             self.state = State.Paused
             self.send_event(
                 self,
@@ -396,33 +560,27 @@ class Debugger:
                 )
                 self.requested_state = RequestedState.Nothing
 
-        if source is not None:
-            source = str(Path(source).resolve())
-            if source in self.breakpoints:
-                breakpoints = [v for v in self.breakpoints[source].breakpoints if v.line == line_no]
+        if source is not None and self.breakpoints:
+            source = self.resolve_source(source)
+            breakpoints_entry = self.breakpoints.get(source, None)
+            if breakpoints_entry is not None:
+                breakpoints = breakpoints_entry.by_line.get(line_no, ())
                 if len(breakpoints) > 0:
-                    for point in breakpoints:
-                        if point.condition is not None:
+                    for compiled in breakpoints:
+                        point = compiled.breakpoint
+                        if compiled.condition is not None:
                             hit = False
                             try:
-                                vars = EXECUTION_CONTEXTS.current.variables.current
-                                hit = bool(evaluate_expression(vars.replace_string(point.condition), vars.store))
+                                hit = compiled.condition.evaluate(EXECUTION_CONTEXTS.current.variables.current)
                             except BaseException:
                                 hit = False
 
                             if not hit:
                                 return
                         if point.hit_condition is not None:
-                            hit = False
                             entry = HitCountEntry(source, line_no, type)
-                            if entry not in self.hit_counts:
-                                self.hit_counts[entry] = 0
-                            self.hit_counts[entry] += 1
-                            try:
-                                hit = self.hit_counts[entry] != int(point.hit_condition)
-                            except BaseException:
-                                hit = False
-                            if not hit:
+                            self.hit_counts[entry] = self.hit_counts.get(entry, 0) + 1
+                            if not compiled.hit_condition_valid or self.hit_counts[entry] == compiled.hit_condition:
                                 return
                         if point.log_message:
                             vars = EXECUTION_CONTEXTS.current.variables.current
@@ -450,7 +608,7 @@ class Debugger:
                                     body=StoppedEventBody(
                                         reason=StoppedReason.BREAKPOINT,
                                         thread_id=threading.current_thread().ident,
-                                        hit_breakpoint_ids=[id(v) for v in breakpoints],
+                                        hit_breakpoint_ids=[id(v.breakpoint) for v in breakpoints],
                                     )
                                 ),
                             )
@@ -476,10 +634,18 @@ class Debugger:
             )
             self.wait_for_running()
 
-    @_logger.call
     def wait_for_running(self) -> None:
+        # `state` is only set to `Paused` by the execution thread itself or together with a requested pause
+        # that is checked again at the next keyword, so reading it without the lock cannot miss a stop.
+        if self.state in RUNNING_STATES:
+            return
+
+        self._wait_for_running()
+
+    @_logger.call
+    def _wait_for_running(self) -> None:
         with self.condition:
-            self.condition.wait_for(lambda: self.state in [State.Running, State.Stopped])
+            self.condition.wait_for(lambda: self.state in RUNNING_STATES)
 
     def start_output_group(self, name: str, attributes: Dict[str, Any], type: Optional[str] = None) -> None:
         if self.group_output:
@@ -654,6 +820,9 @@ class Debugger:
         self.main_thread = thread
 
     def get_threads(self) -> List[Thread]:
+        if self.worker_threads is not None:
+            return list(self.worker_threads)
+
         main_thread = self.main_thread or threading.main_thread()
 
         return [Thread(id=main_thread.ident if main_thread.ident else 0, name=main_thread.name or "")]
@@ -668,16 +837,18 @@ class Debugger:
         start_frame = start_frame or 0
         levels = start_frame + 1 + (levels or len(self.stack_frames))
 
-        frames = [
-            StackFrame(
-                id=v.id,
-                name=v.name,
-                line=v.line,
-                column=v.column,
-                source=Source(path=v.source) if v.source is not None else None,
+        frames = []
+        for v in itertools.islice(self.stack_frames, start_frame, levels):
+            self._frame_handles[v.id] = v
+            frames.append(
+                StackFrame(
+                    id=v.id,
+                    name=v.name,
+                    line=v.line,
+                    column=v.column,
+                    source=Source(path=v.source) if v.source is not None else None,
+                )
             )
-            for v in itertools.islice(self.stack_frames, start_frame, levels)
-        ]
 
         return StackTraceResult(frames, len(frames))
 
@@ -717,10 +888,11 @@ class Debugger:
 
     def get_scopes(self, frame_id: int) -> List[Scope]:
         result: List[Scope] = []
-        entry = next((v for v in self.stack_frames if v.id == frame_id), None)
+        entry = self._frame_handles.get(frame_id, None)
         if entry is not None:
             context = entry.context()
             if context is not None:
+                self._scope_handles[entry.local_id()] = (entry, ScopeKind.LOCAL)
                 result.append(
                     Scope(
                         name="Local",
@@ -730,6 +902,7 @@ class Debugger:
                     )
                 )
                 if context.variables._test is not None and context.variables._test != context.variables.current:
+                    self._scope_handles[entry.test_id()] = (entry, ScopeKind.TEST)
                     result.append(
                         Scope(
                             name="Test",
@@ -739,6 +912,7 @@ class Debugger:
                         )
                     )
                 if context.variables._suite is not None and context.variables._suite != context.variables.current:
+                    self._scope_handles[entry.suite_id()] = (entry, ScopeKind.SUITE)
                     result.append(
                         Scope(
                             name="Suite",
@@ -748,6 +922,7 @@ class Debugger:
                         )
                     )
                 if context.variables._global is not None:
+                    self._scope_handles[entry.global_id()] = (entry, ScopeKind.GLOBAL)
                     result.append(
                         Scope(
                             name="Global",
@@ -759,6 +934,78 @@ class Debugger:
 
         return result
 
+    def _get_variable_handle(self, value: Any) -> int:
+        result = self._variable_handles_by_id.get(id(value), None)
+        if result is None:
+            result = len(self._variable_handles) + 1
+            self._variable_handles[result] = value
+            self._variable_handles_by_id[id(value)] = result
+        return result
+
+    def _create_variable(self, name: str, value: Any) -> Variable:
+        try:
+            value_repr = self._variable_repr.repr(value)
+        except BaseException as e:
+            value_repr = f"<error in repr: {type(e).__name__}: {e}>"
+
+        if isinstance(value, Mapping):
+            return Variable(
+                name=name,
+                value=value_repr,
+                type=repr(type(value)),
+                variables_reference=self._get_variable_handle(value) if value else 0,
+                named_variables=len(value),
+            )
+        if isinstance(value, (list, tuple)):
+            return Variable(
+                name=name,
+                value=value_repr,
+                type=repr(type(value)),
+                variables_reference=self._get_variable_handle(value) if value else 0,
+                indexed_variables=len(value),
+            )
+
+        return Variable(name=name, value=value_repr, type=repr(type(value)))
+
+    @staticmethod
+    def _get_children(value: Any, filter: Optional[Literal["indexed", "named"]] = None) -> Iterable[Tuple[str, Any]]:
+        if isinstance(value, Mapping):
+            if filter == "indexed":
+                return ()
+            return ((k if isinstance(k, str) else repr(k), v) for k, v in value.items())
+
+        if filter == "named":
+            return ()
+        return ((f"[{i}]", v) for i, v in enumerate(value))
+
+    def _get_scope_items(self, variables_reference: int, context: Any, kind: ScopeKind) -> List[Tuple[str, Any]]:
+        result = self._scope_items.get(variables_reference, None)
+        if result is not None:
+            return result
+
+        result = []
+        if kind == ScopeKind.GLOBAL:
+            result = list(context.variables._global.as_dict().items())
+        elif kind == ScopeKind.SUITE:
+            globals = context.variables._global.as_dict()
+            result = [
+                (k, v) for k, v in context.variables._suite.as_dict().items() if k not in globals or globals[k] != v
+            ]
+        elif kind == ScopeKind.TEST:
+            globals = context.variables._suite.as_dict()
+            result = [
+                (k, v) for k, v in context.variables._test.as_dict().items() if k not in globals or globals[k] != v
+            ]
+        elif kind == ScopeKind.LOCAL:
+            current_index = context.variables._scopes.index(context.variables.current)
+            globals = context.variables._scopes[max(current_index - 1, 0)].as_dict()
+            result = [
+                (k, v) for k, v in context.variables.current.as_dict().items() if k not in globals or globals[k] != v
+            ]
+
+        self._scope_items[variables_reference] = result
+        return result
+
     def get_variables(
         self,
         variables_reference: int,
@@ -767,47 +1014,21 @@ class Debugger:
         count: Optional[int] = None,
         format: Optional[ValueFormat] = None,
     ) -> List[Variable]:
-        result: List[Variable] = []
-        entry = next(
-            (
-                v
-                for v in self.stack_frames
-                if variables_reference in [v.global_id(), v.local_id(), v.suite_id(), v.test_id()]
-            ),
-            None,
-        )
-        if entry is not None:
+        items: Iterable[Tuple[str, Any]] = ()
+
+        if variables_reference in self._variable_handles:
+            items = self._get_children(self._variable_handles[variables_reference], filter)
+        elif filter != "indexed" and variables_reference in self._scope_handles:
+            entry, kind = self._scope_handles[variables_reference]
             context = entry.context()
             if context is not None:
-                if entry.global_id() == variables_reference:
-                    result += [
-                        Variable(name=k, value=repr(v), type=repr(type(v)))
-                        for k, v in context.variables._global.as_dict().items()
-                    ]
-                elif entry.suite_id() == variables_reference:
-                    globals = context.variables._global.as_dict()
-                    result += [
-                        Variable(name=k, value=repr(v), type=repr(type(v)))
-                        for k, v in context.variables._suite.as_dict().items()
-                        if k not in globals or globals[k] != v
-                    ]
-                elif entry.test_id() == variables_reference:
-                    globals = context.variables._suite.as_dict()
-                    result += [
-                        Variable(name=k, value=repr(v), type=repr(type(v)))
-                        for k, v in context.variables._test.as_dict().items()
-                        if k not in globals or globals[k] != v
-                    ]
-                elif entry.local_id() == variables_reference:
-                    current_index = context.variables._scopes.index(context.variables.current)
-                    globals = context.variables._scopes[max(current_index - 1, 0)].as_dict()
-                    result += [
-                        Variable(name=k, value=repr(v), type=repr(type(v)))
-                        for k, v in context.variables.current.as_dict().items()
-                        if k not in globals or globals[k] != v
-                    ]
+                items = self._get_scope_items(variables_reference, context, kind)
 
-        return result
+        start = start or 0
+        return [
+            self._create_variable(name, value)
+            for name, value in itertools.islice(items, start, start + count if count else None)
+        ]
 
     IS_VARIABLE_RE = re.compile(r"^[$@&%]\{.*\}$")
     SPLIT_LINE = re.compile(r"(?= {2,}| ?\t)\s*")
@@ -829,11 +1050,8 @@ class Debugger:
         evaluate_context: Any = None
 
         if frame_id is not None:
-            evaluate_context = (
-                next((v.context() for v in self.stack_frames if v.id == frame_id), None)
-                if frame_id is not None
-                else None
-            )
+            frame = self._frame_handles.get(frame_id, None)
+            evaluate_context = frame.context() if frame is not None else None
 
         if evaluate_context is None:
             evaluate_context = EXECUTION_CONTEXTS.current
@@ -873,17 +1091,10 @@ class Debugger:
     ) -> SetVariableResult:
         from robot.variables.evaluation import evaluate_expression
 
-        entry = next(
-            (
-                v
-                for v in self.stack_frames
-                if variables_reference in [v.global_id(), v.local_id(), v.suite_id(), v.test_id()]
-            ),
-            None,
-        )
+        scope = self._scope_handles.get(variables_reference, None)
 
-        if entry is not None:
-            context = entry.context()
+        if scope is not None:
+            context = scope[0].context()
             if context is not None:
                 variables = context.variables.current
 
@@ -893,6 +1104,9 @@ class Debugger:
                 evaluated_value = evaluate_expression(variables.replace_string(value), variables.store)
                 variables[name] = evaluated_value
 
+                # the value can be shown in other scopes too, so the snapshots of all scopes are taken again
+                self._scope_items.clear()
+
                 return SetVariableResult(repr(evaluated_value), repr(type(value)))
 
         raise ReferenceError("Invalid variable reference.")
@@ -140,6 +140,14 @@ class DAPServerProtocol(DebugAdapterProtocol):
         outputLog: Optional[bool] = False,
         groupOutput: Optional[bool] = False,
         stopOnEntry: Optional[bool] = False,  # noqa: N803
+        binaryTransport: Optional[bool] = False,  # noqa: N803
+        keywordEvents: Optional[Literal["all", "sampled", "none"]] = None,  # noqa: N803
+        keywordEventsSampleRate: Optional[int] = None,  # noqa: N803
+        logEventsLevel: Optional[str] = None,  # noqa: N803
+        eventBatchInterval: Optional[float] = None,  # noqa: N803
+        processes: Optional[int] = None,
+        splitBy: Optional[Literal["suite", "test"]] = None,  # noqa: N803
+        profile: Optional[str] = None,
         arguments: Optional[LaunchRequestArguments] = None,
         **kwargs: Any,
     ) -> None:
@@ -174,6 +182,27 @@ class DAPServerProtocol(DebugAdapterProtocol):
         if stopOnEntry:
             run_args += ["-soe"]
 
+        if keywordEvents:
+            run_args += ["--keyword-events", keywordEvents]
+
+        if keywordEventsSampleRate:
+            run_args += ["--keyword-events-sample-rate", str(keywordEventsSampleRate)]
+
+        if logEventsLevel:
+            run_args += ["--log-events-level", logEventsLevel]
+
+        if eventBatchInterval:
+            run_args += ["--event-batch-interval", str(eventBatchInterval)]
+
+        if processes:
+            run_args += ["--processes", str(processes)]
+
+        if splitBy:
+            run_args += ["--split-by", splitBy]
+
+        if profile:
+            run_args += ["--profile", profile]
+
         run_args += launcherArgs or []
 
         run_args += ["--"]
@@ -234,6 +263,9 @@ class DAPServerProtocol(DebugAdapterProtocol):
         except asyncio.TimeoutError:
             raise asyncio.TimeoutError("Can't connect to debug launcher.")
 
+        if binaryTransport:
+            await self.client.protocol.negotiate_encoding()
+
     @rpc_method(name="configurationDone", param_type=ConfigurationDoneArguments)
     async def _configuration_done(self, arguments: Optional[ConfigurationDoneArguments] = None) -> None:
         await self.client.protocol.send_request_async(ConfigurationDoneRequest(arguments=arguments))
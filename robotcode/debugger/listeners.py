@@ -1,8 +1,11 @@
+import threading
+import time
 from dataclasses import dataclass
-from typing import Any, Dict, Iterator, List, Optional, Union, cast
+from typing import Any, Dict, List, Optional, Set, Union, cast
 
-from .dap_types import Event, Model
-from .debugger import Debugger
+from .dap_types import Event, Model, OutputCategory, OutputEvent, OutputEventBody
+from .debugger import Debugger, KeywordEvents
+from .profiler import Profiler
 
 
 @dataclass
@@ -12,6 +15,9 @@ class RobotExecutionEventBody(Model):
     failed_keywords: Optional[List[Dict[str, Any]]] = None
 
 
+LOG_LEVELS = {"TRACE": 0, "DEBUG": 1, "INFO": 2, "HTML": 2, "WARN": 3, "ERROR": 4, "FAIL": 5, "NONE": 6}
+
+
 class ListenerV2:
     ROBOT_LISTENER_API_VERSION = "2"
 
@@ -21,23 +27,101 @@ class ListenerV2:
         self.failed_keywords: Optional[List[Dict[str, Any]]] = None
         self.last_fail_message: Optional[str] = None
 
+        self._keyword_count = 0
+        self._keyword_sent: List[bool] = []
+        self._batch: List[Event] = []
+        self._batch_started = 0.0
+        self._batch_lock = threading.RLock()
+        self._batch_wakeup = threading.Event()
+        self._batch_closed = False
+        self._batch_flusher: Optional[threading.Thread] = None
+        self._suite_level = 0
+
+        self.profiler = Profiler() if Debugger.instance().profile_dir else None
+
+    def _send_event(self, event: Event) -> None:
+        interval = Debugger.instance().event_batch_interval
+
+        # batching would change the order of our events and the stopped events of the debugger
+        if interval <= 0 or self.debug:
+            Debugger.instance().send_event(self, event)
+            return
+
+        with self._batch_lock:
+            if not self._batch:
+                self._batch_started = time.monotonic()
+
+                # a long running keyword sends no further events, so a flusher thread sends the batch
+                # after the interval even if nothing else happens
+                if self._batch_flusher is None:
+                    self._batch_flusher = threading.Thread(
+                        name="robotcode event flusher", target=self._run_flusher, args=(interval,), daemon=True
+                    )
+                    self._batch_flusher.start()
+                self._batch_wakeup.set()
+
+            self._batch.append(event)
+
+            if time.monotonic() - self._batch_started >= interval:
+                self._flush_events()
+
+    def _run_flusher(self, interval: float) -> None:
+        while True:
+            with self._batch_lock:
+                if self._batch_closed:
+                    return
+
+                timeout: Optional[float] = None
+                if self._batch:
+                    timeout = self._batch_started + interval - time.monotonic()
+                    if timeout <= 0:
+                        self._flush_events()
+                        timeout = None
+
+                self._batch_wakeup.clear()
+
+            self._batch_wakeup.wait(timeout)
+
+    def _flush_events(self) -> None:
+        with self._batch_lock:
+            if self._batch:
+                events, self._batch = self._batch, []
+                Debugger.instance().send_event(self, Event(event="robotEvents", body={"events": events}))
+
+    def _should_send_keyword_event(self) -> bool:
+        mode = Debugger.instance().keyword_events
+
+        if mode == KeywordEvents.ALL:
+            return True
+        if mode == KeywordEvents.NONE:
+            return False
+
+        self._keyword_count += 1
+        return (self._keyword_count - 1) % max(Debugger.instance().keyword_events_sample_rate, 1) == 0
+
     def start_suite(self, name: str, attributes: Dict[str, Any]) -> None:
-        Debugger.instance().send_event(
-            self, Event(event="robotStarted", body=RobotExecutionEventBody(type="suite", attributes=dict(attributes)))
+        self._suite_level += 1
+
+        self._send_event(
+            Event(event="robotStarted", body=RobotExecutionEventBody(type="suite", attributes=dict(attributes)))
         )
 
         Debugger.instance().start_output_group(name, attributes, "SUITE")
 
         Debugger.instance().start_suite(name, attributes)
 
+        if self.profiler is not None:
+            self.profiler.start_suite(name, attributes)
+
     def end_suite(self, name: str, attributes: Dict[str, Any]) -> None:
+        if self.profiler is not None:
+            self.profiler.end()
 
         Debugger.instance().end_suite(name, attributes)
 
         Debugger.instance().end_output_group(name, attributes)
 
-        Debugger.instance().send_event(
-            self,
+        self._send_event(
             Event(
                 event="robotEnded",
                 body=RobotExecutionEventBody(
@@ -46,24 +130,33 @@ class ListenerV2:
             ),
         )
 
+        self._suite_level -= 1
+        if self._suite_level == 0:
+            self._flush_events()
+
     def start_test(self, name: str, attributes: Dict[str, Any]) -> None:
         self.failed_keywords = None
 
-        Debugger.instance().send_event(
-            self, Event(event="robotStarted", body=RobotExecutionEventBody(type="test", attributes=dict(attributes)))
+        self._send_event(
+            Event(event="robotStarted", body=RobotExecutionEventBody(type="test", attributes=dict(attributes)))
         )
 
         Debugger.instance().start_output_group(name, attributes, "TEST")
 
         Debugger.instance().start_test(name, attributes)
 
+        if self.profiler is not None:
+            self.profiler.start_test(name, attributes)
+
     def end_test(self, name: str, attributes: Dict[str, Any]) -> None:
+        if self.profiler is not None:
+            self.profiler.end()
+
         Debugger.instance().end_test(name, attributes)
 
         Debugger.instance().end_output_group(name, attributes)
 
-        Debugger.instance().send_event(
-            self,
+        self._send_event(
             Event(
                 event="robotEnded",
                 body=RobotExecutionEventBody(
@@ -75,9 +168,13 @@ class ListenerV2:
         self.failed_keywords = None
 
     def start_keyword(self, name: str, attributes: Dict[str, Any]) -> None:
-        Debugger.instance().send_event(
-            self, Event(event="robotStarted", body=RobotExecutionEventBody(type="keyword", attributes=dict(attributes)))
-        )
+        send = self._should_send_keyword_event()
+        self._keyword_sent.append(send)
+
+        if send:
+            self._send_event(
+                Event(event="robotStarted", body=RobotExecutionEventBody(type="keyword", attributes=dict(attributes)))
+            )
 
         Debugger.instance().start_output_group(
             f"{name}({', '.join(repr(v) for v in attributes.get('args', []))})",
@@ -87,7 +184,13 @@ class ListenerV2:
 
         Debugger.instance().start_keyword(name, attributes)
 
+        if self.profiler is not None and attributes.get("status", "") != "NOT RUN":
+            self.profiler.start_keyword(name, attributes)
+
     def end_keyword(self, name: str, attributes: Dict[str, Any]) -> None:
+        if self.profiler is not None and attributes.get("status", "") != "NOT RUN":
+            self.profiler.end()
+
         Debugger.instance().end_keyword(name, attributes)
 
         Debugger.instance().end_output_group(name, attributes)
@@ -98,25 +201,30 @@ class ListenerV2:
 
             self.failed_keywords.insert(0, {"message": self.last_fail_message, **attributes})
 
-        Debugger.instance().send_event(
-            self, Event(event="robotEnded", body=RobotExecutionEventBody(type="keyword", attributes=dict(attributes)))
-        )
+        send = self._keyword_sent.pop() if self._keyword_sent else True
+        if send:
+            self._send_event(
+                Event(event="robotEnded", body=RobotExecutionEventBody(type="keyword", attributes=dict(attributes)))
+            )
 
     def log_message(self, message: Dict[str, Any]) -> None:
-        current_frame = Debugger.instance().stack_frames[0] if Debugger.instance().stack_frames else None
-
         if message["level"] == "FAIL":
             self.last_fail_message = message["message"]
             return
 
+        if LOG_LEVELS.get(message["level"], 0) < LOG_LEVELS.get(Debugger.instance().log_events_level, 0):
+            Debugger.instance().log_message(message)
+            return
+
+        current_frame = Debugger.instance().stack_frames[0] if Debugger.instance().stack_frames else None
+
         source = current_frame.source if current_frame else None
         line = current_frame.line if current_frame else None
         column = current_frame.column if current_frame else None
 
         name = next((e.name for e in Debugger.instance().stack_frames if e.type in ["SUITE", "TEST"]), None)
 
-        Debugger.instance().send_event(
-            self,
+        self._send_event(
             Event(
                 event="robotLog",
                 body={"itemId": name, "source": source, "lineno": line, "column": column, **dict(message)},
@@ -153,31 +261,78 @@ class ListenerV2:
         pass
 
     def close(self) -> None:
-        pass
+        with self._batch_lock:
+            self._batch_closed = True
+            self._batch_wakeup.set()
+
+            self._flush_events()
+
+        if self._batch_flusher is not None:
+            self._batch_flusher.join()
+            self._batch_flusher = None
+
+        profile_dir = Debugger.instance().profile_dir
+        if self.profiler is not None and profile_dir:
+            self.profiler.write(profile_dir)
+
+            Debugger.instance().send_event(
+                self,
+                OutputEvent(
+                    body=OutputEventBody(
+                        output=f"Profile written to {profile_dir}\n{self.profiler.summary(20)}\n",
+                        category=OutputCategory.CONSOLE,
+                    )
+                ),
+            )
 
 
 class ListenerV3:
     ROBOT_LISTENER_API_VERSION = "3"
 
+    def __init__(self) -> None:
+        self._enqueued: Set[str] = set()
+
     def start_suite(self, data: Any, result: Any) -> None:
         from robot.running import TestCase, TestSuite
 
-        def enqueue(item: Union[TestSuite, TestCase]) -> Iterator[str]:
+        suite = cast(TestSuite, data)
+
+        # the whole tree is sent once for the root suite, later suites only send children that were added since
+        if suite.parent is None:
+            root = None
+            items: List[Union[TestSuite, TestCase]] = [suite]
+        else:
+            root = suite.longname
+            items = [i for i in [*suite.suites, *suite.tests] if f"{root}.{i.name}" not in self._enqueued]
+
+        if not items:
+            return
+
+        names: List[str] = []
+        parents: List[int] = []
+
+        def enqueue(item: Union[TestSuite, TestCase], parent: int, prefix: Optional[str]) -> None:
+            index = len(names)
+            longname = f"{prefix}.{item.name}" if prefix is not None else item.name
+
+            names.append(item.name)
+            parents.append(parent)
+            self._enqueued.add(longname)
+
             if isinstance(item, TestSuite):
                 for s in item.suites:
-                    yield from enqueue(s)
-                for s in item.tests:
-                    yield from enqueue(s)
-
-            yield item.longname
+                    enqueue(s, index, longname)
+                for t in item.tests:
+                    enqueue(t, index, longname)
 
-        items = [i for i in enqueue(cast(TestSuite, data))]
+        for item in items:
+            enqueue(item, -1, root)
 
         Debugger.instance().send_event(
             self,
             Event(
                 event="robotEnqueued",
-                body={"items": items},
+                body={"root": root, "names": names, "parents": parents},
             ),
         )
 
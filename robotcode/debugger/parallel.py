@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Optional, Set, Tuple
+
+from ..jsonrpc2.server import TcpParams
+from ..utils.logging import LoggingDescriptor
+from .client import DAPClient, DAPClientProtocol
+from .dap_types import ConfigurationDoneRequest, Event, Thread
+from .protocol import DebugAdapterProtocol
+
+_logger = LoggingDescriptor(name=__name__)
+
+SplitBy = Literal["suite", "test"]
+
+
+class KeepTests:
+    """
+    Pre-run modifier that keeps only the tests whose long names are listed in the given JSON file.
+
+    Used by the workers of a parallel run, the normal suite configuration like `--include` or
+    `--test` is applied after this modifier.
+    """
+
+    def __init__(self, file: str) -> None:
+        self.tests: Set[str] = set(json.loads(Path(file).read_text("utf-8")))
+
+    def start_suite(self, suite: Any) -> None:
+        suite.tests = [t for t in suite.tests if t.longname in self.tests]
+
+    def end_suite(self, suite: Any) -> None:
+        suite.suites = [s for s in suite.suites if s.test_count > 0]
+
+    def visit_suite(self, suite: Any) -> None:
+        self.start_suite(suite)
+        for s in suite.suites:
+            self.visit_suite(s)
+        self.end_suite(suite)
+
+
+def _build_suite(robot_args: List[str]) -> Tuple[Any, Any, Dict[str, Any], List[str]]:
+    from robot.conf import RobotSettings
+    from robot.model import ModelModifier
+    from robot.output import LOGGER
+    from robot.run import RobotFramework
+    from robot.running.builder import TestSuiteBuilder
+
+    options, datasources = RobotFramework().parse_arguments(robot_args)
+    settings = RobotSettings(options)
+
+    suite = TestSuiteBuilder(
+        settings["SuiteNames"],
+        included_extensions=settings.extension,
+        rpa=settings.rpa,
+        allow_empty_suite=settings.run_empty_suite,
+    ).build(*datasources)
+    settings.rpa = suite.rpa
+    if settings.pre_run_modifiers:
+        suite.visit(ModelModifier(settings.pre_run_modifiers, settings.run_empty_suite, LOGGER))
+    suite.configure(**settings.suite_config)
+
+    return suite, settings, options, datasources
+
+
+WORKER_OUTPUT_OPTIONS = {"outputdir", "output", "log", "report", "xunit"}
+
+
+def worker_options(options: Dict[str, Any]) -> List[str]:
+    """
+    Converts the options parsed by robot back to command line arguments for a worker.
+
+    The options for the output files are left out, every worker writes only its own output file.
+    """
+    result: List[str] = []
+
+    for name, value in options.items():
+        if name in WORKER_OUTPUT_OPTIONS or value is None:
+            continue
+
+        if value is True:
+            result.append(f"--{name}")
+        elif value is False:
+            result.append(f"--no{name}")
+        elif isinstance(value, (list, tuple)):
+            for v in value:
+                result += [f"--{name}", str(v)]
+        else:
+            result += [f"--{name}", str(value)]
+
+    return result
+
+
+def split_tests(suite: Any, processes: int, split_by: SplitBy = "suite") -> List[List[str]]:
+    """
+    Splits the tests of the suite into at most `processes` groups of test long names.
+
+    With `split_by="suite"` the tests of a top level child suite always stay in the same group,
+    the groups are filled with the biggest suites first.
+    """
+
+    def tests_of(s: Any) -> List[str]:
+        return [t.longname for t in s.tests] + [n for c in s.suites for n in tests_of(c)]
+
+    if split_by == "suite" and len(suite.suites) > 1:
+        units = [tests_of(s) for s in suite.suites]
+        if suite.tests:
+            units.append([t.longname for t in suite.tests])
+    else:
+        units = [[n] for n in tests_of(suite)]
+
+    groups: List[List[str]] = [[] for _ in range(min(processes, len(units)))]
+    for unit in sorted(units, key=len, reverse=True):
+        min(groups, key=len).extend(unit)
+
+    return [g for g in groups if g]
+
+
+def merge_outputs(outputs: List[str], merged_output: str) -> None:
+    from robot.api import ExecutionResult
+
+    def merge_suite(target: Any, source: Any) -> None:
+        for s in list(source.suites):
+            existing = next((t for t in target.suites if t.name == s.name), None)
+            if existing is None:
+                target.suites.append(s)
+            else:
+                merge_suite(existing, s)
+
+        target.tests.extend(list(source.tests))
+
+        if source.endtime and (not target.endtime or source.endtime > target.endtime):
+            target.endtime = source.endtime
+        if source.starttime and (not target.starttime or source.starttime < target.starttime):
+            target.starttime = source.starttime
+
+    result = ExecutionResult(outputs[0])
+    for output in outputs[1:]:
+        merge_suite(result.suite, ExecutionResult(output).suite)
+
+    result.save(merged_output)
+
+
+class WorkerClientProtocol(DAPClientProtocol):
+    FILTERED_EVENTS = {"initialized", "exited", "terminated", "robotExited"}
+
+    async def handle_event(self, message: Event) -> None:
+        if message.event == "exited":
+            self.exited = True
+        elif message.event == "terminated":
+            self.terminated = True
+
+        if message.event not in self.FILTERED_EVENTS:
+            self.parent.send_event(Event(event=message.event, body=message.body))
+
+
+class WorkerClient(DAPClient):
+    def _create_protocol(self) -> DAPClientProtocol:
+        return WorkerClientProtocol(self.parent)
+
+
+class ParallelRun:
+    """
+    Runs the tests in parallel worker processes, like pabot does.
+
+    Every worker is a debugger launcher running in no-debug mode on a part of the tests, its
+    events are forwarded to `parent`. At the end the outputs of the workers are merged and log
+    and report are created with rebot.
+    """
+
+    def __init__(
+        self,
+        parent: DebugAdapterProtocol,
+        robot_args: List[str],
+        processes: int,
+        split_by: SplitBy = "suite",
+        launcher_args: Optional[List[str]] = None,
+        connect_timeout: float = 5,
+        profile_dir: Optional[str] = None,
+    ) -> None:
+        self.parent = parent
+        self.robot_args = robot_args
+        self.processes = processes
+        self.split_by = split_by
+        self.launcher_args = launcher_args or []
+        self.connect_timeout = connect_timeout
+        self.profile_dir = profile_dir
+        self.threads: List[Thread] = []
+        self._processes: List[asyncio.subprocess.Process] = []
+        self.report_file: Optional[str] = None
+        self.log_file: Optional[str] = None
+        self.output_file: Optional[str] = None
+
+    async def _run_worker(
+        self, index: int, tests: List[str], option_args: List[str], datasources: List[str], output_dir: Path
+    ) -> Optional[str]:
+        from ..utils.net import find_free_port
+
+        tests_file = output_dir / f"tests-{index}.json"
+        tests_file.write_text(json.dumps(tests), "utf-8")
+        output = output_dir / f"output-{index}.xml"
+
+        port = find_free_port()
+
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-u",
+            str(Path(__file__).parent),
+            "-p",
+            str(port),
+            "-w",
+            "-t",
+            str(self.connect_timeout),
+            "-n",
+            *self.launcher_args,
+            *(["--profile", str(Path(self.profile_dir, f"worker-{index + 1}"))] if self.profile_dir else []),
+            "--",
+            *option_args,
+            "--prerunmodifier",
+            f"{KeepTests.__module__}.{KeepTests.__qualname__}:{tests_file}",
+            "--outputdir",
+            str(output_dir),
+            "--output",
+            str(output),
+            "--log",
+            "NONE",
+            "--report",
+            "NONE",
+            "--xunit",
+            "NONE",
+            *datasources,
+        )
+        self._processes.append(process)
+        self.threads.append(Thread(id=process.pid, name=f"Worker {index + 1}"))
+
+        client = WorkerClient(self.parent, TcpParams(None, port))
+        try:
+            await client.connect(self.connect_timeout)
+            await client.protocol.send_request_async(ConfigurationDoneRequest())
+
+            await process.wait()
+        finally:
+            client.close()
+
+        return str(output) if output.exists() else None
+
+    async def _stop_processes(self) -> None:
+        running = [p for p in self._processes if p.returncode is None]
+
+        for process in running:
+            with contextlib.suppress(ProcessLookupError):
+                process.terminate()
+
+        for process in running:
+            try:
+                await asyncio.wait_for(process.wait(), self.connect_timeout)
+            except asyncio.TimeoutError:
+                with contextlib.suppress(ProcessLookupError):
+                    process.kill()
+                await process.wait()
+
+    async def _run_workers(
+        self, groups: List[List[str]], option_args: List[str], datasources: List[str], output_dir: Path
+    ) -> List[str]:
+        tasks = [
+            asyncio.ensure_future(self._run_worker(i, g, option_args, datasources, output_dir))
+            for i, g in enumerate(groups)
+        ]
+        try:
+            return [o for o in await asyncio.gather(*tasks) if o is not None]
+        finally:
+            # if one worker fails, the others must not outlive the temporary directory of their outputs
+            for task in tasks:
+                task.cancel()
+            await self._stop_processes()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run(self) -> int:
+        import robot
+
+        suite, settings, options, datasources = _build_suite(self.robot_args)
+        groups = split_tests(suite, self.processes, self.split_by)
+
+        with tempfile.TemporaryDirectory(prefix="robotcode_") as tmp:
+            output_dir = Path(tmp)
+
+            outputs = await self._run_workers(groups, worker_options(options), datasources, output_dir)
+            if not outputs:
+                _logger.warning("no worker created an output file")
+                return 252
+
+            merged_output = settings.output or str(output_dir / "output.xml")
+            Path(merged_output).parent.mkdir(parents=True, exist_ok=True)
+            merge_outputs(outputs, merged_output)
+
+            self.output_file = settings.output
+            self.log_file = settings.log
+            self.report_file = settings.report
+
+            return int(
+                robot.rebot_cli(
+                    [
+                        "--outputdir",
+                        str(settings.output_directory),
+                        "--output",
+                        "NONE",
+                        "--log",
+                        settings.log or "NONE",
+                        "--report",
+                        settings.report or "NONE",
+                        "--xunit",
+                        settings.xunit or "NONE",
+                        merged_output,
+                    ],
+                    exit=False,
+                )
+            )
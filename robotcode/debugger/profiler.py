@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+KEYWORD_TYPES = {"KEYWORD", "SETUP", "TEARDOWN"}
+
+
+@dataclass
+class KeywordTiming:
+    name: str
+    library: str
+    calls: int = 0
+    total_ns: int = 0
+    self_ns: int = 0
+
+
+@dataclass
+class _ProfilerFrame:
+    name: str
+    key: Optional[Tuple[str, str]]
+    started: int
+    children_ns: int = 0
+    stack: Tuple[str, ...] = field(default_factory=tuple)
+
+
+class Profiler:
+    """
+    Collects the execution times of suites, tests and keywords from the listener calls.
+
+    Self and total time are aggregated per keyword and library. For recursive keywords the total
+    time is only counted for the outermost call. The self time of every call stack is collected
+    for flame graphs.
+    """
+
+    def __init__(self) -> None:
+        self.timings: Dict[Tuple[str, str], KeywordTiming] = {}
+        self.stacks: Dict[Tuple[str, ...], int] = {}
+        self._frames: List[_ProfilerFrame] = []
+        self._active: Dict[Tuple[str, str], int] = {}
+
+    def start(self, name: str, key: Optional[Tuple[str, str]] = None) -> None:
+        stack = (*self._frames[-1].stack, name) if self._frames else (name,)
+        self._frames.append(_ProfilerFrame(name, key, time.perf_counter_ns(), stack=stack))
+
+        if key is not None:
+            self._active[key] = self._active.get(key, 0) + 1
+
+    def end(self) -> None:
+        if not self._frames:
+            return
+
+        ended = time.perf_counter_ns()
+        frame = self._frames.pop()
+        total = ended - frame.started
+        self_time = total - frame.children_ns
+
+        if self._frames:
+            self._frames[-1].children_ns += total
+
+        self.stacks[frame.stack] = self.stacks.get(frame.stack, 0) + self_time
+
+        if frame.key is not None:
+            timing = self.timings.get(frame.key, None)
+            if timing is None:
+                timing = self.timings[frame.key] = KeywordTiming(frame.key[1], frame.key[0])
+
+            timing.calls += 1
+            timing.self_ns += self_time
+
+            self._active[frame.key] -= 1
+            if self._active[frame.key] == 0:
+                timing.total_ns += total
+
+    def start_suite(self, name: str, attributes: Dict[str, Any]) -> None:
+        self.start(name)
+
+    def start_test(self, name: str, attributes: Dict[str, Any]) -> None:
+        self.start(name)
+
+    def start_keyword(self, name: str, attributes: Dict[str, Any]) -> None:
+        type = attributes.get("type", "KEYWORD")
+        kwname = attributes.get("kwname", name)
+        libname = attributes.get("libname", "")
+
+        if type in KEYWORD_TYPES:
+            self.start(f"{libname}.{kwname}" if libname else kwname, (libname, kwname))
+        else:
+            self.start(f"{type} {kwname}" if kwname else type)
+
+    def collapsed_stacks(self) -> List[str]:
+        """Lines in the collapsed stack format of `flamegraph.pl`, weights in microseconds."""
+
+        return [
+            f"{';'.join(n.replace(';', ':') for n in stack)} {self_ns // 1000}"
+            for stack, self_ns in self.stacks.items()
+            if self_ns >= 1000
+        ]
+
+    def speedscope(self, name: str = "robot") -> Dict[str, Any]:
+        frames: Dict[str, int] = {}
+        samples: List[List[int]] = []
+        weights: List[int] = []
+
+        for stack, self_ns in self.stacks.items():
+            samples.append([frames.setdefault(n, len(frames)) for n in stack])
+            weights.append(self_ns)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": [{"name": n} for n in frames.keys()]},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "nanoseconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+            "name": name,
+            "exporter": "robotcode",
+        }
+
+    def summary(self, limit: Optional[int] = None) -> str:
+        timings = sorted(self.timings.values(), key=lambda t: t.self_ns, reverse=True)[:limit]
+
+        rows = [("Keyword", "Library", "Calls", "Total (ms)", "Self (ms)", "Avg (ms)")] + [
+            (
+                t.name,
+                t.library,
+                str(t.calls),
+                f"{t.total_ns / 1e6:.2f}",
+                f"{t.self_ns / 1e6:.2f}",
+                f"{t.total_ns / t.calls / 1e6:.2f}",
+            )
+            for t in timings
+        ]
+        widths = [max(len(r[i]) for r in rows) for i in range(len(rows[0]))]
+
+        return "\n".join(
+            "  ".join(c.ljust(w) if i < 2 else c.rjust(w) for i, (c, w) in enumerate(zip(r, widths))).rstrip()
+            for r in rows
+        )
+
+    def write(self, directory: str) -> List[Path]:
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+
+        collapsed = path / "profile.collapsed"
+        collapsed.write_text("\n".join(self.collapsed_stacks()) + "\n", "utf-8")
+
+        speedscope = path / "profile.speedscope.json"
+        speedscope.write_text(json.dumps(self.speedscope()), "utf-8")
+
+        summary = path / "profile.txt"
+        summary.write_text(self.summary() + "\n", "utf-8")
+
+        return [collapsed, speedscope, summary]
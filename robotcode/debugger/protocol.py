@@ -4,8 +4,9 @@ import asyncio
 import inspect
 import json
 import logging
-import threading
 from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum
 from typing import (
     Any,
     Callable,
@@ -24,8 +25,9 @@ from ..jsonrpc2.protocol import (
     JsonRPCException,
     JsonRPCProtocolBase,
     SendedRequestEntry,
+    rpc_method,
 )
-from ..utils.dataclasses import as_dict, as_json, from_dict
+from ..utils.dataclasses import as_dict, as_json, encode_default, from_dict
 from ..utils.inspect import ensure_coroutine
 from ..utils.logging import LoggingDescriptor
 from .dap_types import (
@@ -33,6 +35,7 @@ from .dap_types import (
     ErrorResponse,
     Event,
     Message,
+    Model,
     ProtocolMessage,
     Request,
     Response,
@@ -74,6 +77,40 @@ class DebugAdapterRPCErrorException(JsonRPCException):
 TResult = TypeVar("TResult", bound=Any)
 
 
+def msgpack_installed() -> bool:
+    try:
+        __import__("msgpack")
+    except ImportError:
+        return False
+    return True
+
+
+class MessageEncoding(str, Enum):
+    JSON = "json"
+    MSGPACK = "msgpack"
+
+
+@dataclass
+class NegotiateEncodingArguments(Model):
+    encodings: List[MessageEncoding]
+
+
+@dataclass
+class _NegotiateEncodingRequest(Model):
+    arguments: NegotiateEncodingArguments
+
+
+@dataclass
+class NegotiateEncodingRequest(Request, _NegotiateEncodingRequest):
+    arguments: NegotiateEncodingArguments = field()
+    command: str = "robotNegotiateEncoding"
+
+
+@dataclass
+class NegotiateEncodingResponseBody(Model):
+    encoding: MessageEncoding
+
+
 class DebugAdapterProtocol(JsonRPCProtocolBase):
 
     _logger = LoggingDescriptor()
@@ -81,24 +118,76 @@ class DebugAdapterProtocol(JsonRPCProtocolBase):
 
     def __init__(self) -> None:
         super().__init__()
-        self._sended_request_lock = threading.RLock()
         self._sended_request: OrderedDict[int, SendedRequestEntry] = OrderedDict()
-        self._received_request_lock = threading.RLock()
         self._received_request: OrderedDict[int, asyncio.Future[Any]] = OrderedDict()
         self._initialized = False
+        self._encoding = MessageEncoding.JSON
+
+    MSGPACK_CONTENT_TYPE = "application/msgpack"
+
+    @property
+    def encoding(self) -> MessageEncoding:
+        return self._encoding
+
+    @encoding.setter
+    def encoding(self, value: MessageEncoding) -> None:
+        if value == MessageEncoding.MSGPACK and not msgpack_installed():
+            raise DebugAdapterRPCErrorException("msgpack is not installed.")
+
+        self._encoding = value
+
+    @property
+    def supported_encodings(self) -> List[MessageEncoding]:
+        return [MessageEncoding.MSGPACK, MessageEncoding.JSON] if msgpack_installed() else [MessageEncoding.JSON]
+
+    async def negotiate_encoding(self) -> MessageEncoding:
+        """
+        Asks the other side to switch to the best encoding both sides support.
+
+        Both sides can decode every encoding they offered, independently of which one the other side
+        sends, so there is no need to synchronize the switch with the messages in flight.
+        """
+        result = await self.send_request_async(
+            NegotiateEncodingRequest(arguments=NegotiateEncodingArguments(encodings=self.supported_encodings)),
+            NegotiateEncodingResponseBody,
+        )
+        self.encoding = result.encoding
+
+        return self.encoding
+
+    @rpc_method(name="robotNegotiateEncoding", param_type=NegotiateEncodingArguments)
+    async def _negotiate_encoding(self, encodings: List[MessageEncoding]) -> NegotiateEncodingResponseBody:
+        self.encoding = next(
+            (e for e in self.supported_encodings if e in encodings),
+            MessageEncoding.JSON,
+        )
+
+        return NegotiateEncodingResponseBody(encoding=self.encoding)
 
     @_logger.call
     def send_message(self, message: ProtocolMessage) -> None:
-        body = as_json(message, indent=self._message_logger.is_enabled_for(logging.DEBUG) or None).encode(self.CHARSET)
+        if self._encoding == MessageEncoding.MSGPACK:
+            import msgpack
 
-        header = (f"Content-Length: {len(body)}\r\n\r\n").encode("ascii")
+            body: bytes = msgpack.packb(message, default=encode_default)
 
-        self._message_logger.debug(
-            lambda: "write ->\n" + (header.decode("ascii") + body.decode(self.CHARSET)).replace("\r\n", "\n")
-        )
+            header = (f"Content-Length: {len(body)}\r\nContent-Type: {self.MSGPACK_CONTENT_TYPE}\r\n\r\n").encode(
+                "ascii"
+            )
+
+            self._message_logger.debug(lambda: f"write ->\n{header.decode('ascii')}{repr(message)}")
+        else:
+            body = as_json(message, indent=self._message_logger.is_enabled_for(logging.DEBUG) or None).encode(
+                self.CHARSET
+            )
+
+            header = (f"Content-Length: {len(body)}\r\n\r\n").encode("ascii")
+
+            self._message_logger.debug(
+                lambda: "write ->\n" + (header.decode("ascii") + body.decode(self.CHARSET)).replace("\r\n", "\n")
+            )
 
-        if self.write_transport is not None:
-            self.write_transport.write(header + body)
+        self._write(header + body)
 
     def send_error(
         self,
@@ -143,9 +232,16 @@ class DebugAdapterProtocol(JsonRPCProtocolBase):
         else:
             yield inner(data)
 
-    def _handle_body(self, body: bytes, charset: str) -> None:
+    def _handle_body(self, body: bytes, charset: str, content_type: str) -> None:
         try:
-            self._handle_messages(self._generate_json_rpc_messages_from_dict(json.loads(body.decode(charset))))
+            if content_type == self.MSGPACK_CONTENT_TYPE:
+                import msgpack
+
+                data = msgpack.unpackb(body)
+            else:
+                data = json.loads(body.decode(charset))
+
+            self._handle_messages(self._generate_json_rpc_messages_from_dict(data))
         except (asyncio.CancelledError, SystemExit, KeyboardInterrupt):
             raise
         except BaseException as e:
@@ -248,14 +344,12 @@ class DebugAdapterProtocol(JsonRPCProtocolBase):
 
                 result = asyncio.create_task(ensure_coroutine(e.method)(*params[0], **params[1]))
 
-            with self._received_request_lock:
-                self._received_request[message.seq] = result
+            self._received_request[message.seq] = result
 
             try:
                 self.send_response(message.seq, message.command, await result)
             finally:
-                with self._received_request_lock:
-                    self._received_request.pop(message.seq, None)
+                self._received_request.pop(message.seq, None)
 
         except asyncio.CancelledError:
             self._logger.info(f"request message {repr(message)} canceled")
@@ -307,10 +401,12 @@ class DebugAdapterProtocol(JsonRPCProtocolBase):
         return_type: Optional[Type[TResult]] = None,
     ) -> asyncio.Future[TResult]:
 
+        if not self._in_loop_thread():
+            return self._call_in_loop_with_future(lambda: self.send_request(request, return_type))
+
         result: asyncio.Future[TResult] = asyncio.get_event_loop().create_future()
 
-        with self._sended_request_lock:
-            self._sended_request[request.seq] = SendedRequestEntry(result, return_type)
+        self._sended_request[request.seq] = SendedRequestEntry(result, return_type)
 
         self.send_message(request)
 
@@ -333,8 +429,7 @@ class DebugAdapterProtocol(JsonRPCProtocolBase):
 
     @_logger.call
     async def handle_error_response(self, message: ErrorResponse) -> None:
-        with self._sended_request_lock:
-            entry = self._sended_request.pop(message.request_seq, None)
+        entry = self._sended_request.pop(message.request_seq, None)
 
         exception = DebugAdapterErrorResponseError(message)
         if entry is None:
@@ -347,8 +442,7 @@ class DebugAdapterProtocol(JsonRPCProtocolBase):
 
     @_logger.call
     async def handle_response(self, message: Response) -> None:
-        with self._sended_request_lock:
-            entry = self._sended_request.pop(message.request_seq, None)
+        entry = self._sended_request.pop(message.request_seq, None)
 
         if entry is None:
             error = f"Invalid response. Could not find id '{message.request_seq}' in our request list"
@@ -1,6 +1,10 @@
 import asyncio
 import os
-from typing import Any, Literal, Optional, Union
+import threading
+from collections import deque
+from dataclasses import replace
+from enum import Enum
+from typing import Any, Deque, Literal, Optional, Union
 
 from ..jsonrpc2.protocol import rpc_method
 from ..jsonrpc2.server import JsonRPCServer, JsonRpcServerMode, TcpParams
@@ -18,6 +22,7 @@ from .dap_types import (
     ExitedEventBody,
     InitializedEvent,
     NextArguments,
+    OutputEvent,
     PauseArguments,
     ScopesArguments,
     ScopesResponseBody,
@@ -44,12 +49,122 @@ from .protocol import DebugAdapterProtocol
 TCP_DEFAULT_PORT = 6612
 
 
+class EventOverflowPolicy(Enum):
+    BLOCK = "block"
+    DROP_OLDEST = "drop-oldest"
+    COALESCE_LOGS = "coalesce-logs"
+
+
+class EventQueue:
+    """
+    Bounded queue for the events sent from the robot execution thread to the client.
+
+    If the queue is full, the overflow policy decides what happens. Only log, output and
+    keyword events are ever dropped or coalesced. For all other events the producer blocks
+    until there is room again.
+    """
+
+    def __init__(self, max_size: int = 10000, overflow_policy: EventOverflowPolicy = EventOverflowPolicy.BLOCK):
+        self.max_size = max_size
+        self.overflow_policy = overflow_policy
+        self._events: Deque[Event] = deque()
+        self._condition = threading.Condition()
+
+        self.dropped = 0
+        self.coalesced = 0
+        self.blocked = 0
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    @staticmethod
+    def _is_droppable(event: Event) -> bool:
+        if event.event == "robotLog":
+            return True
+        if isinstance(event, OutputEvent):
+            return event.body is None or event.body.group is None
+        if event.event in ["robotStarted", "robotEnded"]:
+            return bool(getattr(event.body, "type", None) == "keyword")
+        return False
+
+    def _coalesce(self, event: Event) -> bool:
+        last = self._events[-1]
+
+        if (
+            event.event == "robotLog"
+            and last.event == "robotLog"
+            and isinstance(event.body, dict)
+            and isinstance(last.body, dict)
+            and event.body.get("itemId", None) == last.body.get("itemId", None)
+            and event.body.get("level", None) == last.body.get("level", None)
+        ):
+            self._events[-1] = Event(
+                event="robotLog", body={**last.body, "message": f"{last.body['message']}\n{event.body['message']}"}
+            )
+            return True
+
+        if (
+            isinstance(event, OutputEvent)
+            and isinstance(last, OutputEvent)
+            and event.body is not None
+            and last.body is not None
+            and event.body.group is None
+            and last.body.group is None
+            and event.body.category == last.body.category
+        ):
+            self._events[-1] = OutputEvent(body=replace(last.body, output=last.body.output + event.body.output))
+            return True
+
+        return False
+
+    def _drop_oldest(self) -> bool:
+        for i, e in enumerate(self._events):
+            if self._is_droppable(e):
+                del self._events[i]
+                self.dropped += 1
+                return True
+        return False
+
+    def put(self, event: Event, block: bool = True) -> None:
+        with self._condition:
+            if len(self._events) >= self.max_size:
+                if self.overflow_policy == EventOverflowPolicy.COALESCE_LOGS and self._coalesce(event):
+                    self.coalesced += 1
+                    return
+
+                if self.overflow_policy == EventOverflowPolicy.DROP_OLDEST and self._drop_oldest():
+                    pass
+                elif block:
+                    self.blocked += 1
+                    self._condition.wait_for(lambda: len(self._events) < self.max_size)
+
+            self._events.append(event)
+
+    def get_nowait(self) -> Optional[Event]:
+        with self._condition:
+            if not self._events:
+                return None
+
+            result = self._events.popleft()
+            self._condition.notify_all()
+
+            return result
+
+
 class LauncherServerProtocol(DebugAdapterProtocol):
     _logger = LoggingDescriptor()
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        event_queue_size: int = 10000,
+        event_overflow_policy: EventOverflowPolicy = EventOverflowPolicy.BLOCK,
+    ) -> None:
         super().__init__()
-        self._loop = asyncio.get_event_loop()
+        self._bind_to_current_loop()
+
+        self.event_queue = EventQueue(event_queue_size, event_overflow_policy)
+        self._drain_scheduled = False
+        self._writing_paused = False
 
         self._initialized = False
         self._connected_event = asyncio.Event()
@@ -68,7 +183,38 @@ class LauncherServerProtocol(DebugAdapterProtocol):
         Debugger.instance().send_event.add(self.on_debugger_send_event)
 
     def on_debugger_send_event(self, sender: Any, event: Event) -> None:
-        self._loop.call_soon_threadsafe(self.send_event, event)
+        self.send_event(event)
+
+    def send_event(self, event: Event) -> None:
+        if not self._in_loop_thread():
+            self.event_queue.put(event)
+
+            if not self._drain_scheduled:
+                self._drain_scheduled = True
+                self.call_in_loop(self._drain_events)
+        elif not self._writing_paused and not self.event_queue:
+            super().send_event(event)
+        else:
+            # never block the loop, it is the only one that can make room in the queue
+            self.event_queue.put(event, block=False)
+            self._drain_events()
+
+    def _drain_events(self) -> None:
+        self._drain_scheduled = False
+
+        while not self._writing_paused:
+            event = self.event_queue.get_nowait()
+            if event is None:
+                break
+
+            super().send_event(event)
+
+    def pause_writing(self) -> None:
+        self._writing_paused = True
+
+    def resume_writing(self) -> None:
+        self._writing_paused = False
+        self._drain_events()
 
     @property
     def connected(self) -> bool:
@@ -100,6 +246,7 @@ class LauncherServerProtocol(DebugAdapterProtocol):
         super().connection_lost(exc)
 
         self._connected = False
+        self.resume_writing()
 
     @_logger.call
     async def wait_for_client(self, timeout: float = 5) -> bool:
@@ -113,6 +260,12 @@ class LauncherServerProtocol(DebugAdapterProtocol):
 
     @_logger.call
     async def exit(self, exit_code: int) -> None:
+        if self.event_queue.dropped or self.event_queue.coalesced:
+            self._logger.warning(
+                f"event queue overflow: {self.event_queue.dropped} events dropped, "
+                f"{self.event_queue.coalesced} events coalesced, producer blocked {self.event_queue.blocked} times"
+            )
+
         async with self._exited_lock:
             await self.send_event_async(ExitedEvent(body=ExitedEventBody(exit_code=exit_code)))
             self._exited = True
@@ -265,12 +418,14 @@ class LaucherServer(JsonRPCServer[LauncherServerProtocol]):
     def __init__(
         self,
         tcp_params: TcpParams = TcpParams(None, TCP_DEFAULT_PORT),
+        event_queue_size: int = 10000,
+        event_overflow_policy: EventOverflowPolicy = EventOverflowPolicy.BLOCK,
     ):
         super().__init__(
             mode=JsonRpcServerMode.TCP,
             tcp_params=tcp_params,
         )
-        self.protocol = LauncherServerProtocol()
+        self.protocol = LauncherServerProtocol(event_queue_size, event_overflow_policy)
 
     def create_protocol(self) -> LauncherServerProtocol:
         return self.protocol
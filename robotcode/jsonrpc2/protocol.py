@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import asyncio
+import concurrent.futures
+import contextvars
 import inspect
 import json
 import logging
+import queue
 import re
 import threading
 import weakref
@@ -326,6 +329,11 @@ class JsonRPCProtocolBase(asyncio.Protocol, ABC):
         self.write_transport: Optional[asyncio.WriteTransport] = None
         self._message_buf = bytes()
 
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._handoff_queue: queue.SimpleQueue[Tuple[Callable[..., Any], Tuple[Any, ...]]] = queue.SimpleQueue()
+        self._handoff_scheduled = False
+
     @async_event
     async def on_connection_made(sender, transport: asyncio.BaseTransport) -> None:
         ...
@@ -334,9 +342,72 @@ class JsonRPCProtocolBase(asyncio.Protocol, ABC):
     async def on_connection_lost(sender, exc: Optional[BaseException]) -> None:
         ...
 
+    def _bind_to_current_loop(self) -> None:
+        self._loop = asyncio.get_event_loop()
+        self._loop_thread_id = threading.get_ident()
+
+    def _in_loop_thread(self) -> bool:
+        return self._loop_thread_id is None or self._loop_thread_id == threading.get_ident()
+
+    def call_in_loop(self, callback: Callable[..., Any], *args: Any) -> None:
+        """
+        Calls *callback* in the thread of the event loop this protocol is bound to.
+
+        Request bookkeeping and transport writes are only done in the loop thread and are not
+        locked, other threads must use this method to hand over their work.
+        """
+        if self._loop is None or self._in_loop_thread():
+            callback(*args)
+            return
+
+        self._handoff_queue.put((callback, args))
+        if not self._handoff_scheduled:
+            self._handoff_scheduled = True
+            self._loop.call_soon_threadsafe(self._process_handoff_queue)
+
+    def _process_handoff_queue(self) -> None:
+        self._handoff_scheduled = False
+
+        while True:
+            try:
+                callback, args = self._handoff_queue.get_nowait()
+            except queue.Empty:
+                break
+
+            try:
+                callback(*args)
+            except (SystemExit, KeyboardInterrupt):
+                raise
+            except BaseException as e:
+                self._logger.exception(e)
+
+    def _call_in_loop_with_future(self, callback: Callable[[], asyncio.Future[T]]) -> asyncio.Future[T]:
+        concurrent_result: concurrent.futures.Future[T] = concurrent.futures.Future()
+
+        def done(f: asyncio.Future[T]) -> None:
+            if f.cancelled():
+                concurrent_result.cancel()
+            elif f.exception() is not None:
+                concurrent_result.set_exception(cast(BaseException, f.exception()))
+            else:
+                concurrent_result.set_result(f.result())
+
+        self.call_in_loop(lambda: callback().add_done_callback(done))
+
+        return asyncio.wrap_future(concurrent_result)
+
+    def _write(self, data: bytes) -> None:
+        if not self._in_loop_thread():
+            self.call_in_loop(self._write, data)
+            return
+
+        if self.write_transport is not None:
+            self.write_transport.write(data)
+
     @_logger.call
     def connection_made(self, transport: asyncio.BaseTransport) -> None:
         super().connection_made(transport)
+        self._bind_to_current_loop()
         if isinstance(transport, asyncio.ReadTransport):
             self.read_transport = transport
         if isinstance(transport, asyncio.WriteTransport):
@@ -379,80 +450,136 @@ class JsonRPCProtocolBase(asyncio.Protocol, ABC):
                 found.group("charset").decode("ascii") if found and found.group("charset") is not None else self.CHARSET
             )
 
+            content_type = (
+                found.group("content_type").decode("ascii")
+                if found and found.group("content_type") is not None
+                else self.CONTENT_TYPE
+            )
+
             if len(body) < length:
                 return
 
             self._message_logger.debug(
-                lambda: "received ->\n" + self._message_buf.decode(charset).replace("\r\n", "\n")
+                lambda: "received ->\n" + self._message_buf.decode(charset, "replace").replace("\r\n", "\n")
             )
 
             body, data = body[:length], body[length:]
             self._message_buf = bytes()
 
-            self._handle_body(body, charset)
+            self._handle_body(body, charset, content_type)
 
     @abstractmethod
-    def _handle_body(self, body: bytes, charset: str) -> None:
+    def _handle_body(self, body: bytes, charset: str, content_type: str) -> None:
         ...
 
 
+_batch_responses: contextvars.ContextVar[Optional[List[JsonRPCMessage]]] = contextvars.ContextVar(
+    "_batch_responses", default=None
+)
+
+
 class JsonRPCProtocol(JsonRPCProtocolBase):
     _logger = LoggingDescriptor()
 
+    BATCH_MAX_CONCURRENCY = 16
+
     def __init__(self) -> None:
         super().__init__()
-        self._sended_request_lock = threading.RLock()
         self._sended_request: OrderedDict[Union[str, int], SendedRequestEntry] = OrderedDict()
         self._sended_request_count = 0
-        self._received_request_lock = threading.RLock()
         self._received_request: OrderedDict[Union[str, int, None], asyncio.Future[Any]] = OrderedDict()
 
     @staticmethod
-    def _generate_json_rpc_messages_from_dict(
-        data: Union[Dict[Any, Any], List[Dict[Any, Any]]]
-    ) -> Iterator[JsonRPCMessage]:
-        def inner(d: Dict[Any, Any]) -> JsonRPCMessage:
-            if "jsonrpc" in d:
-                if d["jsonrpc"] != PROTOCOL_VERSION:
-                    raise InvalidProtocolVersionError("Invalid JSON-RPC2 protocol version.")
-                d.pop("jsonrpc")
-
-                return from_dict(
-                    d,
-                    (  # type: ignore
-                        JsonRPCRequest,
-                        JsonRPCResponse,
-                        JsonRPCNotification,
-                        JsonRPCError,
-                    ),
-                )
+    def _json_rpc_message_from_dict(d: Any) -> JsonRPCMessage:
+        if isinstance(d, dict) and "jsonrpc" in d:
+            if d["jsonrpc"] != PROTOCOL_VERSION:
+                raise InvalidProtocolVersionError("Invalid JSON-RPC2 protocol version.")
+            d.pop("jsonrpc")
+
+            return from_dict(
+                d,
+                (  # type: ignore
+                    JsonRPCRequest,
+                    JsonRPCResponse,
+                    JsonRPCNotification,
+                    JsonRPCError,
+                ),
+            )
 
-            raise JsonRPCException("Invalid JSON-RPC2 Message")
+        raise JsonRPCException("Invalid JSON-RPC2 Message")
 
+    @classmethod
+    def _generate_json_rpc_messages_from_dict(
+        cls, data: Union[Dict[Any, Any], List[Dict[Any, Any]]]
+    ) -> Iterator[JsonRPCMessage]:
         if isinstance(data, list):
             for e in data:
-                yield inner(e)
+                yield cls._json_rpc_message_from_dict(e)
         else:
-            yield inner(data)
+            yield cls._json_rpc_message_from_dict(data)
 
-    def _handle_body(self, body: bytes, charset: str) -> None:
+    def _handle_body(self, body: bytes, charset: str, content_type: str) -> None:
         try:
-            self._handle_messages(self._generate_json_rpc_messages_from_dict(json.loads(body.decode(charset))))
+            data = json.loads(body.decode(charset))
+            if isinstance(data, list):
+                self._handle_batch(data)
+            else:
+                self._handle_messages(self._generate_json_rpc_messages_from_dict(data))
         except (asyncio.CancelledError, SystemExit, KeyboardInterrupt):
             raise
         except BaseException as e:
             self._logger.exception(e)
             self.send_error(JsonRPCErrors.PARSE_ERROR, f"{type(e).__name__}: {e}")
 
-    def _handle_messages(self, iterator: Iterator[JsonRPCMessage]) -> None:
-        def done(f: asyncio.Future[Any]) -> None:
-            ex = f.exception()
-            if ex is not None and not isinstance(ex, asyncio.CancelledError):
-                self._logger.exception(ex, exc_info=ex)
+    def _task_done(self, f: asyncio.Future[Any]) -> None:
+        ex = f.exception()
+        if ex is not None and not isinstance(ex, asyncio.CancelledError):
+            self._logger.exception(ex, exc_info=ex)
 
+    def _handle_messages(self, iterator: Iterator[JsonRPCMessage]) -> None:
         for m in iterator:
             task = asyncio.create_task(self.handle_message(m))
-            task.add_done_callback(done)
+            task.add_done_callback(self._task_done)
+
+    def _handle_batch(self, data: List[Any]) -> None:
+        if not data:
+            self.send_error(JsonRPCErrors.INVALID_REQUEST, "Invalid Request: empty batch.")
+            return
+
+        semaphore = asyncio.Semaphore(self.BATCH_MAX_CONCURRENCY)
+        slots: List[List[JsonRPCMessage]] = [[] for _ in data]
+
+        async def handle_batch_item(d: Any, slot: List[JsonRPCMessage]) -> None:
+            _batch_responses.set(slot)
+
+            try:
+                message = self._json_rpc_message_from_dict(d)
+            except (SystemExit, KeyboardInterrupt):
+                raise
+            except BaseException as e:
+                self._logger.exception(e)
+                self.send_error(
+                    JsonRPCErrors.INVALID_REQUEST,
+                    f"{type(e).__name__}: {e}",
+                    id=d.get("id", None) if isinstance(d, dict) else None,
+                )
+                return
+
+            async with semaphore:
+                await self.handle_message(message)
+
+        tasks = [asyncio.create_task(handle_batch_item(d, slot)) for d, slot in zip(data, slots)]
+        for t in tasks:
+            t.add_done_callback(self._task_done)
+
+        async def send_batch_response() -> None:
+            await asyncio.wait(tasks)
+
+            responses = [m for slot in slots for m in slot]
+            if responses:
+                self.send_batch(responses)
+
+        asyncio.create_task(send_batch_response()).add_done_callback(self._task_done)
 
     @_logger.call
     async def handle_message(self, message: JsonRPCMessage) -> None:
@@ -492,11 +619,32 @@ class JsonRPCProtocol(JsonRPCProtocolBase):
     def send_message(self, message: JsonRPCMessage) -> None:
         message.jsonrpc = PROTOCOL_VERSION
 
-        body = as_json(
-            message,
-            indent=self._message_logger.is_enabled_for(logging.DEBUG) or None,
-        ).encode(self.CHARSET)
+        if isinstance(message, _JsonRPCResponseBase):
+            batch_responses = _batch_responses.get()
+            if batch_responses is not None:
+                batch_responses.append(message)
+                return
+
+        self._send_body(
+            as_json(
+                message,
+                indent=self._message_logger.is_enabled_for(logging.DEBUG) or None,
+            ).encode(self.CHARSET)
+        )
+
+    @_logger.call
+    def send_batch(self, messages: List[JsonRPCMessage]) -> None:
+        for message in messages:
+            message.jsonrpc = PROTOCOL_VERSION
+
+        self._send_body(
+            as_json(
+                messages,
+                indent=self._message_logger.is_enabled_for(logging.DEBUG) or None,
+            ).encode(self.CHARSET)
+        )
 
+    def _send_body(self, body: bytes) -> None:
         header = (
             f"Content-Length: {len(body)}\r\n" f"Content-Type: {self.CONTENT_TYPE}; charset={self.CHARSET}\r\n\r\n"
         ).encode("ascii")
@@ -505,8 +653,7 @@ class JsonRPCProtocol(JsonRPCProtocolBase):
             lambda: "write ->\n" + (header.decode("ascii") + body.decode(self.CHARSET)).replace("\r\n", "\n")
         )
 
-        if self.write_transport is not None:
-            self.write_transport.write(header + body)
+        self._write(header + body)
 
     def send_request(
         self,
@@ -515,13 +662,15 @@ class JsonRPCProtocol(JsonRPCProtocolBase):
         return_type_or_converter: Optional[Type[TResult]] = None,
     ) -> asyncio.Future[TResult]:
 
+        if not self._in_loop_thread():
+            return self._call_in_loop_with_future(lambda: self.send_request(method, params, return_type_or_converter))
+
         result: asyncio.Future[TResult] = asyncio.get_event_loop().create_future()
 
-        with self._sended_request_lock:
-            self._sended_request_count += 1
-            id = self._sended_request_count
+        self._sended_request_count += 1
+        id = self._sended_request_count
 
-            self._sended_request[id] = SendedRequestEntry(result, return_type_or_converter)
+        self._sended_request[id] = SendedRequestEntry(result, return_type_or_converter)
 
         self.send_message(JsonRPCRequest(id=id, method=method, params=params))
 
@@ -546,8 +695,7 @@ class JsonRPCProtocol(JsonRPCProtocolBase):
             self.send_error(JsonRPCErrors.INTERNAL_ERROR, error)
             return
 
-        with self._sended_request_lock:
-            entry = self._sended_request.pop(message.id, None)
+        entry = self._sended_request.pop(message.id, None)
 
         if entry is None:
             error = f"Invalid response. Could not find id '{message.id}' in our request list."
@@ -640,14 +788,12 @@ class JsonRPCProtocol(JsonRPCProtocolBase):
 
             result = asyncio.create_task(ensure_coroutine(e.method)(*params[0], **params[1]))
 
-            with self._received_request_lock:
-                self._received_request[message.id] = result
+            self._received_request[message.id] = result
 
             try:
                 self.send_response(message.id, await result)
             finally:
-                with self._received_request_lock:
-                    self._received_request.pop(message.id, None)
+                self._received_request.pop(message.id, None)
 
         except asyncio.CancelledError:
             self._logger.info(f"request message {repr(message)} canceled")
@@ -660,14 +806,14 @@ class JsonRPCProtocol(JsonRPCProtocolBase):
             self._logger.exception(e)
             self.send_error(JsonRPCErrors.INTERNAL_ERROR, f"{type(e).__name__}: {e}", id=message.id)
 
-    async def cancel_received_request(self, id: Union[int, str, None]) -> None:
-        with self._received_request_lock:
-            future = self._received_request.get(id, None)
+    async def cancel_received_request(self, id: Union[int, str, None]) -> bool:
+        future = self._received_request.get(id, None)
         if future is not None and not future.cancelled():
-            future.cancel()
+            return future.cancel()
+        return False
 
     async def cancel_all_received_request(self) -> None:
-        for future in self._received_request.values():
+        for future in list(self._received_request.values()):
             if future is not None and not future.cancelled():
                 future.cancel()
 
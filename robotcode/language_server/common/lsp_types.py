@@ -22,6 +22,13 @@ class Model:
         return to_snake_case(s)
 
 
+class ErrorCodes:
+    SERVER_NOT_INITIALIZED = -32002
+    UNKNOWN_ERROR_CODE = -32001
+    REQUEST_CANCELLED = -32800
+    CONTENT_MODIFIED = -32801
+
+
 @dataclass
 class CancelParams(Model):
     id: Union[int, str]
@@ -1,8 +1,21 @@
 from __future__ import annotations
 
+import operator
+from array import array
 from asyncio import CancelledError
 from enum import Enum
-from typing import TYPE_CHECKING, Any, List, Union
+from functools import reduce
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
 
 from ....jsonrpc2.protocol import rpc_method
 from ....utils.async_event import async_tasking_event
@@ -16,6 +29,7 @@ from ..lsp_types import (
     SemanticTokensDelta,
     SemanticTokensDeltaParams,
     SemanticTokensDeltaPartialResult,
+    SemanticTokensEdit,
     SemanticTokensLegend,
     SemanticTokensOptions,
     SemanticTokensOptionsFull,
@@ -34,6 +48,103 @@ if TYPE_CHECKING:
 from .protocol_part import LanguageServerProtocolPart
 
 
+def semantic_tokens_edits(old: Sequence[int], new: Sequence[int]) -> List[SemanticTokensEdit]:
+    """
+    Computes the edits that transform the `old` semantic tokens data into `new`.
+
+    The common prefix and suffix are kept and the part in between is replaced by one edit,
+    an edit typically only changes the tokens of a few lines.
+    """
+
+    if old == new:
+        return []
+
+    max_length = min(len(old), len(new))
+
+    prefix = 0
+    while prefix < max_length and old[prefix] == new[prefix]:
+        prefix += 1
+
+    suffix = 0
+    while suffix < max_length - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+
+    return [
+        SemanticTokensEdit(
+            start=prefix, delete_count=len(old) - prefix - suffix, data=list(new[prefix : len(new) - suffix])
+        )
+    ]
+
+
+class SemanticTokensEncoder:
+    """
+    Encodes semantic tokens in the relative integer format of the LSP specification.
+
+    Token types and modifiers are mapped to precomputed ids and bit masks and the values are written
+    directly into an `array("I")`, so there is no intermediate object per token. Tokens must be added
+    in document order, a token that starts before the previous one is skipped.
+    """
+
+    def __init__(self, token_types: Iterable[Enum], token_modifiers: Iterable[Enum]) -> None:
+        self.type_ids: Dict[Enum, int] = {}
+        for i, t in enumerate(token_types):
+            self.type_ids.setdefault(t, i)
+
+        self.modifier_bits: Dict[Enum, int] = {}
+        for i, m in enumerate(token_modifiers):
+            self.modifier_bits.setdefault(m, 1 << i)
+
+        self._modifier_masks: Dict[Optional[FrozenSet[Enum]], int] = {None: 0}
+
+        self.data = array("I")
+        self._last_line = 0
+        self._last_col = 0
+
+    def modifiers_mask(self, modifiers: Optional[FrozenSet[Enum]]) -> int:
+        result = self._modifier_masks.get(modifiers, None)
+        if result is None:
+            result = self._modifier_masks[modifiers] = reduce(
+                operator.or_, (self.modifier_bits[m] for m in modifiers or ()), 0
+            )
+        return result
+
+    def add(
+        self,
+        line: int,
+        col: int,
+        length: int,
+        token_type: Enum,
+        modifiers: Optional[FrozenSet[Enum]] = None,
+        extra_modifiers: int = 0,
+    ) -> None:
+        last_line = self._last_line
+
+        if length < 0:
+            return
+
+        if line == last_line:
+            if col < self._last_col:
+                return
+            col_delta = col - self._last_col
+        elif line > last_line:
+            col_delta = col
+        else:
+            return
+
+        self.data.extend(
+            (
+                line - last_line,
+                col_delta,
+                length,
+                self.type_ids[token_type],
+                self.modifiers_mask(modifiers) | extra_modifiers,
+            )
+        )
+
+        self._last_line = line
+        self._last_col = col
+
+
 class SemanticTokensProtocolPart(LanguageServerProtocolPart, HasExtendCapabilities):
 
     _logger = LoggingDescriptor()
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any, List, Optional, Union, cast
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, Union, cast
 
 from ...jsonrpc2.protocol import (
     JsonRPCErrorException,
     JsonRPCErrors,
     JsonRPCException,
     JsonRPCProtocol,
+    JsonRPCRequest,
     ProtocolPartDescriptor,
     rpc_method,
 )
@@ -19,6 +20,7 @@ from .lsp_types import (
     CancelParams,
     ClientCapabilities,
     ClientInfo,
+    ErrorCodes,
     InitializedParams,
     InitializeError,
     InitializeParams,
@@ -51,6 +53,7 @@ from .parts.semantic_tokens import SemanticTokensProtocolPart
 from .parts.signature_help import SignatureHelpProtocolPart
 from .parts.window import WindowProtocolPart
 from .parts.workspace import Workspace
+from .text_document import TextDocument
 
 __all__ = ["LanguageServerException", "LanguageServerProtocol", "HasExtendCapabilities"]
 
@@ -81,6 +84,24 @@ class LanguageServerProtocol(JsonRPCProtocol):
     name: Optional[str] = None
     version: Optional[str] = None
 
+    # requests that are answered with a ContentModified error if the document changes while they are running
+    STALE_REQUEST_METHODS: FrozenSet[str] = frozenset(
+        {
+            "textDocument/completion",
+            "textDocument/hover",
+            "textDocument/signatureHelp",
+            "textDocument/definition",
+            "textDocument/declaration",
+            "textDocument/implementation",
+            "textDocument/documentSymbol",
+            "textDocument/foldingRange",
+            "textDocument/codeLens",
+            "textDocument/semanticTokens/full",
+            "textDocument/semanticTokens/full/delta",
+            "textDocument/semanticTokens/range",
+        }
+    )
+
     def __init__(self, server: JsonRPCServer[Any]):
         super().__init__()
         self.server = server
@@ -103,6 +124,9 @@ class LanguageServerProtocol(JsonRPCProtocol):
 
         self._trace = TraceValue.OFF
 
+        self._received_request_documents: Dict[Union[int, str, None], Tuple[TextDocument, int]] = {}
+        self.documents.did_change.add(self._cancel_stale_requests)
+
     @async_event
     async def on_shutdown(sender) -> None:
         ...
@@ -217,6 +241,41 @@ class LanguageServerProtocol(JsonRPCProtocol):
     async def _set_trace(self, value: TraceValue, **kwargs: Any) -> None:
         self.trace = value
 
+    def _get_request_document(self, message: JsonRPCRequest) -> Optional[Tuple[TextDocument, int]]:
+        if message.method not in self.STALE_REQUEST_METHODS or not isinstance(message.params, dict):
+            return None
+
+        text_document = message.params.get("textDocument", None)
+        if not isinstance(text_document, dict) or "uri" not in text_document:
+            return None
+
+        document = self.documents.get(text_document["uri"], None)
+        if document is None or document.version is None:
+            return None
+
+        return document, document.version
+
+    async def handle_request(self, message: JsonRPCRequest) -> None:
+        entry = self._get_request_document(message)
+        if entry is None:
+            return await super().handle_request(message)
+
+        self._received_request_documents[message.id] = entry
+        try:
+            await super().handle_request(message)
+        finally:
+            self._received_request_documents.pop(message.id, None)
+
+    async def _cancel_stale_requests(self, sender: Any, document: TextDocument) -> None:
+        if document.version is None:
+            return
+
+        for id, (d, version) in list(self._received_request_documents.items()):
+            if d is document and version < document.version:
+                if await self.cancel_received_request(id):
+                    self._logger.debug(lambda: f"request {id} canceled, document {document.uri} was modified")
+                    self.send_error(ErrorCodes.CONTENT_MODIFIED, "Content modified.", id=id)
+
     @rpc_method(name="$/cancelRequest", param_type=CancelParams)
     @_logger.call
     async def _cancel_request(self, id: Union[int, str], **kwargs: Any) -> None:
@@ -2,28 +2,43 @@ from __future__ import annotations
 
 import ast
 import asyncio
+import os
+import sys
 import weakref
 from collections import OrderedDict
 from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Callable, Coroutine, List, Optional, Tuple, cast
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Coroutine,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    cast,
+)
 
 from ....utils.async_event import async_tasking_event
 from ....utils.logging import LoggingDescriptor
 from ....utils.path import path_is_relative_to
 from ....utils.uri import Uri
-from ...common.lsp_types import DocumentUri, FileChangeType, FileEvent
+from ...common.lsp_types import DocumentUri, FileChangeType, FileEvent, WatchKind
 from ...common.parts.workspace import FileWatcherEntry
 from ...common.text_document import TextDocument
 from ..configuration import RobotConfig
-from ..utils.async_ast import walk
+from ..utils.visitor import walk
 
 if TYPE_CHECKING:
     from ..protocol import RobotLanguageServerProtocol
     from .namespace import Namespace
 
 from .library_doc import (
+    ALLOWED_LIBRARY_FILE_EXTENSIONS,
+    ALLOWED_RESOURCE_FILE_EXTENSIONS,
     CompleteResult,
     Error,
     KeywordArgumentDoc,
@@ -38,6 +53,7 @@ from .library_doc import (
     get_library_doc,
     init_pool,
     is_embedded_keyword,
+    is_file_like,
 )
 
 RESOURCE_EXTENSIONS = (".resource", ".robot", ".txt", ".tsv", ".rst", ".rest")
@@ -48,6 +64,15 @@ LOAD_LIBRARY_TIME_OUT = 30
 FIND_FILE_TIME_OUT = 10
 COMPLETE_LIBRARY_IMPORT_TIME_OUT = COMPLETE_RESOURCE_IMPORT_TIME_OUT = 10
 
+# the number of cached library/resource import completions per imports manager
+IMPORT_COMPLETIONS_CACHE_SIZE = 32
+
+
+class _ImportCompletionKey(NamedTuple):
+    type: str
+    name: Optional[str]
+    base_dir: str
+
 
 @dataclass()
 class _LibrariesEntryKey:
@@ -361,6 +386,10 @@ class ImportsManager:
         self._resources_lock = asyncio.Lock()
         self._resources: OrderedDict[_ResourcesEntryKey, _ResourcesEntry] = OrderedDict()
         self.file_watchers: List[FileWatcherEntry] = []
+        self._import_completions: OrderedDict[
+            _ImportCompletionKey, asyncio.Task[Optional[List[CompleteResult]]]
+        ] = OrderedDict()
+        self._import_completions_watcher: Optional[FileWatcherEntry] = None
         self._loop = asyncio.get_event_loop()
         self.parent_protocol.documents.did_open.add(self.resource_document_changed)
         self.parent_protocol.documents.did_change.add(self.resource_document_changed)
@@ -533,7 +562,7 @@ class ImportsManager:
 
         errors: List[Error] = []
 
-        async for node in walk(model):
+        for node in walk(model):
             error = node.error if isinstance(node, HasError) else None
             if error is not None:
                 errors.append(Error(message=error, type_name="ModelError", source=source, line_no=node.lineno))
@@ -696,38 +725,118 @@ class ImportsManager:
 
         return await entry.get_libdoc()
 
-    async def complete_library_import(self, name: Optional[str], base_dir: str = ".") -> Optional[List[CompleteResult]]:
-        result = await asyncio.wait_for(
-            self._loop.run_in_executor(
-                self.process_pool,
-                complete_library_import,
-                name,
-                str(self.folder.to_path()),
-                base_dir,
-                self.config.python_path if self.config is not None else None,
-                self.config.env if self.config is not None else None,
-                self.config.variables if self.config is not None else None,
-            ),
-            COMPLETE_LIBRARY_IMPORT_TIME_OUT,
+    def _create_import_completion_task(self, key: _ImportCompletionKey) -> asyncio.Task[Optional[List[CompleteResult]]]:
+        return self._loop.create_task(
+            asyncio.wait_for(
+                self._loop.run_in_executor(
+                    self.process_pool,
+                    complete_library_import if key.type == "Library" else complete_resource_import,
+                    key.name,
+                    str(self.folder.to_path()),
+                    key.base_dir,
+                    self.config.python_path if self.config is not None else None,
+                    self.config.env if self.config is not None else None,
+                    self.config.variables if self.config is not None else None,
+                ),
+                COMPLETE_LIBRARY_IMPORT_TIME_OUT if key.type == "Library" else COMPLETE_RESOURCE_IMPORT_TIME_OUT,
+            )
         )
 
+    def _import_completion_search_paths(self) -> Set[Path]:
+        # the completions run with the workspace folder as working directory, relative paths start there
+        folder = self.folder.to_path()
+
+        return {
+            Path(folder, p).resolve()
+            for p in [str(folder), *(self.config.python_path if self.config is not None else []), *sys.path]
+        }
+
+    def _import_completion_dirs(self, key: _ImportCompletionKey) -> Optional[Set[Path]]:
+        """
+        Returns the directories that are listed for the completion of `key` or `None` if they are not known,
+        because the name contains variables.
+        """
+        if key.name is not None and "${" in key.name:
+            return None
+
+        result: Set[Path] = set()
+
+        if key.name is None or not key.name.startswith((".", "/", os.sep)):
+            name = key.name or ""
+            if key.type == "Library" and not is_file_like(name):
+                name = name.replace(".", os.sep)
+            result.update(Path(p, name).resolve() for p in self._import_completion_search_paths())
+
+        if key.name is None or is_file_like(key.name):
+            result.add(Path(key.base_dir, key.name or key.base_dir).resolve())
+
         return result
 
+    async def _ensure_import_completions_watcher(self) -> None:
+        if self._import_completions_watcher is not None:
+            return
+
+        paths = {str(p) for p in self._import_completion_search_paths() if p.is_dir()}
+
+        self._import_completions_watcher = await self.parent_protocol.workspace.add_file_watchers(
+            self.import_completion_files_changed,
+            [(str(Path(p).joinpath("**")), WatchKind.CREATE | WatchKind.DELETE) for p in sorted(paths)],
+        )
+
+    @staticmethod
+    def _is_import_completion_candidate(change: FileEvent) -> bool:
+        # only created and deleted files and folders that can be imported change the completion of import paths,
+        # not the outputs of a robot run or compiled python files
+        if change.type not in [FileChangeType.CREATED, FileChangeType.DELETED]:
+            return False
+
+        path = Uri(change.uri).to_path()
+        if path.name.startswith(("_", ".")):
+            return False
+
+        return (
+            path.suffix in ALLOWED_LIBRARY_FILE_EXTENSIONS
+            or path.suffix in ALLOWED_RESOURCE_FILE_EXTENSIONS
+            or not path.suffix
+            or change.type == FileChangeType.CREATED
+            and path.is_dir()
+        )
+
+    async def import_completion_files_changed(self, sender: Any, changes: List[FileEvent]) -> None:
+        changed_dirs = {
+            Uri(change.uri).to_path().parent.resolve()
+            for change in changes
+            if self._is_import_completion_candidate(change)
+        }
+        if not changed_dirs:
+            return
+
+        # the completions of the changed directories are created again on the next request
+        for key in list(self._import_completions.keys()):
+            dirs = self._import_completion_dirs(key)
+            if dirs is None or not dirs.isdisjoint(changed_dirs):
+                self._import_completions.pop(key, None)
+
+    async def _complete_import(self, key: _ImportCompletionKey) -> Optional[List[CompleteResult]]:
+        task = self._import_completions.get(key, None)
+
+        if task is None or task.done() and (task.cancelled() or task.exception() is not None):
+            task = self._import_completions[key] = self._create_import_completion_task(key)
+
+            while len(self._import_completions) > IMPORT_COMPLETIONS_CACHE_SIZE:
+                self._import_completions.popitem(last=False)
+
+            await self._ensure_import_completions_watcher()
+        else:
+            self._import_completions.move_to_end(key)
+
+        # the task is shared between requests, a canceled request must not cancel it
+        return await asyncio.shield(task)
+
+    async def complete_library_import(self, name: Optional[str], base_dir: str = ".") -> Optional[List[CompleteResult]]:
+        return await self._complete_import(_ImportCompletionKey("Library", name, base_dir))
+
     async def complete_resource_import(
         self, name: Optional[str], base_dir: str = "."
     ) -> Optional[List[CompleteResult]]:
-        result = await asyncio.wait_for(
-            self._loop.run_in_executor(
-                self.process_pool,
-                complete_resource_import,
-                name,
-                str(self.folder.to_path()),
-                base_dir,
-                self.config.python_path if self.config is not None else None,
-                self.config.env if self.config is not None else None,
-                self.config.variables if self.config is not None else None,
-            ),
-            COMPLETE_RESOURCE_IMPORT_TIME_OUT,
-        )
-
-        return result
+        return await self._complete_import(_ImportCompletionKey("Resource", name, base_dir))
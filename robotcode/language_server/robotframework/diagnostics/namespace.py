@@ -43,6 +43,7 @@ from ..utils.ast import (
     tokenize_variables,
 )
 from ..utils.async_ast import AsyncVisitor
+from ..utils.visitor import Visitor
 from .imports_manager import ImportsManager
 from .library_doc import (
     BUILTIN_LIBRARY_NAME,
@@ -195,20 +196,20 @@ class NameSpaceError(Exception):
     pass
 
 
-class VariablesVisitor(AsyncVisitor):
-    async def get(self, source: str, model: ast.AST) -> List[VariableDefinition]:
+class VariablesVisitor(Visitor):
+    def get(self, source: str, model: ast.AST) -> List[VariableDefinition]:
         self._results: List[VariableDefinition] = []
         self.source = source
-        await self.visit(model)
+        self.visit(model)
         return self._results
 
-    async def visit_Section(self, node: ast.AST) -> None:  # noqa: N802
+    def visit_Section(self, node: ast.AST) -> None:  # noqa: N802
         from robot.parsing.model.blocks import VariableSection
 
         if isinstance(node, VariableSection):
-            await self.generic_visit(node)
+            self.generic_visit(node)
 
-    async def visit_Variable(self, node: ast.AST) -> None:  # noqa: N802
+    def visit_Variable(self, node: ast.AST) -> None:  # noqa: N802
         from robot.parsing.lexer.tokens import Token
         from robot.parsing.model.statements import Variable
 
@@ -228,22 +229,22 @@ class VariablesVisitor(AsyncVisitor):
             )
 
 
-class BlockVariableVisitor(AsyncVisitor):
-    async def get(self, source: str, model: ast.AST, position: Optional[Position] = None) -> List[VariableDefinition]:
+class BlockVariableVisitor(Visitor):
+    def get(self, source: str, model: ast.AST, position: Optional[Position] = None) -> List[VariableDefinition]:
         self.source = source
         self.position = position
 
         self._results: List[VariableDefinition] = []
 
-        await self.visit(model)
+        self.visit(model)
 
         return self._results
 
-    async def visit(self, node: ast.AST) -> None:
+    def visit(self, node: ast.AST) -> None:
         if self.position is None or self.position >= range_from_node(node).start:
-            return await super().visit(node)
+            return super().visit(node)
 
-    async def visit_KeywordName(self, node: ast.AST) -> None:  # noqa: N802
+    def visit_KeywordName(self, node: ast.AST) -> None:  # noqa: N802
         from robot.parsing.lexer.tokens import Token as RobotToken
         from robot.parsing.model.statements import KeywordName
         from robot.variables.search import VariableSearcher
@@ -283,7 +284,7 @@ class BlockVariableVisitor(AsyncVisitor):
                         )
                     )
 
-    async def visit_Arguments(self, node: ast.AST) -> None:  # noqa: N802
+    def visit_Arguments(self, node: ast.AST) -> None:  # noqa: N802
         from robot.errors import VariableError
         from robot.parsing.lexer.tokens import Token as RobotToken
         from robot.parsing.model.statements import Arguments
@@ -329,7 +330,7 @@ class BlockVariableVisitor(AsyncVisitor):
             except VariableError:
                 pass
 
-    async def visit_KeywordCall(self, node: ast.AST) -> None:  # noqa: N802
+    def visit_KeywordCall(self, node: ast.AST) -> None:  # noqa: N802
         from robot.errors import VariableError
         from robot.parsing.lexer.tokens import Token as RobotToken
         from robot.parsing.model.statements import KeywordCall
@@ -361,7 +362,7 @@ class BlockVariableVisitor(AsyncVisitor):
         except VariableError:
             pass
 
-    async def visit_ForHeader(self, node: ast.AST) -> None:  # noqa: N802
+    def visit_ForHeader(self, node: ast.AST) -> None:  # noqa: N802
         from robot.errors import VariableError
         from robot.parsing.lexer.tokens import Token as RobotToken
         from robot.parsing.model.statements import ForHeader
@@ -395,20 +396,20 @@ class BlockVariableVisitor(AsyncVisitor):
             pass
 
 
-class ImportVisitor(AsyncVisitor):
-    async def get(self, source: str, model: ast.AST) -> List[Import]:
+class ImportVisitor(Visitor):
+    def get(self, source: str, model: ast.AST) -> List[Import]:
         self._results: List[Import] = []
         self.source = source
-        await self.visit(model)
+        self.visit(model)
         return self._results
 
-    async def visit_Section(self, node: ast.AST) -> None:  # noqa: N802
+    def visit_Section(self, node: ast.AST) -> None:  # noqa: N802
         from robot.parsing.model.blocks import SettingSection
 
         if isinstance(node, SettingSection):
-            await self.generic_visit(node)
+            self.generic_visit(node)
 
-    async def visit_LibraryImport(self, node: ast.AST) -> None:  # noqa: N802
+    def visit_LibraryImport(self, node: ast.AST) -> None:  # noqa: N802
         from robot.parsing.lexer.tokens import Token as RobotToken
         from robot.parsing.model.statements import LibraryImport as RobotLibraryImport
 
@@ -429,7 +430,7 @@ class ImportVisitor(AsyncVisitor):
             )
         )
 
-    async def visit_ResourceImport(self, node: ast.AST) -> None:  # noqa: N802
+    def visit_ResourceImport(self, node: ast.AST) -> None:  # noqa: N802
         from robot.parsing.lexer.tokens import Token as RobotToken
         from robot.parsing.model.statements import ResourceImport as RobotResourceImport
 
@@ -448,7 +449,7 @@ class ImportVisitor(AsyncVisitor):
             )
         )
 
-    async def visit_VariablesImport(self, node: ast.AST) -> None:  # noqa: N802
+    def visit_VariablesImport(self, node: ast.AST) -> None:  # noqa: N802
         from robot.parsing.lexer.tokens import Token as RobotToken
         from robot.parsing.model.statements import (
             VariablesImport as RobotVariablesImport,
@@ -472,6 +473,8 @@ class ImportVisitor(AsyncVisitor):
 
 
 class Analyzer(AsyncVisitor):
+    yield_every = 100
+
     async def get(self, model: ast.AST, namespace: Namespace) -> List[Diagnostic]:
         self._results: List[Diagnostic] = []
         self._namespace = namespace
@@ -985,13 +988,13 @@ class Namespace:
 
     async def get_imports(self) -> List[Import]:
         if self._imports is None:
-            self._imports = await ImportVisitor().get(self.source, self.model)
+            self._imports = ImportVisitor().get(self.source, self.model)
 
         return self._imports
 
     async def get_own_variables(self) -> List[VariableDefinition]:
         if self._own_variables is None:
-            self._own_variables = await VariablesVisitor().get(self.source, self.model)
+            self._own_variables = VariablesVisitor().get(self.source, self.model)
 
         return self._own_variables
 
@@ -1024,7 +1027,7 @@ class Namespace:
 
         async for var in async_chain(
             *[
-                await BlockVariableVisitor().get(self.source, n, position)
+                BlockVariableVisitor().get(self.source, n, position)
                 for n in nodes or []
                 if isinstance(n, (Keyword, TestCase))
             ],
@@ -1416,8 +1419,15 @@ class Namespace:
 
         return await KeywordFinder(self).find_keyword(name)
 
-    async def find_keyword_threadsafe(self, name: Optional[str]) -> Optional[KeywordDoc]:
-        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self.find_keyword(name), self._loop))
+    async def get_keyword_lookup(self, names: Iterable[str]) -> Dict[str, Optional[KeywordDoc]]:
+        """
+        Resolves the given keyword names at once, the result can be used as snapshot outside of the event loop.
+        """
+        await self.ensure_initialized()
+
+        finder = KeywordFinder(self)
+
+        return {name: await finder.find_keyword(name) for name in set(names)}
 
 
 class DiagnosticsEntry(NamedTuple):
@@ -2,18 +2,19 @@ from __future__ import annotations
 
 import ast
 import asyncio
-import builtins
 import itertools
 import os
 import weakref
+from dataclasses import replace
 from typing import (
     TYPE_CHECKING,
     Any,
     AsyncIterator,
     Awaitable,
     Callable,
-    Iterator,
+    Dict,
     List,
+    NamedTuple,
     Optional,
     Tuple,
     Type,
@@ -43,8 +44,9 @@ from ..diagnostics.library_doc import (
     CompleteResultKind,
     KeywordArgumentKind,
     KeywordDoc,
+    LibraryDoc,
 )
-from ..diagnostics.namespace import VariableDefinitionType
+from ..diagnostics.namespace import Namespace, VariableDefinitionType
 from ..utils.ast import (
     Token,
     get_nodes_at_position,
@@ -53,6 +55,12 @@ from ..utils.ast import (
     whitespace_at_begin_of_token,
     whitespace_from_begin_of_token,
 )
+from ..utils.completion_index import (
+    CompletionIndex,
+    CompletionResolveTable,
+    CompositeCompletionIndex,
+    split_bdd_prefix,
+)
 from .model_helper import ModelHelperMixin
 
 if TYPE_CHECKING:
@@ -114,17 +122,32 @@ SETTINGS = [
 TESTCASE_SETTINGS = ["Documentation", "Tags", "Setup", "Teardown", "Template", "Timeout"]
 KEYWORD_SETTINGS = ["Documentation", "Tags", "Arguments", "Return", "Teardown", "Timeout"]
 
+# the maximum number of keywords returned by one request, if there are more the list is marked as incomplete
+MAX_KEYWORD_COMPLETION_ITEMS = 200
+
 SNIPPETS = {
     "FOR": [r"FOR  \${${1}}  ${2|IN,IN ENUMERATE,IN RANGE,IN ZIP|}  ${3:arg}", "$0", "END", ""],
     "IF": [r"IF  \${${1}}", "$0", "END", ""],
 }
 
 
+class _LibraryCompletionIndexes(NamedTuple):
+    library_doc: weakref.ref[LibraryDoc]
+    indexes: Dict[Tuple[str, Optional[str]], CompletionIndex]
+
+
 class CompletionCollector(ModelHelperMixin):
     _logger = LoggingDescriptor()
 
+    _keyword_completion_indexes: weakref.WeakKeyDictionary[
+        Namespace, Dict[Tuple[Optional[str], bool], CompositeCompletionIndex]
+    ] = weakref.WeakKeyDictionary()
+
+    _resolve_table = CompletionResolveTable()
+
     def __init__(self, parent: RobotLanguageServerProtocol, document: Optional[TextDocument] = None) -> None:
         self.parent = parent
+        self.is_incomplete = False
         self._section_style: Optional[str] = None
         self._document = weakref.ref(document) if document is not None else None
 
@@ -182,13 +205,20 @@ class CompletionCollector(ModelHelperMixin):
             if r is not None:
                 yield r
 
-        result = CompletionList(is_incomplete=False, items=[e async for e in async_chain_iterator(iter_results())])
-        if not result.items:
+        items = [e async for e in async_chain_iterator(iter_results())]
+        if not items:
             return None
-        return result
+        return CompletionList(is_incomplete=self.is_incomplete, items=items)
 
     async def resolve(self, completion_item: CompletionItem) -> CompletionItem:
         if completion_item.data is not None:
+            key = completion_item.data.get("id", None)
+            if key is not None:
+                markdown = self._resolve_table.get_markdown(key)
+                if markdown is not None:
+                    completion_item.documentation = MarkupContent(kind=MarkupKind.MARKDOWN, value=markdown)
+                    return completion_item
+
             document_uri = completion_item.data.get("document_uri", None)
             if document_uri is not None:
                 document = self.parent.documents.get(document_uri, None)
@@ -240,11 +270,10 @@ class CompletionCollector(ModelHelperMixin):
                                     kind=MarkupKind.MARKDOWN, value=f"Error:\n{e}"
                                 )
                     elif type in [CompleteResultKind.KEYWORD.name]:
-                        libname = completion_item.data.get("libname", None)
                         name = completion_item.data.get("name", None)
                         namespace = await self.parent.documents_cache.get_namespace(document)
 
-                        if libname is not None and name is not None and namespace is not None:
+                        if name is not None and namespace is not None:
                             try:
                                 kw_doc = next(
                                     (kw for kw in await namespace.get_keywords() if kw.name == name),
@@ -388,12 +417,224 @@ class CompletionCollector(ModelHelperMixin):
             for setting in KEYWORD_SETTINGS
         ]
 
+    def _create_keyword_index_item(
+        self,
+        kw: KeywordDoc,
+        document_uri: str,
+        detail: str,
+        deprecated: Optional[bool],
+        qualified_name: Optional[str] = None,
+    ) -> Tuple[str, CompletionItem]:
+        return (
+            qualified_name or kw.name,
+            CompletionItem(
+                label=kw.name,
+                kind=CompletionItemKind.FUNCTION,
+                detail=detail,
+                deprecated=deprecated,
+                sort_text=f"020_{qualified_name or kw.name}",
+                filter_text=qualified_name,
+                insert_text=qualified_name,
+                insert_text_format=InsertTextFormat.PLAINTEXT,
+                data={
+                    "document_uri": document_uri,
+                    "type": CompleteResultKind.KEYWORD.name,
+                    "id": self._resolve_table.add(kw, lambda d: d.to_markdown()),
+                    "name": kw.name,
+                },
+            ),
+        )
+
+    def _create_library_index_items(
+        self, library_doc: LibraryDoc, kind: str, name: Optional[str]
+    ) -> List[Tuple[str, CompletionItem]]:
+        if self.document is None:
+            return []
+
+        document_uri = str(self.document.uri)
+        result: List[Tuple[str, CompletionItem]] = []
+
+        for kw in library_doc.keywords.values():
+            if kw.is_error_handler:
+                continue
+
+            if kind == "library":
+                result.append(self._create_keyword_index_item(kw, document_uri, CompleteResultKind.KEYWORD.value, None))
+            elif kind == "qualified":
+                result.append(
+                    self._create_keyword_index_item(
+                        kw,
+                        document_uri,
+                        f"{CompleteResultKind.KEYWORD.value} ({name})",
+                        kw.is_deprecated,
+                        f"{name}.{kw.name}",
+                    )
+                )
+            else:
+                result.append(
+                    self._create_keyword_index_item(
+                        kw,
+                        document_uri,
+                        f"{CompleteResultKind.KEYWORD.value} {f'({kw.libname})' if kw.libname is not None else ''}",
+                        kw.is_deprecated,
+                    )
+                )
+
+        return result
+
+    async def _create_document_index_items(self, namespace: Namespace) -> List[Tuple[str, CompletionItem]]:
+        if self.document is None:
+            return []
+
+        document_uri = str(self.document.uri)
+
+        result = self._create_library_index_items(await namespace.get_library_doc(), "keywords", None)
+
+        # the documentation of libraries and resources is created on resolve
+        for k, v in (await namespace.get_libraries()).items():
+            result.append(
+                (
+                    k,
+                    CompletionItem(
+                        label=k,
+                        kind=CompletionItemKind.MODULE,
+                        detail="Library",
+                        sort_text=f"030_{k}",
+                        deprecated=v.library_doc.is_deprecated,
+                        insert_text_format=InsertTextFormat.PLAINTEXT,
+                        data={
+                            "document_uri": document_uri,
+                            "type": CompleteResultKind.MODULE.name,
+                            "id": self._resolve_table.add(v.library_doc, lambda d: d.to_markdown(False)),
+                            "name": v.name,
+                        },
+                    ),
+                )
+            )
+
+        for k, v in (await namespace.get_resources()).items():
+            result.append(
+                (
+                    k,
+                    CompletionItem(
+                        label=k,
+                        kind=CompletionItemKind.MODULE,
+                        detail="Resource",
+                        deprecated=v.library_doc.is_deprecated,
+                        sort_text=f"030_{k}",
+                        insert_text_format=InsertTextFormat.PLAINTEXT,
+                        data={
+                            "document_uri": document_uri,
+                            "type": CompleteResultKind.RESOURCE.name,
+                            "id": self._resolve_table.add(v.library_doc, lambda d: d.to_markdown()),
+                            "name": v.name,
+                        },
+                    ),
+                )
+            )
+
+        return result
+
+    def _get_library_completion_indexes(self) -> Dict[int, _LibraryCompletionIndexes]:
+        if self.document is None:
+            return {}
+
+        return cast(Dict[int, _LibraryCompletionIndexes], self.document.get_data(CompletionCollector, {}))
+
+    async def _update_library_completion_indexes(self, namespace: Namespace) -> None:
+        """
+        Keeps the cached indexes of the libraries and resources that are still imported by the document.
+        """
+        if self.document is None:
+            return
+
+        old = self._get_library_completion_indexes()
+        result: Dict[int, _LibraryCompletionIndexes] = {}
+
+        for entry in itertools.chain(
+            (await namespace.get_resources()).values(), (await namespace.get_libraries()).values()
+        ):
+            key = id(entry.library_doc)
+            indexes = old.get(key, None)
+            if indexes is None or indexes.library_doc() is not entry.library_doc:
+                indexes = _LibraryCompletionIndexes(weakref.ref(entry.library_doc), {})
+            result[key] = indexes
+
+        self.document.set_data(CompletionCollector, result)
+
+    def get_library_completion_index(self, library_doc: LibraryDoc, kind: str, name: Optional[str]) -> CompletionIndex:
+        """
+        Returns the index of the keywords of a library or resource, `kind` is `keywords` for the keyword names,
+        `library` for the completion after `name.` and `qualified` for the names qualified with `name`.
+
+        The indexes are cached per document, as long as the library doc does not change.
+        """
+        libraries = self._get_library_completion_indexes()
+
+        entry = libraries.get(id(library_doc), None)
+        if entry is None or entry.library_doc() is not library_doc:
+            entry = _LibraryCompletionIndexes(weakref.ref(library_doc), {})
+            if self.document is not None:
+                libraries[id(library_doc)] = entry
+                self.document.set_data(CompletionCollector, libraries)
+
+        result = entry.indexes.get((kind, name), None)
+        if result is None:
+            result = entry.indexes[(kind, name)] = CompletionIndex(
+                self._create_library_index_items(library_doc, kind, name)
+            )
+
+        return result
+
+    async def _create_keyword_completion_index(
+        self, namespace: Namespace, library_name: Optional[str], qualified: bool
+    ) -> CompositeCompletionIndex:
+        libraries = await namespace.get_libraries()
+        resources = await namespace.get_resources()
+
+        if library_name is not None:
+            entry = libraries[library_name] if library_name in libraries else resources[library_name]
+            return CompositeCompletionIndex([self.get_library_completion_index(entry.library_doc, "library", None)])
+
+        # only the keywords of the document itself are indexed again after an edit, the order of the indexes is
+        # the order the namespace searches for keywords
+        indexes = [
+            CompletionIndex(await self._create_document_index_items(namespace)),
+            *(
+                self.get_library_completion_index(e.library_doc, "keywords", None)
+                for e in itertools.chain(resources.values(), libraries.values())
+            ),
+        ]
+
+        if qualified:
+            indexes += [
+                self.get_library_completion_index(v.library_doc, "qualified", k)
+                for k, v in itertools.chain(libraries.items(), resources.items())
+            ]
+
+        return CompositeCompletionIndex(indexes)
+
+    async def get_keyword_completion_index(
+        self, namespace: Namespace, library_name: Optional[str] = None, qualified: bool = False
+    ) -> CompositeCompletionIndex:
+        indexes = self._keyword_completion_indexes.get(namespace, None)
+        if indexes is None:
+            await self._update_library_completion_indexes(namespace)
+            indexes = self._keyword_completion_indexes[namespace] = {}
+
+        result = indexes.get((library_name, qualified), None)
+        if result is None:
+            result = indexes[(library_name, qualified)] = await self._create_keyword_completion_index(
+                namespace, library_name, qualified
+            )
+
+        return result
+
     async def create_keyword_completion_items(
         self,
         token: Optional[Token],
         position: Position,
     ) -> List[CompletionItem]:
-        result: List[CompletionItem] = []
         if self.document is None:
             return []
 
@@ -402,137 +643,56 @@ class CompletionCollector(ModelHelperMixin):
             return []
 
         r: Optional[Range] = None
+        library_name: Optional[str] = None
+        qualified = False
+        prefix = ""
 
         # TODO: create Snippet for embedded keywords?
 
         if token is not None:
             r = range_from_token(token)
 
-            if r is not None and "." in token.value:
+            bdd_prefix, value = split_bdd_prefix(token.value)
+            if position.character < r.start.character + len(bdd_prefix):
+                bdd_prefix, value = "", token.value
 
-                def enumerate_indexes(s: str, c: str) -> Iterator[int]:
-                    for i in builtins.range(len(s)):
-                        if s[i] == c:
-                            yield i
+            r.start.character += len(bdd_prefix)
+            prefix = value[: max(position.character - r.start.character, 0)]
 
-                lib_name_index = -1
-                for e in enumerate_indexes(token.value, "."):
-                    e += r.start.character
-                    if position.character > e > lib_name_index:
-                        lib_name_index = e
+            if "." in prefix:
+                qualified = True
 
-                if lib_name_index >= 0:
-                    library_name = token.value[0 : lib_name_index - r.start.character]  # noqa: E203
+                lib_name_index = prefix.rindex(".")
+                name = prefix[:lib_name_index]
 
-                    libraries = await namespace.get_libraries()
+                libraries = await namespace.get_libraries()
 
-                    library_name = next(
-                        (e for e in libraries.keys() if e.casefold() == library_name.casefold()), library_name
-                    )
+                name = next((e for e in libraries.keys() if e.casefold() == name.casefold()), name)
 
-                    if library_name in libraries:
-                        r.start.character = lib_name_index + 1
-                        for kw in libraries[library_name].library_doc.keywords.values():
-                            if kw.is_error_handler:
-                                continue
-                            c = CompletionItem(
-                                label=kw.name,
-                                kind=CompletionItemKind.FUNCTION,
-                                detail=CompleteResultKind.KEYWORD.value,
-                                sort_text=f"020_{kw.name}",
-                                insert_text_format=InsertTextFormat.PLAINTEXT,
-                                text_edit=TextEdit(range=r, new_text=kw.name) if r is not None else None,
-                                data={
-                                    "document_uri": str(self.document.uri),
-                                    "type": CompleteResultKind.KEYWORD.name,
-                                    "libname": kw.libname,
-                                    "name": kw.name,
-                                },
-                            )
-                            result.append(c)
-                        return result
-
-                    resources = await namespace.get_resources()
-                    if library_name in resources:
-                        r.start.character = lib_name_index + 1
-                        for kw in resources[library_name].library_doc.keywords.values():
-                            if kw.is_error_handler:
-                                continue
-                            c = CompletionItem(
-                                label=kw.name,
-                                kind=CompletionItemKind.FUNCTION,
-                                detail=CompleteResultKind.KEYWORD.value,
-                                sort_text=f"020_{kw.name}",
-                                insert_text_format=InsertTextFormat.PLAINTEXT,
-                                text_edit=TextEdit(range=r, new_text=kw.name) if r is not None else None,
-                                data={
-                                    "document_uri": str(self.document.uri),
-                                    "type": CompleteResultKind.KEYWORD.name,
-                                    "libname": kw.libname,
-                                    "name": kw.name,
-                                },
-                            )
-                            result.append(c)
-                        return result
-
-        for kw in await namespace.get_keywords():
-            if kw.is_error_handler:
-                continue
+                if name in libraries or name in await namespace.get_resources():
+                    library_name = name
+                    qualified = False
+                    r.start.character += lib_name_index + 1
+                    prefix = prefix[lib_name_index + 1 :]  # noqa: E203
 
-            c = CompletionItem(
-                label=kw.name,
-                kind=CompletionItemKind.FUNCTION,
-                detail=f"{CompleteResultKind.KEYWORD.value} {f'({kw.libname})' if kw.libname is not None else ''}",
-                deprecated=kw.is_deprecated,
-                sort_text=f"020_{kw.name}",
-                insert_text_format=InsertTextFormat.PLAINTEXT,
-                text_edit=TextEdit(range=r, new_text=kw.name) if r is not None else None,
-                data={
-                    "document_uri": str(self.document.uri),
-                    "type": CompleteResultKind.KEYWORD.name,
-                    "libname": kw.libname,
-                    "name": kw.name,
-                },
-            )
-            result.append(c)
+        index = await self.get_keyword_completion_index(namespace, library_name, qualified)
 
-        for k, v in (await namespace.get_libraries()).items():
-            c = CompletionItem(
-                label=k,
-                kind=CompletionItemKind.MODULE,
-                detail="Library",
-                sort_text=f"030_{k}",
-                deprecated=v.library_doc.is_deprecated,
-                documentation=MarkupContent(kind=MarkupKind.MARKDOWN, value=v.library_doc.to_markdown()),
-                insert_text_format=InsertTextFormat.PLAINTEXT,
-                text_edit=TextEdit(range=r, new_text=k) if r is not None else None,
-                data={
-                    "document_uri": str(self.document.uri),
-                    "type": CompleteResultKind.MODULE.name,
-                    "name": v.name,
-                },
-            )
-            result.append(c)
+        items, incomplete = index.find(prefix, MAX_KEYWORD_COMPLETION_ITEMS)
+        if incomplete:
+            self.is_incomplete = True
 
-        for k, v in (await namespace.get_resources()).items():
-            c = CompletionItem(
-                label=k,
-                kind=CompletionItemKind.MODULE,
-                detail="Resource",
-                deprecated=v.library_doc.is_deprecated,
-                sort_text=f"030_{k}",
-                documentation=MarkupContent(kind=MarkupKind.MARKDOWN, value=v.library_doc.to_markdown()),
-                insert_text_format=InsertTextFormat.PLAINTEXT,
-                text_edit=TextEdit(range=r, new_text=k) if r is not None else None,
-                data={
-                    "document_uri": str(self.document.uri),
-                    "type": CompleteResultKind.RESOURCE.name,
-                    "name": v.name,
-                },
-            )
-            result.append(c)
+        if r is None:
+            return items
 
-        return result
+        return [
+            replace(
+                item,
+                text_edit=TextEdit(range=r, new_text=item.insert_text or item.label),
+                # keep the ranking of the matches
+                sort_text=f"020_{i:04}" if prefix else item.sort_text,
+            )
+            for i, item in enumerate(items)
+        ]
 
     async def complete_default(
         self,
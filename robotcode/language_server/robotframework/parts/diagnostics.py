@@ -116,21 +116,21 @@ class RobotDiagnosticsProtocolPart(RobotLanguageServerProtocolPart):
     @_logger.call
     async def collect_model_errors(self, sender: Any, document: TextDocument) -> DiagnosticsResult:
         from ..utils.ast import HasError, HasErrors
-        from ..utils.async_ast import AsyncVisitor
+        from ..utils.visitor import Visitor as _Visitor
 
-        class Visitor(AsyncVisitor):
+        class Visitor(_Visitor):
             def __init__(self, parent: RobotDiagnosticsProtocolPart) -> None:
                 super().__init__()
                 self.parent = parent
                 self.errors: List[Diagnostic] = []
 
             @classmethod
-            async def find_from(cls, model: ast.AST, parent: RobotDiagnosticsProtocolPart) -> List[Diagnostic]:
+            def find_from(cls, model: ast.AST, parent: RobotDiagnosticsProtocolPart) -> List[Diagnostic]:
                 finder = cls(parent)
-                await finder.visit(model)
+                finder.visit(model)
                 return finder.errors
 
-            async def generic_visit(self, node: ast.AST) -> None:
+            def generic_visit(self, node: ast.AST) -> None:
                 error = node.error if isinstance(node, HasError) else None
                 if error is not None:
                     self.errors.append(self.parent._create_error_from_node(node, error))
@@ -139,22 +139,22 @@ class RobotDiagnosticsProtocolPart(RobotLanguageServerProtocolPart):
                 if errors is not None:
                     for e in errors:
                         self.errors.append(self.parent._create_error_from_node(node, e))
-                await super().generic_visit(node)
+                super().generic_visit(node)
 
         return DiagnosticsResult(
             self.collect_model_errors,
-            await Visitor.find_from(await self.parent.documents_cache.get_model(document), self),
+            Visitor.find_from(await self.parent.documents_cache.get_model(document), self),
         )
 
     @language_id("robotframework")
     @_logger.call
     async def collect_walk_model_errors(self, sender: Any, document: TextDocument) -> DiagnosticsResult:
         from ..utils.ast import HasError, HasErrors
-        from ..utils.async_ast import walk
+        from ..utils.visitor import walk
 
         result: List[Diagnostic] = []
 
-        async for node in walk(await self.parent.documents_cache.get_model(document)):
+        for node in walk(await self.parent.documents_cache.get_model(document)):
             error = node.error if isinstance(node, HasError) else None
             if error is not None:
                 result.append(self._create_error_from_node(node, error))
@@ -28,9 +28,9 @@ class RobotDocumentSymbolsProtocolPart(RobotLanguageServerProtocolPart):
         self, sender: Any, document: TextDocument
     ) -> Optional[Union[List[DocumentSymbol], List[SymbolInformation], None]]:
 
-        from ..utils.async_ast import AsyncVisitor
+        from ..utils.visitor import Visitor as _Visitor
 
-        class Visitor(AsyncVisitor):
+        class Visitor(_Visitor):
             def __init__(self, parent: RobotDocumentSymbolsProtocolPart) -> None:
                 super().__init__()
                 self.parent = parent
@@ -39,16 +39,16 @@ class RobotDocumentSymbolsProtocolPart(RobotLanguageServerProtocolPart):
                 self.current_symbol: Optional[DocumentSymbol] = None
 
             @classmethod
-            async def find_from(
+            def find_from(
                 cls, model: ast.AST, parent: RobotDocumentSymbolsProtocolPart
             ) -> Optional[List[DocumentSymbol]]:
                 finder = cls(parent)
 
-                await finder.visit(model)
+                finder.visit(model)
 
                 return finder.result if finder.result else None
 
-            async def visit_Section(self, node: ast.AST) -> None:  # noqa: N802
+            def visit_Section(self, node: ast.AST) -> None:  # noqa: N802
                 from robot.parsing.model.blocks import Section
                 from robot.parsing.model.statements import SectionHeader
 
@@ -68,11 +68,11 @@ class RobotDocumentSymbolsProtocolPart(RobotLanguageServerProtocolPart):
                 self.result.append(symbol)
                 self.current_symbol = symbol
                 try:
-                    await self.generic_visit(node)
+                    self.generic_visit(node)
                 finally:
                     self.current_symbol = None
 
-            async def visit_TestCase(self, node: ast.AST) -> None:  # noqa: N802
+            def visit_TestCase(self, node: ast.AST) -> None:  # noqa: N802
                 from robot.parsing.model.blocks import TestCase
 
                 testcase = cast(TestCase, node)
@@ -84,7 +84,7 @@ class RobotDocumentSymbolsProtocolPart(RobotLanguageServerProtocolPart):
                     symbol = DocumentSymbol(name=testcase.name, kind=SymbolKind.METHOD, range=r, selection_range=r)
                     self.current_symbol.children.append(symbol)
 
-            async def visit_Keyword(self, node: ast.AST) -> None:  # noqa: N802
+            def visit_Keyword(self, node: ast.AST) -> None:  # noqa: N802
                 from robot.parsing.model.blocks import Keyword
 
                 keyword = cast(Keyword, node)
@@ -96,4 +96,4 @@ class RobotDocumentSymbolsProtocolPart(RobotLanguageServerProtocolPart):
                     symbol = DocumentSymbol(name=keyword.name, kind=SymbolKind.FUNCTION, range=r, selection_range=r)
                     self.current_symbol.children.append(symbol)
 
-        return await Visitor.find_from(await self.parent.documents_cache.get_model(document), self)
+        return Visitor.find_from(await self.parent.documents_cache.get_model(document), self)
@@ -25,9 +25,9 @@ class RobotFoldingRangeProtocolPart(RobotLanguageServerProtocolPart):
     @language_id("robotframework")
     async def collect(self, sender: Any, document: TextDocument) -> Optional[List[FoldingRange]]:
 
-        from ..utils.async_ast import AsyncVisitor
+        from ..utils.visitor import Visitor as _Visitor
 
-        class Visitor(AsyncVisitor):
+        class Visitor(_Visitor):
             def __init__(self, parent: RobotFoldingRangeProtocolPart) -> None:
                 super().__init__()
                 self.parent = parent
@@ -46,12 +46,10 @@ class RobotFoldingRangeProtocolPart(RobotLanguageServerProtocolPart):
                 self.result: List[FoldingRange] = []
 
             @classmethod
-            async def find_from(
-                cls, model: ast.AST, parent: RobotFoldingRangeProtocolPart
-            ) -> Optional[List[FoldingRange]]:
+            def find_from(cls, model: ast.AST, parent: RobotFoldingRangeProtocolPart) -> Optional[List[FoldingRange]]:
                 finder = cls(parent)
 
-                await finder.visit(model)
+                finder.visit(model)
 
                 return finder.result if finder.result else None
 
@@ -75,39 +73,39 @@ class RobotFoldingRangeProtocolPart(RobotLanguageServerProtocolPart):
                         )
                     )
 
-            async def visit_Section(self, node: ast.AST) -> None:  # noqa: N802
+            def visit_Section(self, node: ast.AST) -> None:  # noqa: N802
                 self.__append(node, kind="section")
 
-                await self.generic_visit(node)
+                self.generic_visit(node)
 
-            async def visit_CommentSection(self, node: ast.AST) -> None:  # noqa: N802
+            def visit_CommentSection(self, node: ast.AST) -> None:  # noqa: N802
                 self.__append(node, kind="comment")
-                await self.generic_visit(node)
+                self.generic_visit(node)
 
-            async def visit_TestCase(self, node: ast.AST) -> None:  # noqa: N802
+            def visit_TestCase(self, node: ast.AST) -> None:  # noqa: N802
                 from robot.parsing.model.blocks import TestCase
 
                 if cast(TestCase, node).name:
                     self.__append(node, kind="testcase")
-                    await self.generic_visit(node)
+                    self.generic_visit(node)
 
-            async def visit_Keyword(self, node: ast.AST) -> None:  # noqa: N802
+            def visit_Keyword(self, node: ast.AST) -> None:  # noqa: N802
                 from robot.parsing.model.blocks import Keyword
 
                 if cast(Keyword, node).name:
                     self.__append(node, kind="keyword")
-                    await self.generic_visit(node)
+                    self.generic_visit(node)
 
-            async def visit_ForLoop(self, node: ast.AST) -> None:  # noqa: N802
+            def visit_ForLoop(self, node: ast.AST) -> None:  # noqa: N802
                 self.__append(node, kind="for_loop")
-                await self.generic_visit(node)
+                self.generic_visit(node)
 
-            async def visit_For(self, node: ast.AST) -> None:  # noqa: N802
+            def visit_For(self, node: ast.AST) -> None:  # noqa: N802
                 self.__append(node, kind="for")
-                await self.generic_visit(node)
+                self.generic_visit(node)
 
-            async def visit_If(self, node: ast.AST) -> None:  # noqa: N802
+            def visit_If(self, node: ast.AST) -> None:  # noqa: N802
                 self.__append(node, kind="if")
-                await self.generic_visit(node)
+                self.generic_visit(node)
 
-        return await Visitor.find_from(await self.parent.documents_cache.get_model(document), self)
+        return Visitor.find_from(await self.parent.documents_cache.get_model(document), self)
@@ -3,18 +3,15 @@ from __future__ import annotations
 import ast
 import asyncio
 import itertools
-import operator
 import re
-from dataclasses import dataclass
 from enum import Enum
-from functools import reduce
 from typing import (
     TYPE_CHECKING,
     Any,
-    AsyncGenerator,
     Dict,
     FrozenSet,
-    Generator,
+    Iterator,
+    List,
     Optional,
     Set,
     Tuple,
@@ -34,8 +31,9 @@ from ...common.lsp_types import (
     SemanticTokensPartialResult,
     SemanticTokenTypes,
 )
+from ...common.parts.semantic_tokens import SemanticTokensEncoder, semantic_tokens_edits
 from ...common.text_document import TextDocument
-from ..diagnostics.namespace import Namespace
+from ..diagnostics.library_doc import BUILTIN_LIBRARY_NAME, KeywordDoc
 from ..utils.ast import HasTokens, Token, iter_nodes, token_in_range, tokenize_variables
 
 if TYPE_CHECKING:
@@ -71,29 +69,42 @@ class RobotSemTokenTypes(Enum):
     NAMESPACE = "namespace"
 
 
-@dataclass
-class SemTokenInfo:
-    lineno: int
-    col_offset: int
-    length: int
-    sem_token_type: Enum
-    sem_modifiers: Optional[Set[Enum]] = None
+DOCUMENTATION_MODIFIERS = frozenset({SemanticTokenModifiers.DOCUMENTATION})
+DEFAULT_LIBRARY_MODIFIERS = frozenset({SemanticTokenModifiers.DEFAULT_LIBRARY})
+DECLARATION_MODIFIERS = frozenset({SemanticTokenModifiers.DECLARATION})
 
-    @classmethod
-    def from_token(
-        cls,
-        token: Token,
-        sem_token_type: Enum,
-        sem_modifiers: Optional[Set[Enum]] = None,
-        col_offset: Optional[int] = None,
-        length: Optional[int] = None,
-    ) -> SemTokenInfo:
-        return cls(
-            token.lineno,
-            col_offset if col_offset is not None else token.col_offset,
-            length if length is not None else token.end_col_offset - token.col_offset,
-            sem_token_type,
-            sem_modifiers,
+
+class TokenLineIndex:
+    """
+    All tokens of a model with their nodes in document order and the position of the first token of each line,
+    so the tokens of a range can be found without walking the model.
+    """
+
+    def __init__(self, model: ast.AST) -> None:
+        self.tokens: List[Tuple[Token, ast.AST]] = []
+        self.line_starts: List[int] = []
+
+        for node in iter_nodes(model):
+            if isinstance(node, HasTokens):
+                for token in cast(HasTokens, node).tokens:
+                    while len(self.line_starts) < token.lineno:
+                        self.line_starts.append(len(self.tokens))
+                    self.tokens.append((token, node))
+
+    def _line_start(self, line: int) -> int:
+        # index of the first token at the zero based `line` or after it
+        return self.line_starts[line] if line < len(self.line_starts) else len(self.tokens)
+
+    def get_tokens(self, range: Optional[Range] = None) -> Iterator[Tuple[Token, ast.AST]]:
+        if range is None:
+            return iter(self.tokens)
+
+        return (
+            t
+            for t in self.tokens[
+                self._line_start(range.start.line) : self._line_start(range.end.line + 1)
+            ]  # noqa: E203
+            if token_in_range(t[0], range)
         )
 
 
@@ -106,13 +117,15 @@ class RobotSemanticTokenProtocolPart(RobotLanguageServerProtocolPart):
 
         parent.semantic_tokens.collect_full.add(self.collect_full)
         parent.semantic_tokens.collect_range.add(self.collect_range)
-        # parent.semantic_tokens.collect_full_delta.add(self.collect_full_delta)
+        parent.semantic_tokens.collect_full_delta.add(self.collect_full_delta)
+
+        self._result_ids = itertools.count(1)
 
     @classmethod
-    def generate_mapping(cls) -> Dict[str, Tuple[Enum, Optional[Set[Enum]]]]:
+    def generate_mapping(cls) -> Dict[str, Tuple[Enum, Optional[FrozenSet[Enum]]]]:
         from robot.parsing.lexer.tokens import Token as RobotToken
 
-        definition: Dict[FrozenSet[str], Tuple[Enum, Optional[Set[Enum]]]] = {
+        definition: Dict[FrozenSet[str], Tuple[Enum, Optional[FrozenSet[Enum]]]] = {
             frozenset(RobotToken.HEADER_TOKENS): (RobotSemTokenTypes.HEADER, None),
             frozenset({RobotToken.SETTING_HEADER}): (RobotSemTokenTypes.HEADER_SETTING, None),
             frozenset({RobotToken.VARIABLE_HEADER}): (RobotSemTokenTypes.HEADER_VARIABLE, None),
@@ -127,11 +140,11 @@ class RobotSemanticTokenProtocolPart(RobotLanguageServerProtocolPart):
             ),
             frozenset({RobotToken.TESTCASE_NAME}): (
                 RobotSemTokenTypes.TESTCASE_NAME,
-                {SemanticTokenModifiers.DECLARATION},
+                DECLARATION_MODIFIERS,
             ),
             frozenset({RobotToken.KEYWORD_NAME}): (
                 RobotSemTokenTypes.KEYWORD_NAME,
-                {SemanticTokenModifiers.DECLARATION},
+                DECLARATION_MODIFIERS,
             ),
             frozenset(
                 {
@@ -154,17 +167,17 @@ class RobotSemanticTokenProtocolPart(RobotLanguageServerProtocolPart):
             frozenset({RobotToken.EOL, RobotToken.EOS}): (RobotSemTokenTypes.TERMINATOR, None),
         }
 
-        result: Dict[str, Tuple[Enum, Optional[Set[Enum]]]] = {}
+        result: Dict[str, Tuple[Enum, Optional[FrozenSet[Enum]]]] = {}
         for k, v in definition.items():
             for e in k:
                 result[e] = v
 
         return result
 
-    __mapping: Optional[Dict[str, Tuple[Enum, Optional[Set[Enum]]]]] = None
+    __mapping: Optional[Dict[str, Tuple[Enum, Optional[FrozenSet[Enum]]]]] = None
 
     @classmethod
-    def mapping(cls) -> Dict[str, Tuple[Enum, Optional[Set[Enum]]]]:
+    def mapping(cls) -> Dict[str, Tuple[Enum, Optional[FrozenSet[Enum]]]]:
         if cls.__mapping is None:
             cls.__mapping = cls.generate_mapping()
         return cls.__mapping
@@ -173,10 +186,26 @@ class RobotSemanticTokenProtocolPart(RobotLanguageServerProtocolPart):
         r"(?P<t>[^\\]+)|(?P<x>\\([^xuU]|x[0-f]{2}|u[0-f]{4}|U[0-f]{8}){0,1})", re.MULTILINE | re.DOTALL
     )
 
+    __variable_token_types: Optional[FrozenSet[str]] = None
+
     @classmethod
-    async def generate_sem_sub_tokens(
-        cls, token: Token, node: ast.AST, col_offset: Optional[int] = None, length: Optional[int] = None
-    ) -> AsyncGenerator[SemTokenInfo, None]:
+    def variable_token_types(cls) -> FrozenSet[str]:
+        if cls.__variable_token_types is None:
+            from robot.parsing.lexer.tokens import Token as RobotToken
+
+            cls.__variable_token_types = frozenset({*RobotToken.ALLOW_VARIABLES, RobotToken.KEYWORD})
+        return cls.__variable_token_types
+
+    @classmethod
+    def encode_sem_sub_tokens(
+        cls,
+        encoder: SemanticTokensEncoder,
+        token: Token,
+        node: ast.AST,
+        col_offset: Optional[int] = None,
+        length: Optional[int] = None,
+        keyword_modifiers: int = 0,
+    ) -> None:
         from robot.parsing.lexer.tokens import Token as RobotToken
         from robot.parsing.model.statements import (
             Documentation,
@@ -189,196 +218,174 @@ class RobotSemanticTokenProtocolPart(RobotLanguageServerProtocolPart):
         from robot.variables.search import is_variable
 
         sem_info = cls.mapping().get(token.type, None) if token.type is not None else None
-        if sem_info is not None:
-            sem_type, sem_mod = sem_info
-
-            if isinstance(node, (Documentation, Metadata)):
-                sem_mod = {SemanticTokenModifiers.DOCUMENTATION}
-
-            if token.type == RobotToken.VARIABLE:
-                if is_variable(token.value):
-                    if col_offset is None:
-                        col_offset = token.col_offset
-                    if length is None:
-                        length = token.end_col_offset - token.col_offset
-
-                    yield SemTokenInfo(token.lineno, col_offset, 2, RobotSemTokenTypes.VARIABLE_BEGIN, sem_mod)
-                    yield SemTokenInfo.from_token(token, sem_type, sem_mod, col_offset + 2, length - 3)
-                    yield SemTokenInfo(
-                        token.lineno, col_offset + length - 1, 1, RobotSemTokenTypes.VARIABLE_END, sem_mod
+        if sem_info is None:
+            return
+
+        sem_type, sem_mod = sem_info
+
+        if isinstance(node, (Documentation, Metadata)):
+            sem_mod = DOCUMENTATION_MODIFIERS
+
+        line = token.lineno - 1
+        if col_offset is None:
+            col_offset = token.col_offset
+        if length is None:
+            length = token.end_col_offset - token.col_offset
+
+        if token.type == RobotToken.VARIABLE:
+            if is_variable(token.value):
+                encoder.add(line, col_offset, 2, RobotSemTokenTypes.VARIABLE_BEGIN, sem_mod)
+                encoder.add(line, col_offset + 2, length - 3, sem_type, sem_mod)
+                encoder.add(line, col_offset + length - 1, 1, RobotSemTokenTypes.VARIABLE_END, sem_mod)
+            else:
+                encoder.add(line, token.col_offset, token.end_col_offset - token.col_offset, sem_type, sem_mod)
+
+        elif token.type == RobotToken.ARGUMENT and "\\" in token.value:
+            for g in cls.ESCAPE_REGEX.finditer(token.value):
+                encoder.add(
+                    line,
+                    col_offset + g.start(),
+                    g.end() - g.start(),
+                    sem_type if g.group("x") is None or g.end() - g.start() == 1 else RobotSemTokenTypes.ESCAPE,
+                    sem_info[1],
+                )
+        elif token.type == RobotToken.KEYWORD or (token.type == RobotToken.NAME and isinstance(node, Fixture)):
+            index = token.value.find(".")
+            old_index = 0
+            while index >= 0:
+                if index > 0:
+                    encoder.add(
+                        line,
+                        col_offset + old_index,
+                        index - old_index,
+                        RobotSemTokenTypes.NAMESPACE,
+                        DEFAULT_LIBRARY_MODIFIERS
+                        if token.value[:index].casefold() == BUILTIN_LIBRARY_NAME.casefold()
+                        else None,
                     )
+                encoder.add(line, col_offset + index, 1, RobotSemTokenTypes.SEPARATOR, sem_mod)
+
+                new_index = token.value.find(".", index + 1)
+                if new_index >= 0:
+                    old_index = index
+                    index = new_index
                 else:
-                    yield SemTokenInfo.from_token(token, sem_type, sem_mod)
-
-            elif token.type == RobotToken.ARGUMENT and "\\" in token.value:
-                if col_offset is None:
-                    col_offset = token.col_offset
-                if length is None:
-                    length = token.end_col_offset - token.col_offset
-
-                for g in cls.ESCAPE_REGEX.finditer(token.value):
-                    yield SemTokenInfo.from_token(
-                        token,
-                        sem_info[0] if g.group("x") is None or g.end() - g.start() == 1 else RobotSemTokenTypes.ESCAPE,
-                        sem_info[1],
-                        col_offset + g.start(),
-                        g.end() - g.start(),
-                    )
-            elif token.type == RobotToken.KEYWORD or (token.type == RobotToken.NAME and isinstance(node, Fixture)):
-                if col_offset is None:
-                    col_offset = token.col_offset
-                if length is None:
-                    length = token.end_col_offset - token.col_offset
-
-                index = token.value.find(".")
-                old_index = 0
-                while index >= 0:
-                    if index > 0:
-                        yield SemTokenInfo(
-                            token.lineno,
-                            col_offset + old_index,
-                            index - old_index,
-                            RobotSemTokenTypes.NAMESPACE,
-                            {SemanticTokenModifiers.DEFAULT_LIBRARY}
-                            if token.value[:index].casefold() == "BuiltIn".casefold()
-                            else None,
-                        )
-                    yield SemTokenInfo(token.lineno, col_offset + index, 1, RobotSemTokenTypes.SEPARATOR, sem_mod)
-
-                    new_index = token.value.find(".", index + 1)
-                    if new_index >= 0:
-                        old_index = index
-                        index = new_index
-                    else:
-                        break
-
-                yield SemTokenInfo.from_token(token, sem_type, sem_mod, col_offset + index + 1, length - index - 1)
-            elif token.type == RobotToken.NAME and isinstance(node, (LibraryImport, ResourceImport, VariablesImport)):
-                yield SemTokenInfo.from_token(token, RobotSemTokenTypes.NAMESPACE, sem_mod, col_offset, length)
-            else:
-                yield SemTokenInfo.from_token(token, sem_type, sem_mod, col_offset, length)
+                    break
+
+            encoder.add(
+                line,
+                col_offset + index + 1,
+                length - index - 1,
+                sem_type,
+                sem_mod,
+                keyword_modifiers if sem_type == RobotSemTokenTypes.KEYWORD else 0,
+            )
+        elif token.type == RobotToken.NAME and isinstance(node, (LibraryImport, ResourceImport, VariablesImport)):
+            encoder.add(line, col_offset, length, RobotSemTokenTypes.NAMESPACE, sem_mod)
+        else:
+            encoder.add(line, col_offset, length, sem_type, sem_mod)
 
-    async def generate_sem_tokens(
-        self, namespace: Namespace, token: Token, node: ast.AST
-    ) -> AsyncGenerator[SemTokenInfo, None]:
+    def encode_sem_tokens(
+        self,
+        encoder: SemanticTokensEncoder,
+        token: Token,
+        node: ast.AST,
+        keywords: Dict[str, Optional[KeywordDoc]],
+    ) -> None:
         from robot.parsing.lexer.tokens import Token as RobotToken
 
-        if token.type in {*RobotToken.ALLOW_VARIABLES, RobotToken.KEYWORD}:
+        if token.type in self.variable_token_types():
+            keyword_modifiers = 0
+            if token.type == RobotToken.KEYWORD:
+                libdoc = keywords.get(token.value, None)
+                if (
+                    libdoc is not None
+                    and libdoc.libname is not None
+                    and libdoc.libname.casefold() == BUILTIN_LIBRARY_NAME.casefold()
+                ):
+                    keyword_modifiers = encoder.modifiers_mask(DEFAULT_LIBRARY_MODIFIERS)
 
             for sub_token in tokenize_variables(
                 token, ignore_errors=True, identifiers="$" if token.type == RobotToken.KEYWORD_NAME else "$@&%"
             ):
-                async for e in self.generate_sem_sub_tokens(sub_token, node):
-                    yield e
-
-        elif token.type == RobotToken.KEYWORD:
-            is_builtin = False
-            if namespace.initialized:
-                try:
-                    libdoc = await namespace.find_keyword_threadsafe(token.value)
-                    if (
-                        libdoc is not None
-                        and libdoc.libname is not None
-                        and libdoc.libname.casefold() == "builtin".casefold()
-                    ):
-
-                        is_builtin = True
-                except BaseException:
-                    pass
-
-            async for e in self.generate_sem_sub_tokens(token, node):
-                if is_builtin:
-                    if e.sem_modifiers is None:
-                        e.sem_modifiers = set()
-                    e.sem_modifiers.add(SemanticTokenModifiers.DEFAULT_LIBRARY)
-                yield e
+                self.encode_sem_sub_tokens(encoder, sub_token, node, keyword_modifiers=keyword_modifiers)
         else:
-            async for e in self.generate_sem_sub_tokens(token, node):
-                yield e
+            self.encode_sem_sub_tokens(encoder, token, node)
 
-    async def collect(
-        self, namespace: Namespace, model: ast.AST, range: Optional[Range], cancel_token: CancelationToken
-    ) -> Union[SemanticTokens, SemanticTokensPartialResult, None]:
+    @staticmethod
+    def collect_keyword_names(index: TokenLineIndex, range: Optional[Range] = None) -> Set[str]:
+        from robot.parsing.lexer.tokens import Token as RobotToken
 
-        data = []
-        last_line = 0
-        last_col = 0
-
-        def get_tokens() -> Generator[Tuple[Token, ast.AST], None, None]:
-            for node in iter_nodes(model):
-                if isinstance(node, HasTokens):
-                    for token in cast(HasTokens, node).tokens:
-                        yield token, node
-
-        for robot_token, robot_node in itertools.takewhile(
-            lambda t: not cancel_token.throw_if_canceled() and (range is None or token_in_range(t[0], range)),
-            itertools.dropwhile(
-                lambda t: not cancel_token.throw_if_canceled()
-                and range is not None
-                and not token_in_range(t[0], range),
-                get_tokens(),
-            ),
-        ):
-            cancel_token.throw_if_canceled()
+        return {token.value for token, _ in index.get_tokens(range) if token.type == RobotToken.KEYWORD}
 
-            async for token in self.generate_sem_tokens(namespace, robot_token, robot_node):
-                current_line = token.lineno - 1
+    def collect(
+        self,
+        index: TokenLineIndex,
+        keywords: Dict[str, Optional[KeywordDoc]],
+        range: Optional[Range],
+        cancel_token: CancelationToken,
+    ) -> Union[SemanticTokens, SemanticTokensPartialResult, None]:
 
-                data.append(current_line - last_line)
+        encoder = SemanticTokensEncoder(
+            self.parent.semantic_tokens.token_types, self.parent.semantic_tokens.token_modifiers
+        )
 
-                if last_line != current_line:
-                    last_col = token.col_offset
-                    data.append(last_col)
-                else:
-                    delta = token.col_offset - last_col
-                    data.append(delta)
-                    last_col += delta
+        for robot_token, robot_node in index.get_tokens(range):
+            cancel_token.throw_if_canceled()
 
-                last_line = current_line
+            self.encode_sem_tokens(encoder, robot_token, robot_node, keywords)
 
-                data.append(token.length)
+        return SemanticTokens(data=encoder.data.tolist())
 
-                data.append(self.parent.semantic_tokens.token_types.index(token.sem_token_type))
+    async def get_token_index(self, document: TextDocument) -> TokenLineIndex:
+        return await document.get_cache(self.__get_token_index)
 
-                data.append(
-                    reduce(
-                        operator.or_,
-                        (2 ** self.parent.semantic_tokens.token_modifiers.index(e) for e in token.sem_modifiers),
-                    )
-                    if token.sem_modifiers
-                    else 0
-                )
+    async def __get_token_index(self, document: TextDocument) -> TokenLineIndex:
+        model = await self.parent.documents_cache.get_model(document)
 
-        return SemanticTokens(data=data)
+        return await asyncio.get_event_loop().run_in_executor(None, TokenLineIndex, model)
 
     async def collect_threading(
         self, document: TextDocument, range: Optional[Range]
     ) -> Union[SemanticTokens, SemanticTokensPartialResult, None]:
+        cancel_token = CancelationToken()
         try:
-            model = await self.parent.documents_cache.get_model(document)
+            index = await self.get_token_index(document)
             namespace = await self.parent.documents_cache.get_namespace(document)
             await namespace.ensure_initialized()
 
-            cancel_token = CancelationToken()
-            return await asyncio.get_event_loop().run_in_executor(
-                None,
-                asyncio.run,
-                self.collect(
-                    namespace,
-                    model,
-                    range,
-                    cancel_token,
-                ),
+            loop = asyncio.get_event_loop()
+
+            # keywords are resolved once per request in the event loop, the tokens are generated in a thread
+            keywords = await namespace.get_keyword_lookup(
+                await loop.run_in_executor(None, self.collect_keyword_names, index, range)
             )
+
+            return await loop.run_in_executor(None, self.collect, index, keywords, range, cancel_token)
         except BaseException:
             cancel_token.cancel()
             raise
 
+    async def collect_full_threading(
+        self, document: TextDocument
+    ) -> Union[SemanticTokens, SemanticTokensPartialResult, None]:
+        result = await self.collect_threading(document, None)
+
+        if isinstance(result, SemanticTokens):
+            result.result_id = str(next(self._result_ids))
+
+        return result
+
     @language_id("robotframework")
     async def collect_full(
         self, sender: Any, document: TextDocument, **kwargs: Any
     ) -> Union[SemanticTokens, SemanticTokensPartialResult, None]:
-        return await document.get_cache(self.collect_threading, None)
+        result = await document.get_cache(self.collect_full_threading)
+
+        if isinstance(result, SemanticTokens):
+            document.set_data(self, result)
+
+        return result
 
     @language_id("robotframework")
     async def collect_range(
@@ -390,4 +397,17 @@ class RobotSemanticTokenProtocolPart(RobotLanguageServerProtocolPart):
     async def collect_full_delta(
         self, sender: Any, document: TextDocument, previous_result_id: str, **kwargs: Any
     ) -> Union[SemanticTokens, SemanticTokensDelta, SemanticTokensDeltaPartialResult, None]:
-        return None
+        result = await document.get_cache(self.collect_full_threading)
+
+        if not isinstance(result, SemanticTokens):
+            return None
+
+        last_result: Optional[SemanticTokens] = document.get_data(self)
+        document.set_data(self, result)
+
+        if last_result is None or last_result.result_id != previous_result_id:
+            return result
+
+        return SemanticTokensDelta(
+            edits=semantic_tokens_edits(last_result.data, result.data), result_id=result.result_id
+        )
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import ast
+import weakref
 from typing import (
     Any,
-    AsyncIterator,
+    Dict,
     Generator,
     Iterator,
     List,
@@ -14,7 +15,6 @@ from typing import (
 )
 
 from ...common.lsp_types import Position, Range
-from .async_ast import walk
 
 
 def iter_nodes(node: ast.AST) -> Generator[ast.AST, None, None]:
@@ -174,12 +174,45 @@ def get_tokens_at_position(node: HasTokens, position: Position) -> List[Token]:
     return [t for t in node.tokens if position.is_in_range(range := range_from_token(t)) or range.end == position]
 
 
-def iter_nodes_at_position(node: ast.AST, position: Position) -> AsyncIterator[ast.AST]:
-    return (n async for n in walk(node) if position.is_in_range(range := range_from_node(n)) or range.end == position)
+class NodePositionIndex:
+    """
+    The nodes of a model bucketed by the lines they span, in the breadth first order of `ast.walk`.
+
+    The ranges of the nodes are computed once, a lookup only checks the nodes that span the line of the position.
+    """
+
+    def __init__(self, model: ast.AST) -> None:
+        self._lines: Dict[int, List[Tuple[Tuple[int, int], Tuple[int, int], ast.AST]]] = {}
+
+        for node in ast.walk(model):
+            r = range_from_node(node)
+            start = (r.start.line, r.start.character)
+            end = (r.end.line, r.end.character)
+
+            for line in range(max(r.start.line, 0), r.end.line + 1):
+                self._lines.setdefault(line, []).append((start, end, node))
+
+    def get_nodes(self, position: Position) -> List[ast.AST]:
+        p = (position.line, position.character)
+        return [node for start, end, node in self._lines.get(position.line, []) if start <= p <= end]
+
+
+_position_indexes: weakref.WeakKeyDictionary[ast.AST, NodePositionIndex] = weakref.WeakKeyDictionary()
+
+
+def get_position_index(model: ast.AST) -> NodePositionIndex:
+    result = _position_indexes.get(model, None)
+    if result is None:
+        result = _position_indexes[model] = NodePositionIndex(model)
+    return result
+
+
+def iter_nodes_at_position(node: ast.AST, position: Position) -> Iterator[ast.AST]:
+    return iter(get_position_index(node).get_nodes(position))
 
 
 async def get_nodes_at_position(node: ast.AST, position: Position) -> List[ast.AST]:
-    return [n async for n in iter_nodes_at_position(node, position)]
+    return get_position_index(node).get_nodes(position)
 
 
 async def get_node_at_position(node: ast.AST, position: Position) -> Optional[ast.AST]:
@@ -1,5 +1,11 @@
 import ast
-from typing import Any, AsyncGenerator, Callable, Optional, Type, cast
+import asyncio
+from collections import deque
+from typing import Any, AsyncGenerator, Optional
+
+from .visitor import VisitorFinder
+from .visitor import iter_child_nodes as _iter_child_nodes
+from .visitor import iter_fields as _iter_fields
 
 __all__ = ["iter_fields", "iter_child_nodes", "AsyncVisitor", "walk"]
 
@@ -30,15 +36,25 @@ async def iter_child_nodes(node: ast.AST) -> AsyncGenerator[ast.AST, None]:
                     yield item
 
 
-async def walk(node: ast.AST) -> AsyncGenerator[ast.AST, None]:
-    from collections import deque
+async def walk(node: ast.AST, yield_every: Optional[int] = None) -> AsyncGenerator[ast.AST, None]:
+    """
+    Yield *node* and all its descendants in breadth first order.
 
+    The children are collected synchronously, if `yield_every` is given, control is given back to the
+    event loop after every `yield_every` nodes.
+    """
     todo = deque([node])
+    count = 0
     while todo:
         node = todo.popleft()
-        todo.extend([e async for e in iter_child_nodes(node)])
+        todo.extend(_iter_child_nodes(node))
         yield node
 
+        if yield_every:
+            count += 1
+            if count % yield_every == 0:
+                await asyncio.sleep(0)
+
 
 async def iter_nodes(node: ast.AST) -> AsyncGenerator[ast.AST, None]:
     async for _name, value in iter_fields(node):
@@ -56,30 +72,29 @@ async def iter_nodes(node: ast.AST) -> AsyncGenerator[ast.AST, None]:
                 yield n
 
 
-class VisitorFinder:
-    def _find_visitor(self, cls: Type[Any]) -> Optional[Callable[..., Any]]:
-        if cls is ast.AST:
-            return None
-        method_name = "visit_" + cls.__name__
-        if hasattr(self, method_name):
-            method = getattr(self, method_name)
-            if callable(method):
-                return cast("Callable[..., Any]", method)
-        for base in cls.__bases__:
-            method = self._find_visitor(base)
-            if method:
-                return cast("Callable[..., Any]", method)
-        return None
+class AsyncVisitor(VisitorFinder):
+    """
+    A visitor for visit methods that need to await something, like a keyword lookup.
+
+    If `yield_every` is set, control is given back to the event loop after every `yield_every` visited nodes.
+    Visitors that don't await anything should use the synchronous `Visitor`.
+    """
 
+    yield_every: Optional[int] = None
+    _visit_count: int = 0
 
-class AsyncVisitor(VisitorFinder):
     async def visit(self, node: ast.AST) -> None:
-        visitor = self._find_visitor(type(node)) or self.generic_visit
+        if self.yield_every:
+            self._visit_count += 1
+            if self._visit_count % self.yield_every == 0:
+                await asyncio.sleep(0)
+
+        visitor = self._get_visitor(type(node)) or self.generic_visit
         await visitor(node)
 
     async def generic_visit(self, node: ast.AST) -> None:
         """Called if no explicit visitor function exists for a node."""
-        async for field, value in iter_fields(node):
+        for _field, value in _iter_fields(node):
             if isinstance(value, list):
                 for item in value:
                     if isinstance(item, ast.AST):
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import re
+import weakref
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from ...common.lsp_types import CompletionItem
+
+_T = TypeVar("_T")
+
+BDD_PREFIXES = ["given ", "when ", "then ", "and ", "but "]
+
+_SEPARATORS = ".-"
+
+BOUNDARY_BONUS = 10
+CONSECUTIVE_BONUS = 5
+MAX_GAP_PENALTY = 3
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalizes a name like Robot Framework does when it compares keyword names,
+    case, spaces and underscores are ignored.
+    """
+    return "".join(name.split()).lower().replace("_", "")
+
+
+def split_bdd_prefix(name: str) -> Tuple[str, str]:
+    """
+    Splits a BDD prefix like `Given` or `And` from a keyword name.
+    """
+    lower = name.lower()
+    for prefix in BDD_PREFIXES:
+        if lower.startswith(prefix):
+            return name[: len(prefix)], name[len(prefix) :]  # noqa: E203
+    return "", name
+
+
+def get_match_data(name: str) -> Tuple[str, FrozenSet[int]]:
+    """
+    Returns the normalized name and the positions in it where a word starts:
+    the first character, a character after a space, underscore, dot or dash and an upper case
+    character after a lower case one.
+    """
+    normalized: List[str] = []
+    boundaries: List[int] = []
+    position = 0
+    at_boundary = True
+    last_lower = False
+
+    for c in name:
+        if c.isspace() or c == "_":
+            at_boundary = True
+            continue
+
+        if at_boundary or (last_lower and c.isupper()):
+            boundaries.append(position)
+
+        at_boundary = c in _SEPARATORS
+        last_lower = c.islower()
+
+        lower = c.lower()
+        normalized.append(lower)
+        position += len(lower)
+
+    return "".join(normalized), frozenset(boundaries)
+
+
+def _is_subsequence(query: str, name: str, start: int) -> bool:
+    it = iter(name[start:])
+    return all(c in it for c in query)
+
+
+def fuzzy_score(query: str, name: str, boundaries: FrozenSet[int]) -> Optional[int]:
+    """
+    Scores how good the normalized `query` matches the normalized `name` as subsequence,
+    returns `None` if it does not match.
+
+    Matches at the begin of a word and consecutive matches get a bonus, gaps between matches and
+    characters of the name that are not matched reduce the score.
+    """
+    score = 0
+    last = -1
+
+    for qi, c in enumerate(query):
+        i = name.find(c, last + 1)
+        if i < 0:
+            return None
+
+        if i != last + 1 and i not in boundaries:
+            # prefer the same character at the begin of a word, if the rest of the query still matches after it
+            j = name.find(c, i + 1)
+            while j >= 0 and j not in boundaries:
+                j = name.find(c, j + 1)
+            if j >= 0 and _is_subsequence(query[qi + 1 :], name, j + 1):  # noqa: E203
+                i = j
+
+        if i in boundaries:
+            score += BOUNDARY_BONUS
+        if i == last + 1:
+            score += CONSECUTIVE_BONUS
+        else:
+            score -= min(i - last - 1, MAX_GAP_PENALTY)
+
+        last = i
+
+    return score - (len(name) - len(query)) // 4
+
+
+class CompletionIndex:
+    """
+    Prebuilt completion items with precomputed match data, sorted by their normalized names.
+
+    The items are created once and ranked by a fuzzy match against the typed text. The candidates are
+    found by one regular expression search over all names, so only matching items are scored.
+    """
+
+    def __init__(self, items: Iterable[Tuple[str, CompletionItem]]) -> None:
+        entries = sorted(((get_match_data(name), item) for name, item in items), key=lambda e: e[0][0])
+
+        self.names: List[str] = [e[0][0] for e in entries]
+        self.boundaries: List[FrozenSet[int]] = [e[0][1] for e in entries]
+        self.items: List[CompletionItem] = [e[1] for e in entries]
+
+        self._text = "\n".join(self.names)
+        self._line_starts: Dict[int, int] = {}
+        offset = 0
+        for i, name in enumerate(self.names):
+            self._line_starts[offset] = i
+            offset += len(name) + 1
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @staticmethod
+    def _compile(query: str) -> Pattern[str]:
+        # a negated character class finds the next occurrence of each character, so a line is matched in linear time
+        return re.compile(
+            "^" + "".join(f"[^{re.escape(c)}\\n]*{re.escape(c)}" for c in query),
+            re.MULTILINE,
+        )
+
+    def iter_matches(self, query: str) -> Iterator[Tuple[int, int]]:
+        """
+        Yields the score and the position of all items that match the normalized `query`, in the order of their names.
+        """
+        if not query:
+            for i in range(len(self.items)):
+                yield 0, i
+            return
+
+        for m in self._compile(query).finditer(self._text):
+            i = self._line_starts[m.start()]
+            score = fuzzy_score(query, self.names[i], self.boundaries[i])
+            if score is not None:
+                yield score, i
+
+    def find(self, query: str, limit: int) -> Tuple[List[CompletionItem], bool]:
+        """
+        Returns at most `limit` items that match the normalized `query`, the best match first,
+        and if there are more matching items.
+        """
+        key, _ = get_match_data(query)
+
+        if not key:
+            return self.items[:limit], len(self.items) > limit
+
+        scored = [(score, -i) for score, i in self.iter_matches(key)]
+
+        return [self.items[-i] for _, i in heapq.nlargest(limit, scored)], len(scored) > limit
+
+
+class CompositeCompletionIndex:
+    """
+    Searches several completion indexes like one, so the indexes can be built and cached separately.
+
+    The indexes are given in the order of their priority, if items of the same kind have the same normalized
+    name, only the item of the first index is returned, like a keyword of a resource hides a library keyword.
+    """
+
+    def __init__(self, indexes: Sequence[CompletionIndex]) -> None:
+        self.indexes = list(indexes)
+
+    def __len__(self) -> int:
+        return sum(len(index) for index in self.indexes)
+
+    @staticmethod
+    def _iter_index_matches(
+        index: CompletionIndex, priority: int, query: str
+    ) -> Iterator[Tuple[str, int, int, CompletionItem]]:
+        for score, i in index.iter_matches(query):
+            yield index.names[i], priority, score, index.items[i]
+
+    def _iter_matches(self, query: str) -> Iterator[Tuple[int, CompletionItem]]:
+        seen: Set[Tuple[str, Any]] = set()
+
+        for name, _, score, item in heapq.merge(
+            *(self._iter_index_matches(index, priority, query) for priority, index in enumerate(self.indexes)),
+            key=lambda e: (e[0], e[1]),
+        ):
+            key = (name, item.kind)
+            if key not in seen:
+                seen.add(key)
+                yield score, item
+
+    def find(self, query: str, limit: int) -> Tuple[List[CompletionItem], bool]:
+        """
+        Returns at most `limit` items that match the normalized `query`, the best match first,
+        and if there are more matching items.
+        """
+        key, _ = get_match_data(query)
+
+        if not key:
+            items = [item for _, item in itertools.islice(self._iter_matches(key), limit + 1)]
+            return items[:limit], len(items) > limit
+
+        # `nlargest` is stable, items with the same score keep the order of their names
+        scored = list(self._iter_matches(key))
+
+        return [item for _, item in heapq.nlargest(limit, scored, key=lambda e: e[0])], len(scored) > limit
+
+
+class CompletionResolveTable:
+    """
+    Maps the ids carried by completion items to the documentation objects they were created from.
+
+    The objects are only weakly referenced, the id of a completion item stays valid as long as the
+    object is cached somewhere else. The rendered markdown is memoized per object.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[int, Tuple[weakref.ref[Any], Callable[[Any], str]]] = {}
+        self._markdown: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: int, ref: Optional[weakref.ref[Any]] = None) -> None:
+        entry = self._entries.get(key, None)
+        if entry is not None and (ref is None or entry[0] is ref):
+            self._entries.pop(key, None)
+            self._markdown.pop(key, None)
+
+    def add(self, doc: _T, render: Callable[[_T], str]) -> int:
+        key = id(doc)
+
+        entry = self._entries.get(key, None)
+        if entry is None or entry[0]() is not doc:
+            self._remove(key)
+            self._entries[key] = (weakref.ref(doc, lambda r: self._remove(key, r)), render)
+
+        return key
+
+    def get(self, key: int) -> Any:
+        entry = self._entries.get(key, None)
+        return entry[0]() if entry is not None else None
+
+    def get_markdown(self, key: int) -> Optional[str]:
+        result = self._markdown.get(key, None)
+        if result is None:
+            entry = self._entries.get(key, None)
+            doc = entry[0]() if entry is not None else None
+            if entry is None or doc is None:
+                return None
+
+            result = self._markdown[key] = entry[1](doc)
+
+        return result
@@ -0,0 +1,94 @@
+import ast
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Type, cast
+
+__all__ = ["iter_fields", "iter_child_nodes", "VisitorFinder", "Visitor", "walk"]
+
+
+def iter_fields(node: ast.AST) -> Iterator[Tuple[str, Any]]:
+    """
+    Yield a tuple of ``(fieldname, value)`` for each field in ``node._fields``
+    that is present on *node*.
+    """
+    for field in node._fields:
+        try:
+            yield field, getattr(node, field)
+        except AttributeError:
+            pass
+
+
+def iter_child_nodes(node: ast.AST) -> Iterator[ast.AST]:
+    """
+    Yield all direct child nodes of *node*, that is, all fields that are nodes
+    and all items of fields that are lists of nodes.
+    """
+    for _name, field in iter_fields(node):
+        if isinstance(field, ast.AST):
+            yield field
+        elif isinstance(field, list):
+            for item in field:
+                if isinstance(item, ast.AST):
+                    yield item
+
+
+def walk(node: ast.AST) -> Iterator[ast.AST]:
+    """
+    Yield *node* and all its descendants in breadth first order, like the async `walk`.
+    """
+    todo = deque([node])
+    while todo:
+        node = todo.popleft()
+        todo.extend(iter_child_nodes(node))
+        yield node
+
+
+class VisitorFinder:
+    _visitor_cache: Optional[Dict[Type[Any], Optional[Callable[..., Any]]]] = None
+
+    def _find_visitor(self, cls: Type[Any]) -> Optional[Callable[..., Any]]:
+        if cls is ast.AST:
+            return None
+        method_name = "visit_" + cls.__name__
+        if hasattr(self, method_name):
+            method = getattr(self, method_name)
+            if callable(method):
+                return cast("Callable[..., Any]", method)
+        for base in cls.__bases__:
+            method = self._find_visitor(base)
+            if method:
+                return cast("Callable[..., Any]", method)
+        return None
+
+    def _get_visitor(self, cls: Type[Any]) -> Optional[Callable[..., Any]]:
+        """
+        Like `_find_visitor`, but the visitor of a node type is only searched once per visitor instance.
+        """
+        if self._visitor_cache is None:
+            self._visitor_cache = {}
+
+        try:
+            return self._visitor_cache[cls]
+        except KeyError:
+            result = self._visitor_cache[cls] = self._find_visitor(cls)
+            return result
+
+
+class Visitor(VisitorFinder):
+    """
+    A synchronous visitor for models that are already parsed, without the overhead of
+    coroutines and async generators of `AsyncVisitor` for each node.
+    """
+
+    def visit(self, node: ast.AST) -> None:
+        visitor = self._get_visitor(type(node)) or self.generic_visit
+        visitor(node)
+
+    def generic_visit(self, node: ast.AST) -> None:
+        """Called if no explicit visitor function exists for a node."""
+        for _field, value in iter_fields(node):
+            if isinstance(value, list):
+                for item in value:
+                    if isinstance(item, ast.AST):
+                        self.visit(item)
+            elif isinstance(value, ast.AST):
+                self.visit(value)
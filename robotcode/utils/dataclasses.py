@@ -26,7 +26,7 @@ from typing import (
     runtime_checkable,
 )
 
-__all__ = ["to_snake_case", "to_camel_case", "as_json", "from_dict", "from_json", "as_dict"]
+__all__ = ["to_snake_case", "to_camel_case", "as_json", "from_dict", "from_json", "as_dict", "encode_default"]
 
 _RE_SNAKE_CASE_1 = re.compile(r"[\-\.\s]")
 _RE_SNAKE_CASE_2 = re.compile(r"[A-Z]")
@@ -142,6 +142,10 @@ def __default(o: Any) -> Any:
         TypeError()
 
 
+def encode_default(o: Any) -> Any:
+    return __default(o)
+
+
 def as_json(obj: Any, indent: Optional[bool] = None, compact: Optional[bool] = None) -> str:
     return json.dumps(obj, default=__default, indent=4 if indent else None, separators=(",", ":") if compact else None)
 
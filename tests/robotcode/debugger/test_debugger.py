@@ -0,0 +1,265 @@
+import threading
+import weakref
+from pathlib import Path
+from typing import Any, Dict, Generator, List
+
+import pytest
+
+from robotcode.debugger.dap_types import Event, Source, SourceBreakpoint, StoppedEvent
+from robotcode.debugger.debugger import (
+    BreakpointCondition,
+    Debugger,
+    RequestedState,
+    StackFrameEntry,
+    State,
+)
+
+
+@pytest.fixture
+def debugger() -> Generator[Debugger, None, None]:
+    debugger = Debugger.instance()
+    debugger.state = State.Running
+    debugger.requested_state = RequestedState.Nothing
+    try:
+        yield debugger
+    finally:
+        debugger.breakpoints.clear()
+        debugger.state = State.Stopped
+
+
+@pytest.fixture
+def events(debugger: Debugger) -> Generator[List[Event], None, None]:
+    result: List[Event] = []
+
+    def collect(sender: Any, event: Event) -> None:
+        result.append(event)
+
+    debugger.send_event.add(collect)
+    try:
+        yield result
+    finally:
+        debugger.send_event.remove(collect)
+
+
+SOURCE = str(Path(__file__).resolve())
+
+
+def test_set_breakpoints_should_index_breakpoints_by_line(debugger: Debugger) -> None:
+    debugger.set_breakpoints(
+        Source(path=SOURCE),
+        [SourceBreakpoint(line=1), SourceBreakpoint(line=3), SourceBreakpoint(line=3, condition="${a}")],
+    )
+
+    by_line = debugger.breakpoints[SOURCE].by_line
+
+    assert sorted(by_line.keys()) == [1, 3]
+    assert [b.breakpoint.condition for b in by_line[3]] == [None, "${a}"]
+
+
+class DummyVariables:
+    def __init__(self, **store: Any) -> None:
+        self.store = store
+        self.replaced: List[str] = []
+
+    def replace_string(self, s: str) -> str:
+        self.replaced.append(s)
+        result = s
+        for k, v in self.store.items():
+            result = result.replace("${" + k + "}", repr(v))
+        return result
+
+
+def test_breakpoint_condition_should_be_compiled_once() -> None:
+    condition = BreakpointCondition("$a > 1 and len($b) == 2")
+
+    assert condition.evaluate(DummyVariables(a=2, b="ab"))
+    assert not condition.evaluate(DummyVariables(a=1, b="ab"))
+
+    variables = DummyVariables(a=2, b="ab")
+    condition.evaluate(variables)
+    assert variables.replaced == []
+
+
+def test_breakpoint_condition_with_robot_variables_should_be_replaced() -> None:
+    condition = BreakpointCondition("${a} == 2")
+
+    variables = DummyVariables(a=2)
+    assert condition.evaluate(variables)
+    assert variables.replaced == ["${a} == 2"]
+    assert not condition.evaluate(DummyVariables(a=3))
+
+
+def test_breakpoint_condition_should_keep_only_the_recently_used_replaced_expressions() -> None:
+    condition = BreakpointCondition("${i} == 5")
+
+    results = [condition.evaluate(DummyVariables(i=i)) for i in range(BreakpointCondition.CODE_CACHE_SIZE * 3)]
+
+    assert results.count(True) == 1
+    assert len(condition._code_cache) == BreakpointCondition.CODE_CACHE_SIZE
+
+
+def test_breakpoint_condition_with_syntax_error_should_raise() -> None:
+    condition = BreakpointCondition("$a ==")
+
+    with pytest.raises(SyntaxError):
+        condition.evaluate(DummyVariables(a=1))
+
+
+def test_process_start_state_without_breakpoints_should_do_nothing(debugger: Debugger, events: List[Event]) -> None:
+    debugger.process_start_state(SOURCE, 1, "KEYWORD", "")
+
+    assert debugger.state == State.Running
+    assert events == []
+
+
+def test_process_start_state_should_stop_only_on_breakpoint_lines(debugger: Debugger, events: List[Event]) -> None:
+    debugger.set_breakpoints(Source(path=SOURCE), [SourceBreakpoint(line=3)])
+
+    debugger.process_start_state(SOURCE, 1, "KEYWORD", "")
+
+    assert debugger.state == State.Running
+    assert events == []
+
+    debugger.process_start_state(SOURCE, 3, "KEYWORD", "")
+
+    assert debugger.state == State.Paused
+    assert len(events) == 1
+    assert isinstance(events[0], StoppedEvent)
+
+
+def test_get_variables_should_page_children_of_containers(debugger: Debugger) -> None:
+    variable = debugger._create_variable("${list}", list(range(1000)))
+
+    assert variable.indexed_variables == 1000
+    assert variable.variables_reference > 0
+    assert len(variable.value) < 1000
+
+    children = debugger.get_variables(variable.variables_reference, "indexed", 10, 5)
+
+    assert [(v.name, v.value) for v in children] == [(f"[{i}]", str(i)) for i in range(10, 15)]
+    assert debugger.get_variables(variable.variables_reference, "named") == []
+
+
+def test_get_variables_should_return_named_children_of_mappings(debugger: Debugger) -> None:
+    variable = debugger._create_variable("&{dict}", {"a": 1, "b": {"c": 2}})
+
+    assert variable.named_variables == 2
+
+    children = debugger.get_variables(variable.variables_reference)
+
+    assert [v.name for v in children] == ["a", "b"]
+    assert children[1].variables_reference > 0
+    assert [v.name for v in debugger.get_variables(children[1].variables_reference)] == ["c"]
+
+
+def test_variable_handles_should_be_cleared_on_continue(debugger: Debugger) -> None:
+    variable = debugger._create_variable("${list}", [1, 2])
+
+    debugger.start()
+
+    assert debugger.get_variables(variable.variables_reference) == []
+
+
+class DummyScope:
+    def __init__(self, **variables: Any) -> None:
+        self.variables = variables
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(self.variables)
+
+
+class DummyVariableScopes:
+    def __init__(self) -> None:
+        self._global = DummyScope(**{"${g}": 1})
+        self._suite = DummyScope(**{"${g}": 1, "${s}": 2})
+        self._test = None
+        self.current = DummyScope(**{"${g}": 1, "${s}": 2, "${l}": 3})
+        self._scopes = [self._global, self._suite, self.current]
+
+
+class DummyContext:
+    def __init__(self) -> None:
+        self.variables = DummyVariableScopes()
+
+
+def test_scopes_and_variables_should_be_looked_up_by_handles_of_the_current_stop(debugger: Debugger) -> None:
+    context = DummyContext()
+    frame = StackFrameEntry(weakref.ref(context), "keyword", "KEYWORD", SOURCE, 1)
+    debugger.stack_frames.appendleft(frame)
+    try:
+        assert debugger.get_scopes(frame.id) == []
+
+        stack_trace = debugger.get_stack_trace(0)
+        assert [f.id for f in stack_trace.stack_frames] == [frame.id]
+
+        scopes = {s.name: s.variables_reference for s in debugger.get_scopes(frame.id)}
+        assert list(scopes.keys()) == ["Local", "Suite", "Global"]
+
+        assert [v.name for v in debugger.get_variables(scopes["Local"])] == ["${l}"]
+        assert [v.name for v in debugger.get_variables(scopes["Suite"])] == ["${s}"]
+        assert [v.name for v in debugger.get_variables(scopes["Global"])] == ["${g}"]
+
+        debugger.start()
+
+        assert debugger.get_scopes(frame.id) == []
+        assert debugger.get_variables(scopes["Local"]) == []
+    finally:
+        debugger.stack_frames.remove(frame)
+
+
+def test_set_variable_should_be_returned_by_the_next_get_variables(debugger: Debugger) -> None:
+    from robot.variables import Variables
+
+    current = Variables()
+    current["${l}"] = 3
+
+    context = DummyContext()
+    context.variables.current = context.variables._scopes[-1] = current
+
+    frame = StackFrameEntry(weakref.ref(context), "keyword", "KEYWORD", SOURCE, 1)
+    debugger.stack_frames.appendleft(frame)
+    try:
+        debugger.get_stack_trace(0)
+        local = debugger.get_scopes(frame.id)[0].variables_reference
+
+        assert [(v.name, v.value) for v in debugger.get_variables(local)] == [("${l}", "3")]
+
+        debugger.set_variable(local, "${l}", "4")
+
+        assert [(v.name, v.value) for v in debugger.get_variables(local)] == [("${l}", "4")]
+    finally:
+        debugger.stack_frames.remove(frame)
+
+
+class NoLockCondition:
+    def __enter__(self) -> None:
+        raise AssertionError("condition should not be acquired while running")
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+
+def test_wait_for_running_should_not_acquire_the_condition_while_running(debugger: Debugger) -> None:
+    condition = debugger.condition
+    debugger.condition = NoLockCondition()  # type: ignore
+    try:
+        debugger.wait_for_running()
+
+        debugger.state = State.Stopped
+        debugger.wait_for_running()
+    finally:
+        debugger.condition = condition
+
+
+def test_wait_for_running_should_block_while_paused(debugger: Debugger) -> None:
+    debugger.set_main_thread(threading.current_thread())
+    debugger.state = State.Paused
+
+    thread = threading.Timer(0.1, debugger.continue_thread, args=(threading.current_thread().ident,))
+    thread.start()
+    try:
+        debugger.wait_for_running()
+
+        assert debugger.state == State.Running
+    finally:
+        thread.join()
@@ -0,0 +1,203 @@
+import time
+from pathlib import Path
+from typing import Any, Dict, Generator, List, cast
+
+import pytest
+
+from robotcode.debugger.dap_types import Event
+from robotcode.debugger.debugger import Debugger, KeywordEvents
+from robotcode.debugger.listeners import ListenerV2, ListenerV3
+
+
+@pytest.fixture
+def events() -> Generator[List[Event], None, None]:
+    debugger = Debugger.instance()
+    result: List[Event] = []
+
+    def collect(sender: Any, event: Event) -> None:
+        result.append(event)
+
+    debugger.send_event.add(collect)
+    try:
+        yield result
+    finally:
+        debugger.send_event.remove(collect)
+        debugger.keyword_events = KeywordEvents.ALL
+        debugger.keyword_events_sample_rate = 100
+        debugger.log_events_level = "TRACE"
+        debugger.event_batch_interval = 0
+
+
+def log(level: str) -> Any:
+    return {"level": level, "message": level, "timestamp": "", "html": "no"}
+
+
+def test_log_messages_below_level_should_not_be_sent(events: List[Event]) -> None:
+    Debugger.instance().log_events_level = "WARN"
+    listener = ListenerV2()
+
+    for level in ["TRACE", "INFO", "WARN", "ERROR"]:
+        listener.log_message(log(level))
+
+    assert [cast(Dict[str, Any], e.body)["level"] for e in events] == ["WARN", "ERROR"]
+
+
+def test_sampled_keyword_events_should_send_every_nth_keyword(events: List[Event]) -> None:
+    Debugger.instance().keyword_events = KeywordEvents.SAMPLED
+    listener = ListenerV2()
+
+    sent = [listener._should_send_keyword_event() for _ in range(Debugger.instance().keyword_events_sample_rate * 3)]
+
+    assert sent.count(True) == 3
+    assert sent[0]
+
+
+def test_events_should_be_batched_if_not_debugging(events: List[Event]) -> None:
+    Debugger.instance().event_batch_interval = 3600
+    listener = ListenerV2(no_debug=True)
+
+    for level in ["INFO", "WARN"]:
+        listener.log_message(log(level))
+
+    assert events == []
+
+    listener.close()
+
+    assert len(events) == 1
+    assert events[0].event == "robotEvents"
+    assert [e.body["level"] for e in cast(Dict[str, Any], events[0].body)["events"]] == ["INFO", "WARN"]
+
+
+def test_batched_events_should_be_sent_after_the_interval_without_further_events(events: List[Event]) -> None:
+    Debugger.instance().event_batch_interval = 0.05
+    listener = ListenerV2(no_debug=True)
+
+    listener.log_message(log("INFO"))
+
+    assert events == []
+
+    deadline = time.monotonic() + 5
+    while not events and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert [e.event for e in events] == ["robotEvents"]
+
+    listener.close()
+
+    assert len(events) == 1
+
+
+def test_events_of_short_tests_should_be_batched_until_the_end_of_the_root_suite(
+    events: List[Event], monkeypatch: Any
+) -> None:
+    # the stack frames of the debugger need a running robot
+    for method in ["start_suite", "end_suite", "start_test", "end_test", "start_output_group", "end_output_group"]:
+        monkeypatch.setattr(Debugger.instance(), method, lambda *args: None)
+
+    Debugger.instance().event_batch_interval = 3600
+    listener = ListenerV2(no_debug=True)
+
+    def attributes(longname: str) -> Dict[str, Any]:
+        return {"longname": longname, "source": None, "lineno": 0, "status": "PASS"}
+
+    listener.start_suite("Root", attributes("Root"))
+    listener.start_suite("Sub", attributes("Root.Sub"))
+    for name in ["A", "B", "C"]:
+        listener.start_test(name, attributes(f"Root.Sub.{name}"))
+        listener.end_test(name, attributes(f"Root.Sub.{name}"))
+    listener.end_suite("Sub", attributes("Root.Sub"))
+
+    assert events == []
+
+    listener.end_suite("Root", attributes("Root"))
+
+    assert [e.event for e in events] == ["robotEvents"]
+    assert len(cast(Dict[str, Any], events[0].body)["events"]) == 10
+
+    listener.close()
+
+    assert len(events) == 1
+
+
+def test_sampled_keyword_events_should_use_the_configured_sample_rate(events: List[Event]) -> None:
+    Debugger.instance().keyword_events = KeywordEvents.SAMPLED
+    Debugger.instance().keyword_events_sample_rate = 10
+    listener = ListenerV2()
+
+    sent = [listener._should_send_keyword_event() for _ in range(30)]
+
+    assert sent.count(True) == 3
+
+
+@pytest.mark.parametrize("rate", [1, 3])
+def test_sampled_keyword_events_should_send_the_first_keyword_of_every_rate_keywords(
+    events: List[Event], rate: int
+) -> None:
+    Debugger.instance().keyword_events = KeywordEvents.SAMPLED
+    Debugger.instance().keyword_events_sample_rate = rate
+    listener = ListenerV2()
+
+    sent = [listener._should_send_keyword_event() for _ in range(10)]
+
+    assert [i + 1 for i, s in enumerate(sent) if s] == list(range(1, 11, rate))
+
+
+def test_events_should_not_be_batched_if_debugging(events: List[Event]) -> None:
+    Debugger.instance().event_batch_interval = 3600
+    listener = ListenerV2(no_debug=False)
+
+    listener.log_message(log("INFO"))
+
+    assert [e.event for e in events] == ["robotLog"]
+
+
+def build_suite(path: Path) -> Any:
+    from robot.running.builder import TestSuiteBuilder
+
+    (path / "Suites" / "Sub").mkdir(parents=True)
+    for file, tests in [(path / "Suites" / "first.robot", ["A1", "A2"]), (path / "Suites" / "Sub" / "b.robot", ["B1"])]:
+        file.write_text("*** Test Cases ***\n" + "".join(f"{t}\n    No Operation\n" for t in tests), encoding="utf-8")
+
+    return TestSuiteBuilder().build(str(path / "Suites"))
+
+
+def enqueued_longnames(body: Dict[str, Any]) -> List[str]:
+    result: List[str] = []
+    for name, parent in zip(body["names"], body["parents"]):
+        prefix = result[parent] if parent >= 0 else body["root"]
+        result.append(f"{prefix}.{name}" if prefix else name)
+    return result
+
+
+def test_enqueued_tree_should_be_sent_once_for_the_root_suite(events: List[Event], tmp_path: Path) -> None:
+    from robot.running import TestCase
+
+    suite = build_suite(tmp_path)
+    listener = ListenerV3()
+
+    listener.start_suite(suite, None)
+
+    assert len(events) == 1
+    body = cast(Dict[str, Any], events[0].body)
+    assert body["root"] is None
+    assert enqueued_longnames(body) == [
+        "Suites",
+        "Suites.First",
+        "Suites.First.A1",
+        "Suites.First.A2",
+        "Suites.Sub",
+        "Suites.Sub.B",
+        "Suites.Sub.B.B1",
+    ]
+
+    for child in suite.suites:
+        listener.start_suite(child, None)
+
+    assert len(events) == 1
+
+    suite.suites[0].tests.append(TestCase(name="A3"))
+    listener.start_suite(suite.suites[0], None)
+
+    assert len(events) == 2
+    body = cast(Dict[str, Any], events[1].body)
+    assert enqueued_longnames(body) == ["Suites.First.A3"]
@@ -0,0 +1,165 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, List, cast
+
+import pytest
+
+from robotcode.debugger.parallel import (
+    KeepTests,
+    ParallelRun,
+    _build_suite,
+    merge_outputs,
+    split_tests,
+    worker_options,
+)
+
+SUITES = {
+    "first.robot": ["A1", "A2", "A3"],
+    "second.robot": ["B1", "B2"],
+    "third.robot": ["C1"],
+}
+
+
+@pytest.fixture
+def suite_dir(tmp_path: Path) -> Path:
+    result = tmp_path / "Suites"
+    result.mkdir()
+    for name, tests in SUITES.items():
+        (result / name).write_text(
+            "*** Test Cases ***\n" + "".join(f"{t}\n    Log    {t}\n" for t in tests), encoding="utf-8"
+        )
+    return result
+
+
+def build(suite_dir: Path, *args: str) -> Any:
+    suite, _, _, datasources = _build_suite([*args, str(suite_dir)])
+    assert datasources == [str(suite_dir)]
+    return suite
+
+
+def test_split_by_suite_should_keep_suites_together(suite_dir: Path) -> None:
+    groups = split_tests(build(suite_dir), 2, "suite")
+
+    assert groups == [
+        ["Suites.First.A1", "Suites.First.A2", "Suites.First.A3"],
+        ["Suites.Second.B1", "Suites.Second.B2", "Suites.Third.C1"],
+    ]
+
+
+def test_split_by_test_should_balance_tests(suite_dir: Path) -> None:
+    groups = split_tests(build(suite_dir), 4, "test")
+
+    assert sorted(len(g) for g in groups) == [1, 1, 2, 2]
+    assert sorted(t for g in groups for t in g) == sorted(
+        f"Suites.{n[:-6].title()}.{t}" for n, tests in SUITES.items() for t in tests
+    )
+
+
+def test_split_should_not_create_empty_groups(suite_dir: Path) -> None:
+    assert len(split_tests(build(suite_dir), 10, "suite")) == 3
+    assert split_tests(build(suite_dir, "--include", "nothing", "--runemptysuite"), 2, "test") == []
+
+
+def test_split_should_respect_filter_options(suite_dir: Path) -> None:
+    assert split_tests(build(suite_dir, "--test", "*1"), 2, "test") == [
+        ["Suites.First.A1", "Suites.Third.C1"],
+        ["Suites.Second.B1"],
+    ]
+
+
+def test_keep_tests_should_remove_other_tests_and_empty_suites(suite_dir: Path, tmp_path: Path) -> None:
+    tests_file = tmp_path / "tests.json"
+    tests_file.write_text(json.dumps(["Suites.First.A2", "Suites.Third.C1"]), encoding="utf-8")
+
+    suite = build(suite_dir)
+    suite.visit(KeepTests(str(tests_file)))
+
+    assert [s.name for s in suite.suites] == ["First", "Third"]
+    assert [[t.name for t in s.tests] for s in suite.suites] == [["A2"], ["C1"]]
+
+
+def test_merge_outputs_should_combine_suites_and_tests(suite_dir: Path, tmp_path: Path) -> None:
+    import robot
+    from robot.api import ExecutionResult
+
+    outputs: List[str] = []
+    for i, tests in enumerate([["A1", "B1"], ["A2", "A3", "B2", "C1"]]):
+        output = tmp_path / f"output-{i}.xml"
+        robot.run(
+            str(suite_dir),
+            test=tests,
+            outputdir=str(tmp_path),
+            output=str(output),
+            log="NONE",
+            report="NONE",
+            stdout=None,
+            console="none",
+        )
+        outputs.append(str(output))
+
+    merged = tmp_path / "merged.xml"
+    merge_outputs(outputs, str(merged))
+
+    result = ExecutionResult(str(merged))
+    assert [s.name for s in result.suite.suites] == ["First", "Second", "Third"]
+    assert [[t.name for t in s.tests] for s in result.suite.suites] == [["A1", "A2", "A3"], ["B1", "B2"], ["C1"]]
+    assert result.suite.statistics.passed == 6
+
+
+def test_worker_options_should_be_parsed_like_the_original_arguments(suite_dir: Path) -> None:
+    args = [
+        "-e",
+        "first",
+        "--exclude",
+        "second",
+        "-v",
+        "a:1",
+        "--dryrun",
+        "--nostatusrc",
+        "--loglevel",
+        "DEBUG",
+        "--maxerrorlines",
+        "10",
+        "--outputdir",
+        "out",
+        "--log",
+        "mylog.html",
+    ]
+    _, _, options, _ = _build_suite([*args, str(suite_dir)])
+
+    option_args = worker_options(options)
+
+    assert "--outputdir" not in option_args
+    assert "--log" not in option_args
+
+    _, _, worker, datasources = _build_suite([*option_args, str(suite_dir)])
+
+    assert datasources == [str(suite_dir)]
+    assert worker == {k: v for k, v in options.items() if k not in ["outputdir", "log"]}
+
+
+@pytest.mark.asyncio
+async def test_parallel_run_should_stop_all_workers_if_one_fails(
+    suite_dir: Path, tmp_path: Path, monkeypatch: Any
+) -> None:
+    from robotcode.debugger import parallel
+
+    calls = 0
+
+    async def connect(self: Any, timeout: float) -> None:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise ConnectionError("worker failed")
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(parallel.WorkerClient, "connect", connect)
+
+    run = ParallelRun(cast(Any, None), [str(suite_dir)], 3, "suite", connect_timeout=30)
+
+    with pytest.raises(ConnectionError):
+        await run.run()
+
+    assert len(run._processes) == 3
+    assert all(p.returncode is not None for p in run._processes)
@@ -0,0 +1,105 @@
+import json
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+from robotcode.debugger.profiler import Profiler
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0
+
+    def __call__(self) -> int:
+        return self.now
+
+    def advance(self, ms: int) -> None:
+        self.now += ms * 1_000_000
+
+
+@pytest.fixture
+def clock(monkeypatch: Any) -> Iterator[Clock]:
+    clock = Clock()
+    monkeypatch.setattr("robotcode.debugger.profiler.time.perf_counter_ns", clock)
+    yield clock
+
+
+def keyword(kwname: str, libname: str = "", type: str = "KEYWORD") -> Any:
+    return {"kwname": kwname, "libname": libname, "type": type}
+
+
+def run_profile(clock: Clock) -> Profiler:
+    profiler = Profiler()
+
+    profiler.start_suite("Suite", {})
+    profiler.start_test("Test", {})
+
+    profiler.start_keyword("My Keyword", keyword("My Keyword"))
+    clock.advance(1)
+    for _ in range(2):
+        profiler.start_keyword("BuiltIn.Sleep", keyword("Sleep", "BuiltIn"))
+        clock.advance(10)
+        profiler.end()
+    profiler.end()
+
+    profiler.start_keyword("My Keyword", keyword("My Keyword"))
+    profiler.start_keyword("My Keyword", keyword("My Keyword"))
+    clock.advance(5)
+    profiler.end()
+    profiler.end()
+
+    profiler.end()
+    profiler.end()
+
+    return profiler
+
+
+def test_profiler_should_aggregate_self_and_total_time_per_keyword(clock: Clock) -> None:
+    profiler = run_profile(clock)
+
+    sleep = profiler.timings[("BuiltIn", "Sleep")]
+    assert (sleep.calls, sleep.total_ns, sleep.self_ns) == (2, 20_000_000, 20_000_000)
+
+    own = profiler.timings[("", "My Keyword")]
+    assert (own.calls, own.total_ns, own.self_ns) == (3, 26_000_000, 6_000_000)
+
+
+def test_profiler_should_collect_collapsed_stacks(clock: Clock) -> None:
+    profiler = run_profile(clock)
+
+    assert profiler.collapsed_stacks() == [
+        "Suite;Test;My Keyword;BuiltIn.Sleep 20000",
+        "Suite;Test;My Keyword 1000",
+        "Suite;Test;My Keyword;My Keyword 5000",
+    ]
+
+
+def test_profiler_should_name_control_structures_by_type(clock: Clock) -> None:
+    profiler = Profiler()
+
+    profiler.start_keyword("${i} IN RANGE [ 2 ]", keyword("${i} IN RANGE [ 2 ]", type="FOR"))
+    clock.advance(1)
+    profiler.end()
+
+    assert profiler.collapsed_stacks() == ["FOR ${i} IN RANGE [ 2 ] 1000"]
+    assert profiler.timings == {}
+
+
+def test_profiler_should_write_speedscope_and_summary(clock: Clock, tmp_path: Path) -> None:
+    profiler = run_profile(clock)
+
+    profiler.write(str(tmp_path))
+
+    speedscope = json.loads((tmp_path / "profile.speedscope.json").read_text("utf-8"))
+    frames = [f["name"] for f in speedscope["shared"]["frames"]]
+    profile = speedscope["profiles"][0]
+    assert [[frames[i] for i in s] for s in profile["samples"]][0] == ["Suite", "Test", "My Keyword", "BuiltIn.Sleep"]
+    assert profile["endValue"] == 26_000_000
+
+    summary = (tmp_path / "profile.txt").read_text("utf-8").splitlines()
+    assert summary[0].split() == ["Keyword", "Library", "Calls", "Total", "(ms)", "Self", "(ms)", "Avg", "(ms)"]
+    assert summary[1].split() == ["Sleep", "BuiltIn", "2", "20.00", "20.00", "10.00"]
+    assert summary[2].split() == ["My", "Keyword", "3", "26.00", "6.00", "8.67"]
+
+    assert (tmp_path / "profile.collapsed").exists()
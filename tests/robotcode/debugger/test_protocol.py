@@ -0,0 +1,83 @@
+import asyncio
+from typing import Generator, List, Optional, Type
+
+import pytest
+
+from robotcode.debugger.dap_types import Event, OutputEvent, OutputEventBody
+from robotcode.debugger.protocol import (
+    DebugAdapterProtocol,
+    MessageEncoding,
+    msgpack_installed,
+)
+
+
+@pytest.fixture
+def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+class PipeTransport(asyncio.Transport):
+    def __init__(self) -> None:
+        super().__init__()
+        self.peer: Optional[DebugAdapterProtocol] = None
+        self.written: List[bytes] = []
+
+    def write(self, data: bytes) -> None:
+        self.written.append(data)
+        if self.peer is not None:
+            self.peer.data_received(data)
+
+
+class EventCollectingProtocol(DebugAdapterProtocol):
+    def __init__(self) -> None:
+        super().__init__()
+        self.events: List[Event] = []
+
+    async def handle_event(self, message: Event) -> None:
+        self.events.append(message)
+
+
+class JsonOnlyProtocol(EventCollectingProtocol):
+    @property
+    def supported_encodings(self) -> List[MessageEncoding]:
+        return [MessageEncoding.JSON]
+
+
+def create_connected_protocols(
+    server_type: Type[EventCollectingProtocol] = EventCollectingProtocol,
+) -> List[EventCollectingProtocol]:
+    result = [EventCollectingProtocol(), server_type()]
+    for protocol, peer in zip(result, reversed(result)):
+        transport = PipeTransport()
+        transport.peer = peer
+        protocol.connection_made(transport)
+
+    return result
+
+
+@pytest.mark.asyncio
+async def test_negotiate_encoding_should_switch_both_sides_to_msgpack() -> None:
+    if not msgpack_installed():
+        pytest.skip("msgpack is not installed")
+
+    client, server = create_connected_protocols()
+
+    assert await asyncio.wait_for(client.negotiate_encoding(), 5) == MessageEncoding.MSGPACK
+    assert server.encoding == MessageEncoding.MSGPACK
+
+    server.send_event(OutputEvent(body=OutputEventBody(output="hello")))
+    await asyncio.sleep(0)
+
+    assert client.events[-1].event == "output"
+    assert client.events[-1].body == {"output": "hello"}
+    assert b"Content-Type: application/msgpack" in server.write_transport.written[-1]  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_negotiate_encoding_should_fall_back_to_json() -> None:
+    client, server = create_connected_protocols(JsonOnlyProtocol)
+
+    assert await asyncio.wait_for(client.negotiate_encoding(), 5) == MessageEncoding.JSON
+    assert server.encoding == MessageEncoding.JSON
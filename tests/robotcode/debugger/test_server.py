@@ -0,0 +1,131 @@
+import asyncio
+import json
+import threading
+from typing import Any, Dict, Generator, List, cast
+
+import pytest
+
+from robotcode.debugger.dap_types import (
+    Event,
+    OutputCategory,
+    OutputEvent,
+    OutputEventBody,
+    StoppedEvent,
+    StoppedEventBody,
+    StoppedReason,
+)
+from robotcode.debugger.server import (
+    EventOverflowPolicy,
+    EventQueue,
+    LauncherServerProtocol,
+)
+
+
+@pytest.fixture
+def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def log_event(message: str, item: str = "test") -> Event:
+    return Event(event="robotLog", body={"itemId": item, "level": "INFO", "message": message})
+
+
+def stopped_event() -> Event:
+    return StoppedEvent(body=StoppedEventBody(reason=StoppedReason.PAUSE))
+
+
+def drain(queue: EventQueue) -> List[Event]:
+    result = []
+    while (e := queue.get_nowait()) is not None:
+        result.append(e)
+    return result
+
+
+def test_event_queue_drop_oldest_should_only_drop_droppable_events() -> None:
+    queue = EventQueue(2, EventOverflowPolicy.DROP_OLDEST)
+
+    queue.put(stopped_event())
+    queue.put(log_event("1"))
+    queue.put(log_event("2"))
+
+    events = drain(queue)
+
+    assert [e.event for e in events] == ["stopped", "robotLog"]
+    assert cast(Dict[str, Any], events[1].body)["message"] == "2"
+    assert queue.dropped == 1
+
+
+def test_event_queue_coalesce_logs_should_merge_log_messages() -> None:
+    queue = EventQueue(2, EventOverflowPolicy.COALESCE_LOGS)
+
+    queue.put(log_event("1"))
+    queue.put(OutputEvent(body=OutputEventBody(output="a", category=OutputCategory.CONSOLE)))
+    queue.put(OutputEvent(body=OutputEventBody(output="b", category=OutputCategory.CONSOLE)))
+
+    events = drain(queue)
+
+    assert isinstance(events[1], OutputEvent)
+    assert events[1].body is not None and events[1].body.output == "ab"
+    assert queue.coalesced == 1
+
+
+def test_event_queue_block_should_wait_for_room() -> None:
+    queue = EventQueue(1, EventOverflowPolicy.BLOCK)
+    queue.put(log_event("1"))
+
+    thread = threading.Thread(target=queue.put, args=(log_event("2"),))
+    thread.start()
+    thread.join(0.1)
+
+    assert thread.is_alive()
+
+    assert queue.get_nowait() is not None
+    thread.join(5)
+
+    assert not thread.is_alive()
+    assert queue.blocked == 1
+    assert [cast(Dict[str, Any], e.body)["message"] for e in drain(queue)] == ["2"]
+
+
+class DummyTransport(asyncio.Transport):
+    def __init__(self) -> None:
+        super().__init__()
+        self.written: List[bytes] = []
+
+    def write(self, data: bytes) -> None:
+        self.written.append(data)
+
+    def get_extra_info(self, name: Any, default: Any = None) -> Any:
+        return default
+
+    @property
+    def bodies(self) -> List[Any]:
+        return [json.loads(d[d.index(b"\r\n\r\n") + 4 :]) for d in self.written]  # noqa: E203
+
+
+@pytest.mark.asyncio
+async def test_paused_writing_should_queue_events_in_order() -> None:
+    protocol = LauncherServerProtocol()
+    transport = DummyTransport()
+    protocol.connection_made(transport)
+
+    protocol.pause_writing()
+
+    def send() -> None:
+        for i in range(3):
+            protocol.send_event(log_event(str(i)))
+
+    thread = threading.Thread(target=send)
+    thread.start()
+    thread.join()
+    protocol.send_event(log_event("3"))
+
+    await asyncio.sleep(0)
+
+    assert transport.written == []
+
+    protocol.resume_writing()
+
+    assert [b["body"]["message"] for b in transport.bodies] == ["0", "1", "2", "3"]
@@ -0,0 +1,386 @@
+"""
+Throughput benchmark for ``JsonRPCProtocol``.
+
+Drives the protocol through an in-memory transport with LSP like traffic and reports
+messages/sec, p50/p99 latency and allocations per scenario. All messages of a scenario are
+fed as one burst in 64KiB chunks, latency is measured from the moment a message is completely
+received until its response is written or the notification handler is finished.
+
+Run it from the repository root with::
+
+    python -m tests.robotcode.jsonrpc.bench_jsonrpcprotocol [--scale 1.0] [--json results.json]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple, cast
+
+from robotcode.jsonrpc2.protocol import (
+    JsonRPCMessage,
+    JsonRPCNotification,
+    JsonRPCProtocol,
+    JsonRPCRequest,
+    rpc_method,
+)
+from robotcode.language_server.common.lsp_types import (
+    CompletionContext,
+    CompletionItem,
+    CompletionItemKind,
+    CompletionList,
+    CompletionParams,
+    CompletionTriggerKind,
+    DidChangeTextDocumentParams,
+    DidOpenTextDocumentParams,
+    MarkupContent,
+    MarkupKind,
+    Position,
+    Range,
+    SemanticTokens,
+    SemanticTokensParams,
+    TextDocumentContentChangeEvent,
+    TextDocumentContentRangeChangeEvent,
+    TextDocumentIdentifier,
+    TextDocumentItem,
+    VersionedTextDocumentIdentifier,
+)
+from robotcode.language_server.common.text_document import TextDocument
+from robotcode.utils.dataclasses import as_json
+
+__all__ = ["ScenarioResult", "run_benchmark", "main"]
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class InMemoryTransport(asyncio.Transport):
+    def __init__(self) -> None:
+        super().__init__()
+        self.written: List[Tuple[float, bytes]] = []
+
+    def write(self, data: bytes) -> None:
+        self.written.append((time.perf_counter(), data))
+
+    def close(self) -> None:
+        pass
+
+
+class BenchmarkProtocol(JsonRPCProtocol):
+    def __init__(self, completion_items: int, semantic_tokens: int) -> None:
+        super().__init__()
+        self.documents: Dict[str, TextDocument] = {}
+        self.notifications_done: Dict[Tuple[str, int], float] = {}
+
+        self.completion_list = CompletionList(
+            is_incomplete=False,
+            items=[
+                CompletionItem(
+                    label=f"Keyword Number {i}",
+                    kind=CompletionItemKind.FUNCTION,
+                    detail="Keyword",
+                    sort_text=f"020_Keyword Number {i}",
+                    insert_text=f"Keyword Number {i}",
+                    documentation=MarkupContent(
+                        kind=MarkupKind.MARKDOWN, value=f"Documentation for *Keyword Number {i}*.\n\n`arg1`, `arg2`"
+                    ),
+                )
+                for i in range(completion_items)
+            ],
+        )
+        self.semantic_tokens = SemanticTokens(data=[i % 17 for i in range(semantic_tokens * 5)])
+
+    @rpc_method(name="textDocument/didOpen", param_type=DidOpenTextDocumentParams)
+    async def _text_document_did_open(self, text_document: TextDocumentItem, *args: Any, **kwargs: Any) -> None:
+        self.documents[text_document.uri] = TextDocument(text_document)
+        self.notifications_done[(text_document.uri, text_document.version)] = time.perf_counter()
+
+    @rpc_method(name="textDocument/didChange", param_type=DidChangeTextDocumentParams)
+    async def _text_document_did_change(
+        self,
+        text_document: VersionedTextDocumentIdentifier,
+        content_changes: List[TextDocumentContentChangeEvent],
+        *args: Any,
+        **kwargs: Any,
+    ) -> None:
+        document = self.documents[text_document.uri]
+        for change in content_changes:
+            if isinstance(change, TextDocumentContentRangeChangeEvent):
+                await document.apply_incremental_change(text_document.version, change.range, change.text)
+            else:
+                await document.apply_full_change(text_document.version, change.text)
+        self.notifications_done[(text_document.uri, text_document.version)] = time.perf_counter()
+
+    @rpc_method(name="textDocument/completion", param_type=CompletionParams)
+    async def _text_document_completion(self, *args: Any, **kwargs: Any) -> CompletionList:
+        return self.completion_list
+
+    @rpc_method(name="textDocument/semanticTokens/full", param_type=SemanticTokensParams)
+    async def _text_document_semantic_tokens_full(self, *args: Any, **kwargs: Any) -> SemanticTokens:
+        return self.semantic_tokens
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    messages: int
+    bytes_in: int
+    bytes_out: int
+    seconds: float
+    messages_per_second: float
+    p50_ms: float
+    p99_ms: float
+    peak_kib: Optional[float] = None
+    retained_kib: Optional[float] = None
+
+
+def _frame(message: JsonRPCMessage) -> bytes:
+    body = as_json(message).encode("utf-8")
+    return f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body
+
+
+def _percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p * (len(values) - 1))))]
+
+
+def _generate_robot_file(lines: int) -> str:
+    result = ["*** Settings ***", "Library    Collections", "", "*** Test Cases ***"]
+    i = 0
+    while len(result) < lines:
+        result += [
+            f"Test Case {i}",
+            "    [Documentation]    some documentation for this test",
+            f"    ${{result}}    Set Variable    value {i}",
+            "    Log    ${result}    level=INFO",
+            "    Should Be Equal    ${result}    ${result}",
+            "",
+        ]
+        i += 1
+    return "\n".join(result[:lines]) + "\n"
+
+
+class _Scenario:
+    def __init__(self, name: str, messages: List[JsonRPCMessage]) -> None:
+        self.name = name
+        self.messages = messages
+
+    @staticmethod
+    def key(message: JsonRPCMessage) -> Any:
+        if isinstance(message, JsonRPCRequest):
+            return message.id
+        if isinstance(message, JsonRPCNotification):
+            text_document = cast(Dict[str, Any], message.params)["textDocument"]
+            return (text_document["uri"], text_document["version"])
+        raise ValueError(f"Unsupported message {message!r}")
+
+
+def _build_scenarios(scale: float, seed: int = 0) -> List[_Scenario]:
+    rnd = random.Random(seed)
+    lines = max(10, int(10000 * scale))
+    text = _generate_robot_file(lines)
+    uri = "file:///bench/large.robot"
+
+    def params(obj: Any) -> Any:
+        return json.loads(as_json(obj))
+
+    open_messages: List[JsonRPCMessage] = [
+        JsonRPCNotification(
+            method="textDocument/didOpen",
+            params=params(
+                DidOpenTextDocumentParams(
+                    TextDocumentItem(uri=f"{uri}.{i}", language_id="robotframework", version=0, text=text)
+                )
+            ),
+        )
+        for i in range(max(1, int(20 * scale)))
+    ]
+
+    change_messages: List[JsonRPCMessage] = []
+    for version in range(1, max(2, int(1000 * scale))):
+        line = rnd.randrange(lines)
+        change_messages.append(
+            JsonRPCNotification(
+                method="textDocument/didChange",
+                params=params(
+                    DidChangeTextDocumentParams(
+                        VersionedTextDocumentIdentifier(uri=f"{uri}.0", version=version),
+                        [
+                            TextDocumentContentRangeChangeEvent(
+                                range=Range(start=Position(line, 4), end=Position(line, 4)), text="x"
+                            )
+                        ],
+                    )
+                ),
+            )
+        )
+
+    request_id = 0
+
+    def next_id() -> int:
+        nonlocal request_id
+        request_id += 1
+        return request_id
+
+    completion_messages: List[JsonRPCMessage] = [
+        JsonRPCRequest(
+            id=next_id(),
+            method="textDocument/completion",
+            params=params(
+                CompletionParams(
+                    text_document=TextDocumentIdentifier(uri=f"{uri}.0"),
+                    position=Position(line=rnd.randrange(lines), character=4),
+                    context=CompletionContext(trigger_kind=CompletionTriggerKind.INVOKED),
+                )
+            ),
+        )
+        for _ in range(max(1, int(50 * scale)))
+    ]
+
+    semantic_tokens_messages: List[JsonRPCMessage] = [
+        JsonRPCRequest(
+            id=next_id(),
+            method="textDocument/semanticTokens/full",
+            params=params(SemanticTokensParams(text_document=TextDocumentIdentifier(uri=f"{uri}.0"))),
+        )
+        for _ in range(max(1, int(20 * scale)))
+    ]
+
+    return [
+        _Scenario("didOpen (large file)", open_messages),
+        _Scenario("didChange (burst)", change_messages),
+        _Scenario("completion", completion_messages),
+        _Scenario("semanticTokens/full", semantic_tokens_messages),
+    ]
+
+
+async def _run_scenario(
+    protocol: BenchmarkProtocol, transport: InMemoryTransport, scenario: _Scenario
+) -> Tuple[int, int, float, List[float]]:
+    frames = [_frame(m) for m in scenario.messages]
+    keys = [scenario.key(m) for m in scenario.messages]
+    stream = b"".join(frames)
+
+    ends: List[int] = []
+    offset = 0
+    for f in frames:
+        offset += len(f)
+        ends.append(offset)
+
+    protocol.notifications_done.clear()
+    transport.written.clear()
+
+    started: Dict[Any, float] = {}
+    next_message = 0
+
+    begin = time.perf_counter()
+    for chunk_start in range(0, len(stream), READ_CHUNK_SIZE):
+        chunk_end = chunk_start + READ_CHUNK_SIZE
+        now = time.perf_counter()
+        while next_message < len(ends) and ends[next_message] <= chunk_end:
+            started[keys[next_message]] = now
+            next_message += 1
+        protocol.data_received(stream[chunk_start:chunk_end])
+        await asyncio.sleep(0)
+
+    while len(protocol.notifications_done) + len(transport.written) < len(keys):
+        await asyncio.sleep(0)
+
+    seconds = time.perf_counter() - begin
+
+    finished: Dict[Any, float] = dict(protocol.notifications_done)
+    for t, data in transport.written:
+        body = data[data.index(b"\r\n\r\n") + 4 :]  # noqa: E203
+        finished[json.loads(body)["id"]] = t
+
+    latencies = [(finished[k] - started[k]) * 1000 for k in keys]
+    bytes_out = sum(len(d) for _, d in transport.written)
+
+    return len(stream), bytes_out, seconds, latencies
+
+
+async def run_benchmark(
+    scale: float = 1.0,
+    trace_allocations: bool = True,
+    completion_items: int = 2000,
+    semantic_tokens: int = 50000,
+) -> List[ScenarioResult]:
+    protocol = BenchmarkProtocol(max(1, int(completion_items * scale)), max(1, int(semantic_tokens * scale)))
+    transport = InMemoryTransport()
+    protocol.connection_made(transport)
+
+    results: List[ScenarioResult] = []
+
+    for scenario in _build_scenarios(scale):
+        bytes_in, bytes_out, seconds, latencies = await _run_scenario(protocol, transport, scenario)
+
+        result = ScenarioResult(
+            name=scenario.name,
+            messages=len(scenario.messages),
+            bytes_in=bytes_in,
+            bytes_out=bytes_out,
+            seconds=seconds,
+            messages_per_second=len(scenario.messages) / seconds if seconds > 0 else 0.0,
+            p50_ms=_percentile(latencies, 0.5),
+            p99_ms=_percentile(latencies, 0.99),
+        )
+
+        if trace_allocations:
+            tracemalloc.start()
+            try:
+                await _run_scenario(protocol, transport, scenario)
+                current, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+            result.peak_kib = peak / 1024
+            result.retained_kib = current / 1024
+
+        results.append(result)
+
+    return results
+
+
+def _format_results(results: List[ScenarioResult]) -> str:
+    header = f"{'scenario':<22} {'msgs':>6} {'msgs/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'MiB in':>8} {'MiB out':>8}"
+    header += f" {'peak KiB':>10} {'kept KiB':>10}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        line = (
+            f"{r.name:<22} {r.messages:>6} {r.messages_per_second:>10.1f} {r.p50_ms:>9.3f} {r.p99_ms:>9.3f}"
+            f" {r.bytes_in / 1048576:>8.2f} {r.bytes_out / 1048576:>8.2f}"
+        )
+        line += f" {r.peak_kib:>10.1f}" if r.peak_kib is not None else f" {'-':>10}"
+        line += f" {r.retained_kib:>10.1f}" if r.retained_kib is not None else f" {'-':>10}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="JsonRPCProtocol throughput benchmark",
+        prog=__package__,
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--scale", default=1.0, type=float, help="scales the size and number of messages")
+    parser.add_argument("--no-allocations", action="store_true", help="do not trace allocations")
+    parser.add_argument("--json", default=None, metavar="FILE", help="writes the results as json to FILE")
+
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(args.scale, not args.no_allocations))
+
+    print(_format_results(results))
+
+    if args.json is not None:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([asdict(r) for r in results], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 import asyncio
-from typing import Any, Dict, Generator, List, Optional, cast
+import json
+import threading
+from typing import Any, Dict, Generator, List, Optional, Tuple, cast
 
 import pytest
 
@@ -8,9 +10,11 @@ from robotcode.jsonrpc2.protocol import (
     JsonRPCErrorObject,
     JsonRPCErrors,
     JsonRPCMessage,
+    JsonRPCNotification,
     JsonRPCProtocol,
     JsonRPCRequest,
     JsonRPCResponse,
+    rpc_method,
 )
 from robotcode.jsonrpc2.server import JsonRPCServer
 from robotcode.language_server.common.lsp_types import MessageActionItem
@@ -35,6 +39,43 @@ class DummyJsonRPCProtocol(JsonRPCProtocol):
         return await asyncio.sleep(0)
 
 
+class DummyTransport(asyncio.Transport):
+    def __init__(self) -> None:
+        super().__init__()
+        self.written: List[bytes] = []
+
+    def write(self, data: bytes) -> None:
+        self.written.append(data)
+
+    @property
+    def bodies(self) -> List[Any]:
+        return [json.loads(d[d.index(b"\r\n\r\n") + 4 :]) for d in self.written]  # noqa: E203
+
+
+class BatchJsonRPCProtocol(JsonRPCProtocol):
+    BATCH_MAX_CONCURRENCY = 2
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.running = 0
+        self.max_running = 0
+        self.notified: List[Any] = []
+
+    @rpc_method(name="sleep")
+    async def _sleep(self, value: int) -> int:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(0.01 * value)
+        finally:
+            self.running -= 1
+        return value
+
+    @rpc_method(name="notify")
+    async def _notify(self, value: Any) -> None:
+        self.notified.append(value)
+
+
 @pytest.fixture(scope="module")
 def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
     loop = asyncio.new_event_loop()
@@ -242,3 +283,173 @@ async def test_receive_response_with_generic_dict_should_return_unchanged() -> N
     a = await asyncio.wait_for(r, 10)
 
     assert a == [as_dict(MessageActionItem(title="hi there"))]
+
+
+@pytest.mark.asyncio
+async def test_benchmark_harness_should_run() -> None:
+    from .bench_jsonrpcprotocol import run_benchmark
+
+    results = await run_benchmark(scale=0.01)
+
+    assert [r.name for r in results] == [
+        "didOpen (large file)",
+        "didChange (burst)",
+        "completion",
+        "semanticTokens/full",
+    ]
+    assert all(r.messages > 0 and r.messages_per_second > 0 and r.p99_ms >= r.p50_ms for r in results)
+    assert all(r.peak_kib is not None for r in results)
+
+
+async def send_batch_and_wait(messages: List[JsonRPCMessage]) -> Tuple[BatchJsonRPCProtocol, DummyTransport]:
+    protocol = BatchJsonRPCProtocol()
+    transport = DummyTransport()
+    protocol.connection_made(transport)
+
+    json_message = as_json(messages).encode("utf-8")
+    header = f"Content-Length: {len(json_message)}\r\n\r\n".encode("ascii")
+    protocol.data_received(header + json_message)
+
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        if transport.written or len(protocol.notified) == len(messages):
+            break
+
+    return protocol, transport
+
+
+@pytest.mark.asyncio
+async def test_receive_a_batch_request_should_send_one_ordered_batch_response() -> None:
+    protocol, transport = await send_batch_and_wait(
+        [
+            JsonRPCRequest(id=1, method="sleep", params={"value": 3}),
+            JsonRPCNotification(method="notify", params={"value": "x"}),
+            JsonRPCRequest(id=2, method="sleep", params={"value": 1}),
+            JsonRPCRequest(id=3, method="sleep", params={"value": 2}),
+            JsonRPCRequest(id=4, method="unknown"),
+        ]
+    )
+
+    assert len(transport.written) == 1
+    response = transport.bodies[0]
+    assert isinstance(response, list)
+    assert [r["id"] for r in response] == [1, 2, 3, 4]
+    assert [r.get("result", None) for r in response[:3]] == [3, 1, 2]
+    assert response[3]["error"]["code"] == JsonRPCErrors.METHOD_NOT_FOUND
+    assert protocol.notified == ["x"]
+
+
+@pytest.mark.asyncio
+async def test_receive_a_batch_request_should_limit_concurrency() -> None:
+    protocol, transport = await send_batch_and_wait(
+        [JsonRPCRequest(id=i, method="sleep", params={"value": 1}) for i in range(6)]
+    )
+
+    assert [r["id"] for r in transport.bodies[0]] == list(range(6))
+    assert protocol.max_running == BatchJsonRPCProtocol.BATCH_MAX_CONCURRENCY
+
+
+@pytest.mark.asyncio
+async def test_receive_a_batch_of_notifications_should_send_nothing() -> None:
+    protocol, transport = await send_batch_and_wait(
+        [JsonRPCNotification(method="notify", params={"value": i}) for i in range(3)]
+    )
+
+    assert protocol.notified == [0, 1, 2]
+    assert transport.written == []
+
+
+@pytest.mark.asyncio
+async def test_receive_an_empty_batch_should_send_an_error() -> None:
+    protocol = DummyJsonRPCProtocol(None)
+
+    json_message = b"[]"
+    header = f"Content-Length: {len(json_message)}\r\n\r\n".encode("ascii")
+    await protocol.data_received_async(header + json_message)
+
+    assert (
+        isinstance(protocol.sended_message, JsonRPCError)
+        and protocol.sended_message.error.code == JsonRPCErrors.INVALID_REQUEST
+    )
+
+
+@pytest.mark.asyncio
+async def test_receive_a_batch_with_invalid_message_should_send_an_error_for_this_message() -> None:
+    protocol = BatchJsonRPCProtocol()
+    transport = DummyTransport()
+    protocol.connection_made(transport)
+
+    json_message = b'[{"jsonrpc": "2.0", "id": 1, "method": "sleep", "params": {"value": 0}}, {"id": 2}, 1]'
+    header = f"Content-Length: {len(json_message)}\r\n\r\n".encode("ascii")
+    protocol.data_received(header + json_message)
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        if transport.written:
+            break
+
+    response = transport.bodies[0]
+    assert [r["id"] for r in response] == [1, 2, None]
+    assert response[0]["result"] == 0
+    assert response[1]["error"]["code"] == JsonRPCErrors.INVALID_REQUEST
+    assert response[2]["error"]["code"] == JsonRPCErrors.INVALID_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_call_in_loop_from_other_threads_should_run_callbacks_in_order_in_loop_thread() -> None:
+    protocol = BatchJsonRPCProtocol()
+    protocol.connection_made(DummyTransport())
+
+    calls: List[Tuple[int, int]] = []
+    done = asyncio.Event()
+
+    def callback(value: int) -> None:
+        calls.append((value, threading.get_ident()))
+        if value == 99:
+            done.set()
+
+    def run() -> None:
+        for i in range(100):
+            protocol.call_in_loop(callback, i)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+
+    await asyncio.wait_for(done.wait(), 5)
+
+    assert [v for v, _ in calls] == list(range(100))
+    assert {t for _, t in calls} == {threading.get_ident()}
+
+
+@pytest.mark.asyncio
+async def test_send_request_from_other_thread_should_work() -> None:
+    protocol = BatchJsonRPCProtocol()
+    transport = DummyTransport()
+    protocol.connection_made(transport)
+
+    results: List[Any] = []
+
+    def run() -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            results.append(loop.run_until_complete(protocol.send_request("dummy/method", ["dummy", "data"], list)))
+        finally:
+            loop.close()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+
+    while not transport.written:
+        await asyncio.sleep(0.01)
+
+    request = transport.bodies[0]
+    assert request["method"] == "dummy/method"
+
+    body = as_json(JsonRPCResponse(id=request["id"], result=["dummy", "result"])).encode("utf-8")
+    protocol.data_received(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+
+    while thread.is_alive():
+        await asyncio.sleep(0.01)
+
+    assert results == [["dummy", "result"]]
@@ -0,0 +1,137 @@
+import asyncio
+import json
+from asyncio.events import AbstractEventLoop
+from typing import Any, Generator, List
+
+import pytest
+
+from robotcode.jsonrpc2.protocol import (
+    JsonRPCMessage,
+    JsonRPCNotification,
+    JsonRPCRequest,
+    rpc_method,
+)
+from robotcode.language_server.common.lsp_types import (
+    DidChangeTextDocumentParams,
+    DidOpenTextDocumentParams,
+    ErrorCodes,
+    Position,
+    Range,
+    TextDocumentContentRangeChangeEvent,
+    TextDocumentIdentifier,
+    TextDocumentItem,
+    TextDocumentPositionParams,
+    VersionedTextDocumentIdentifier,
+)
+from robotcode.language_server.common.protocol import LanguageServerProtocol
+from robotcode.utils.dataclasses import as_json
+
+
+@pytest.fixture
+def event_loop() -> Generator[AbstractEventLoop, None, None]:
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+class DummyTransport(asyncio.Transport):
+    def __init__(self) -> None:
+        super().__init__()
+        self.written: List[bytes] = []
+
+    def write(self, data: bytes) -> None:
+        self.written.append(data)
+
+    @property
+    def bodies(self) -> List[Any]:
+        return [json.loads(d[d.index(b"\r\n\r\n") + 4 :]) for d in self.written]  # noqa: E203
+
+
+class DummyLanguageServerProtocol(LanguageServerProtocol):
+    STALE_REQUEST_METHODS = frozenset({"test/stale"})
+
+    def __init__(self) -> None:
+        super().__init__(None)  # type: ignore
+        self.release = asyncio.Event()
+
+    @rpc_method(name="test/stale", param_type=TextDocumentPositionParams)
+    async def _stale(self, *args: Any, **kwargs: Any) -> str:
+        await self.release.wait()
+        return "stale"
+
+    @rpc_method(name="test/other", param_type=TextDocumentPositionParams)
+    async def _other(self, *args: Any, **kwargs: Any) -> str:
+        await self.release.wait()
+        return "other"
+
+
+URI = "file:///test.robot"
+
+
+async def send(protocol: LanguageServerProtocol, message: JsonRPCMessage) -> None:
+    body = as_json(message).encode("utf-8")
+    protocol.data_received(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def position_request(id: int, method: str) -> JsonRPCRequest:
+    return JsonRPCRequest(
+        id=id,
+        method=method,
+        params=json.loads(
+            as_json(TextDocumentPositionParams(text_document=TextDocumentIdentifier(uri=URI), position=Position(0, 0)))
+        ),
+    )
+
+
+def change_notification(version: int) -> JsonRPCNotification:
+    return JsonRPCNotification(
+        method="textDocument/didChange",
+        params=json.loads(
+            as_json(
+                DidChangeTextDocumentParams(
+                    VersionedTextDocumentIdentifier(uri=URI, version=version),
+                    [TextDocumentContentRangeChangeEvent(range=Range(Position(0, 0), Position(0, 0)), text="x")],
+                )
+            )
+        ),
+    )
+
+
+@pytest.mark.asyncio
+async def test_stale_requests_should_be_canceled_if_document_changes() -> None:
+    protocol = DummyLanguageServerProtocol()
+    transport = DummyTransport()
+    protocol.connection_made(transport)
+
+    await send(
+        protocol,
+        JsonRPCNotification(
+            method="textDocument/didOpen",
+            params=json.loads(
+                as_json(
+                    DidOpenTextDocumentParams(
+                        TextDocumentItem(uri=URI, language_id="robotframework", version=1, text="text")
+                    )
+                )
+            ),
+        ),
+    )
+    await send(protocol, position_request(1, "test/stale"))
+    await send(protocol, position_request(2, "test/other"))
+
+    assert transport.written == []
+
+    await send(protocol, change_notification(2))
+
+    assert len(transport.bodies) == 1
+    assert transport.bodies[0]["id"] == 1
+    assert transport.bodies[0]["error"]["code"] == ErrorCodes.CONTENT_MODIFIED
+
+    await send(protocol, position_request(3, "test/stale"))
+    protocol.release.set()
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    assert sorted((b["id"], b.get("result", None)) for b in transport.bodies[1:]) == [(2, "other"), (3, "stale")]
@@ -0,0 +1,193 @@
+"""
+Benchmark for the semantic tokens of the robot language server.
+
+Generates a robot file with the given number of lines and measures the encoding of the semantic
+tokens for the whole document and for a viewport at the end of the document. Reports the time per
+request, tokens/sec and allocations.
+
+Run it from the repository root with::
+
+    python -m tests.robotcode.language_server.robotframework.parts.bench_semantic_tokens [--lines 10000]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, List, Optional
+
+from robotcode.language_server.common.lsp_types import (
+    ClientCapabilities,
+    InitializedParams,
+    Position,
+    Range,
+    SemanticTokens,
+)
+from robotcode.language_server.common.text_document import TextDocument
+from robotcode.language_server.robotframework.protocol import (
+    RobotLanguageServerProtocol,
+)
+from robotcode.language_server.robotframework.server import RobotLanguageServer
+from robotcode.utils.async_event import CancelationToken
+
+__all__ = ["ScenarioResult", "generate_robot_file", "run_benchmark", "main"]
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    repeat: int
+    tokens: int
+    ms_per_request: float
+    tokens_per_second: float
+    peak_kib: Optional[float] = None
+
+
+def generate_robot_file(lines: int) -> str:
+    result = [
+        "*** Settings ***",
+        "Library    Collections",
+        "Documentation    Generated file with \\n escapes",
+        "",
+        "*** Variables ***",
+        "${VAR}    value",
+        "@{LIST}    a    b",
+        "",
+        "*** Test Cases ***",
+    ]
+
+    i = 0
+    while len(result) < lines:
+        result += [
+            f"Test {i}",
+            f"    [Documentation]    test ${{VAR}} number {i}",
+            "    Log    hello ${VAR} \\t world",
+            "    ${x}=    Set Variable    ${LIST}[0]",
+            "    BuiltIn.Log Many    @{LIST}",
+            "    FOR    ${i}    IN RANGE    10",
+            "        Should Be Equal    ${i}    ${i}",
+            "    END",
+            "    My Keyword    arg    # comment",
+            "",
+        ]
+        i += 1
+
+    result += [
+        "*** Keywords ***",
+        "My Keyword",
+        "    [Arguments]    ${a}",
+        "    Collections.Append To List    ${LIST}    ${a}",
+    ]
+
+    return "\n".join(result) + "\n"
+
+
+def _measure(name: str, repeat: int, trace_allocations: bool, func: Callable[[], Any]) -> ScenarioResult:
+    result = func()
+    tokens = len(result.data) // 5 if isinstance(result, SemanticTokens) else 0
+
+    begin = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    seconds = (time.perf_counter() - begin) / repeat
+
+    scenario = ScenarioResult(
+        name=name,
+        repeat=repeat,
+        tokens=tokens,
+        ms_per_request=seconds * 1000,
+        tokens_per_second=tokens / seconds if seconds > 0 else 0.0,
+    )
+
+    if trace_allocations:
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        scenario.peak_kib = peak / 1024
+
+    return scenario
+
+
+async def run_benchmark(lines: int = 10000, repeat: int = 5, trace_allocations: bool = True) -> List[ScenarioResult]:
+    server = RobotLanguageServer()
+    try:
+        protocol = RobotLanguageServerProtocol(server)
+        root_path = Path().resolve()
+        await protocol._initialize(ClientCapabilities(), root_path=str(root_path), root_uri=root_path.as_uri())
+        await protocol._initialized(InitializedParams())
+
+        document = TextDocument(
+            document_uri=(root_path / "bench_semantic_tokens.robot").as_uri(),
+            language_id="robotframework",
+            version=1,
+            text=generate_robot_file(lines),
+        )
+
+        part = protocol._robot_semantic_tokens
+        index = await part.get_token_index(document)
+        namespace = await protocol.documents_cache.get_namespace(document)
+        keywords = await namespace.get_keyword_lookup(part.collect_keyword_names(index))
+
+        line_count = len(document.lines)
+        viewport = Range(start=Position(line=line_count - 60, character=0), end=Position(line=line_count, character=0))
+
+        return [
+            _measure(
+                "full",
+                repeat,
+                trace_allocations,
+                lambda: part.collect(index, keywords, None, CancelationToken()),
+            ),
+            _measure(
+                "range (last 60 lines)",
+                repeat,
+                trace_allocations,
+                lambda: part.collect(index, keywords, viewport, CancelationToken()),
+            ),
+        ]
+    finally:
+        server.close()
+
+
+def _format_results(results: List[ScenarioResult]) -> str:
+    header = f"{'scenario':<22} {'tokens':>8} {'ms/request':>11} {'tokens/s':>11} {'peak KiB':>10}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        line = f"{r.name:<22} {r.tokens:>8} {r.ms_per_request:>11.2f} {r.tokens_per_second:>11.0f}"
+        line += f" {r.peak_kib:>10.1f}" if r.peak_kib is not None else f" {'-':>10}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="semantic tokens benchmark",
+        prog=__package__,
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--lines", default=10000, type=int, help="number of lines of the generated robot file")
+    parser.add_argument("--repeat", default=5, type=int, help="number of measured requests per scenario")
+    parser.add_argument("--no-allocations", action="store_true", help="do not trace allocations")
+    parser.add_argument("--json", default=None, metavar="FILE", help="writes the results as json to FILE")
+
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(args.lines, args.repeat, not args.no_allocations))
+
+    print(_format_results(results))
+
+    if args.json is not None:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([asdict(r) for r in results], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
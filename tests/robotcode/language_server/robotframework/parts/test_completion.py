@@ -0,0 +1,369 @@
+import gc
+from pathlib import Path
+from typing import Any, List, Optional
+
+import pytest
+
+from robotcode.language_server.common.lsp_types import (
+    CompletionContext,
+    CompletionItem,
+    CompletionItemKind,
+    CompletionList,
+    CompletionTriggerKind,
+    FileChangeType,
+    FileEvent,
+    MarkupContent,
+    Position,
+    Range,
+    TextEdit,
+)
+from robotcode.language_server.common.text_document import TextDocument
+from robotcode.language_server.robotframework.diagnostics.library_doc import (
+    CompleteResult,
+    KeywordDoc,
+)
+from robotcode.language_server.robotframework.diagnostics.namespace import Namespace
+from robotcode.language_server.robotframework.parts.completion import (
+    CompletionCollector,
+)
+from robotcode.language_server.robotframework.protocol import (
+    RobotLanguageServerProtocol,
+)
+from robotcode.language_server.robotframework.utils.completion_index import (
+    CompletionIndex,
+    CompletionResolveTable,
+    CompositeCompletionIndex,
+    fuzzy_score,
+    get_match_data,
+    normalize_name,
+)
+
+TEXT = """\
+*** Settings ***
+Library    Collections
+
+*** Test Cases ***
+first
+    Should Be
+    BuiltIn.Should Be
+    Log
+    Given shbeeq
+    col.appe
+"""
+
+
+def keyword_labels(result: CompletionList) -> List[str]:
+    return [i.label for i in result.items if i.sort_text is not None and i.sort_text.startswith("020_")]
+
+
+def edit_range(item: CompletionItem) -> Optional[Range]:
+    return item.text_edit.range if isinstance(item.text_edit, TextEdit) else None
+
+
+async def complete(
+    protocol: RobotLanguageServerProtocol, document: TextDocument, line: int, character: int
+) -> CompletionList:
+    result = await protocol._robot_completion.collect(
+        protocol.completion,
+        document,
+        Position(line=line, character=character),
+        CompletionContext(trigger_kind=CompletionTriggerKind.INVOKED),
+    )
+    assert isinstance(result, CompletionList)
+    return result
+
+
+def test_completion_index_should_find_items_by_normalized_prefix() -> None:
+    index = CompletionIndex(
+        (name, CompletionItem(label=name)) for name in ["Should Be Equal", "should_be_true", "Log", "Log Many", "Sleep"]
+    )
+
+    items, incomplete = index.find("Should Be", 10)
+    assert [i.label for i in items] == ["Should Be Equal", "should_be_true"]
+    assert not incomplete
+
+    items, incomplete = index.find("lo", 1)
+    assert [i.label for i in items] == ["Log"]
+    assert incomplete
+
+    assert index.find("unknown", 10) == ([], False)
+    assert len(index.find("", 10)[0]) == 5
+
+
+def test_get_match_data_should_find_word_starts() -> None:
+    assert get_match_data("Should Be_equal") == ("shouldbeequal", frozenset({0, 6, 8}))
+    assert get_match_data("Collections.appendToList") == ("collections.appendtolist", frozenset({0, 12, 18, 20}))
+
+
+def test_fuzzy_score_should_prefer_word_starts_and_consecutive_matches() -> None:
+    def score(query: str, name: str) -> int:
+        result = fuzzy_score(normalize_name(query), *get_match_data(name))
+        assert result is not None
+        return result
+
+    assert fuzzy_score("xyz", *get_match_data("Should Be Equal")) is None
+
+    assert score("shbe", "Should Be Equal") > score("shbe", "Should Not Be Equal")
+    assert score("log", "Log") > score("log", "Log Many") > score("log", "Catenate Logs")
+    assert score("sbe", "Should Be Equal") > score("sbe", "Subtract Date From Date")
+
+
+def test_completion_index_should_rank_fuzzy_matches() -> None:
+    index = CompletionIndex(
+        (name, CompletionItem(label=name))
+        for name in ["Should Not Be Equal", "Should Be Equal", "Set Suite Variable", "Log", "Should Be True"]
+    )
+
+    items, incomplete = index.find("shbeeq", 10)
+    assert [i.label for i in items] == ["Should Be Equal", "Should Not Be Equal"]
+    assert not incomplete
+
+    items, incomplete = index.find("sbe", 2)
+    assert [i.label for i in items] == ["Should Be Equal", "Should Be True"]
+    assert incomplete
+
+
+def test_composite_completion_index_should_rank_over_all_indexes_and_prefer_the_first_index() -> None:
+    def index(*names: str, detail: str) -> CompletionIndex:
+        return CompletionIndex(
+            (name, CompletionItem(label=name, kind=CompletionItemKind.FUNCTION, detail=detail)) for name in names
+        )
+
+    composite = CompositeCompletionIndex(
+        [
+            index("Log", "My Keyword", detail="own"),
+            index("Log", "Log Many", "Should Be Equal", detail="BuiltIn"),
+            index("log_many", "Append To List", detail="Collections"),
+        ]
+    )
+
+    items, incomplete = composite.find("log", 10)
+    assert [(i.label, i.detail) for i in items] == [("Log", "own"), ("Log Many", "BuiltIn")]
+    assert not incomplete
+
+    items, incomplete = composite.find("", 3)
+    assert [(i.label, i.detail) for i in items] == [
+        ("Append To List", "Collections"),
+        ("Log", "own"),
+        ("Log Many", "BuiltIn"),
+    ]
+    assert incomplete
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("protocol")
+async def test_keyword_completion_should_filter_by_the_typed_prefix(protocol: RobotLanguageServerProtocol) -> None:
+    document = TextDocument(
+        document_uri=Path("completion_prefix.robot").absolute().as_uri(),
+        language_id="robotframework",
+        version=1,
+        text=TEXT,
+    )
+
+    result = await complete(protocol, document, 5, 13)
+
+    labels = keyword_labels(result)
+    prefix_matches = [label for label in labels if normalize_name(label).startswith("shouldbe")]
+    assert "Should Be Equal" in prefix_matches
+    assert labels[: len(prefix_matches)] == prefix_matches
+    assert not result.is_incomplete
+    assert all(edit_range(i) == Range(Position(5, 4), Position(5, 13)) for i in result.items)
+
+    result = await complete(protocol, document, 6, 21)
+
+    labels = keyword_labels(result)
+    assert "Should Be Equal" in labels
+    keywords = [i for i in result.items if i.label in labels]
+    assert all(i.detail == "Keyword" for i in keywords)
+    assert all(edit_range(i) == Range(Position(6, 12), Position(6, 21)) for i in keywords)
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("protocol")
+async def test_keyword_completion_should_be_bounded_and_reuse_the_index(
+    protocol: RobotLanguageServerProtocol, monkeypatch: Any
+) -> None:
+    monkeypatch.setattr("robotcode.language_server.robotframework.parts.completion.MAX_KEYWORD_COMPLETION_ITEMS", 10)
+
+    document = TextDocument(
+        document_uri=Path("completion_bounded.robot").absolute().as_uri(),
+        language_id="robotframework",
+        version=1,
+        text=TEXT,
+    )
+
+    result = await complete(protocol, document, 7, 4)
+
+    assert result.is_incomplete
+    assert len([i for i in result.items if i.kind in [CompletionItemKind.FUNCTION, CompletionItemKind.MODULE]]) == 10
+
+    namespace = await protocol.documents_cache.get_namespace(document)
+    index = CompletionCollector._keyword_completion_indexes[namespace][(None, False)]
+
+    await complete(protocol, document, 7, 6)
+
+    assert CompletionCollector._keyword_completion_indexes[namespace][(None, False)] is index
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("protocol")
+async def test_keyword_completion_should_handle_bdd_prefixes_and_qualified_names(
+    protocol: RobotLanguageServerProtocol,
+) -> None:
+    document = TextDocument(
+        document_uri=Path("completion_fuzzy.robot").absolute().as_uri(),
+        language_id="robotframework",
+        version=1,
+        text=TEXT,
+    )
+
+    result = await complete(protocol, document, 8, 16)
+
+    keywords = [i for i in result.items if i.kind == CompletionItemKind.FUNCTION]
+    assert keywords[0].label == "Should Be Equal"
+    assert edit_range(keywords[0]) == Range(Position(8, 10), Position(8, 16))
+
+    result = await complete(protocol, document, 9, 12)
+
+    keywords = [i for i in result.items if i.kind == CompletionItemKind.FUNCTION]
+    assert keywords[0].label == "Append To List"
+    assert isinstance(keywords[0].text_edit, TextEdit)
+    assert keywords[0].text_edit.new_text == "Collections.Append To List"
+    assert keywords[0].text_edit.range == Range(Position(9, 4), Position(9, 12))
+
+
+def test_completion_resolve_table_should_memoize_markdown_while_the_doc_is_alive() -> None:
+    table = CompletionResolveTable()
+    calls: List[str] = []
+
+    def render(doc: KeywordDoc) -> str:
+        calls.append(doc.name)
+        return f"# {doc.name}"
+
+    doc = KeywordDoc(name="My Keyword")
+    key = table.add(doc, render)
+
+    assert table.add(doc, render) == key
+    assert table.get(key) is doc
+    assert table.get_markdown(key) == "# My Keyword"
+    assert table.get_markdown(key) == "# My Keyword"
+    assert calls == ["My Keyword"]
+
+    del doc
+    gc.collect()
+
+    assert table.get(key) is None
+    assert table.get_markdown(key) is None
+    assert len(table) == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("protocol")
+async def test_resolve_should_look_up_the_documentation_by_id(
+    protocol: RobotLanguageServerProtocol, monkeypatch: Any
+) -> None:
+    document = TextDocument(
+        document_uri=Path("completion_resolve.robot").absolute().as_uri(),
+        language_id="robotframework",
+        version=1,
+        text=TEXT,
+    )
+
+    result = await complete(protocol, document, 7, 4)
+
+    item = next(i for i in result.items if i.label == "Log")
+    library = next(i for i in result.items if i.label == "Collections")
+    assert item.documentation is None
+    assert library.documentation is None
+
+    async def get_keywords(*args: Any, **kwargs: Any) -> Any:
+        raise AssertionError("resolve should not search the keywords")
+
+    monkeypatch.setattr(Namespace, "get_keywords", get_keywords)
+
+    resolved = await protocol._robot_completion.resolve(protocol.completion, item)
+    assert isinstance(resolved.documentation, MarkupContent)
+    assert "Logs the given message" in resolved.documentation.value
+
+    resolved = await protocol._robot_completion.resolve(protocol.completion, library)
+    assert isinstance(resolved.documentation, MarkupContent)
+    assert "Collections" in resolved.documentation.value
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("protocol")
+async def test_import_completion_should_be_cached_until_importable_files_are_created_or_deleted(
+    protocol: RobotLanguageServerProtocol, tmp_path: Path
+) -> None:
+    document = TextDocument(
+        document_uri=Path("completion_import.robot").absolute().as_uri(),
+        language_id="robotframework",
+        version=1,
+        text=TEXT,
+    )
+    imports_manager = await protocol.documents_cache.get_imports_manager(document)
+
+    def labels(result: Optional[List[CompleteResult]]) -> List[str]:
+        return sorted(e.label for e in result or [])
+
+    async def changed(path: Path, type: FileChangeType) -> None:
+        await imports_manager.import_completion_files_changed(None, [FileEvent(uri=path.as_uri(), type=type)])
+
+    other_dir = tmp_path / "other"
+    other_dir.mkdir()
+    (tmp_path / "first.resource").write_text("")
+
+    first = await imports_manager.complete_resource_import("./", str(tmp_path))
+    assert labels(first) == ["first.resource", "other"]
+    other = await imports_manager.complete_resource_import("./", str(other_dir))
+    assert labels(other) == []
+
+    (tmp_path / "second.resource").write_text("")
+
+    assert await imports_manager.complete_resource_import("./", str(tmp_path)) is first
+
+    await changed(tmp_path / "second.resource", FileChangeType.CHANGED)
+    await changed(tmp_path / "output.xml", FileChangeType.CREATED)
+    await changed(tmp_path / "__pycache__" / "lib.cpython-38.pyc", FileChangeType.CREATED)
+    assert await imports_manager.complete_resource_import("./", str(tmp_path)) is first
+
+    await changed(tmp_path / "second.resource", FileChangeType.CREATED)
+
+    assert await imports_manager.complete_resource_import("./", str(other_dir)) is other
+    assert labels(await imports_manager.complete_resource_import("./", str(tmp_path))) == [
+        "first.resource",
+        "other",
+        "second.resource",
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("protocol")
+async def test_keyword_completion_should_reuse_the_library_indexes_after_an_edit(
+    protocol: RobotLanguageServerProtocol,
+) -> None:
+    document = TextDocument(
+        document_uri=Path("completion_edit.robot").absolute().as_uri(),
+        language_id="robotframework",
+        version=1,
+        text=TEXT,
+    )
+
+    await complete(protocol, document, 7, 4)
+
+    namespace = await protocol.documents_cache.get_namespace(document)
+    index = CompletionCollector._keyword_completion_indexes[namespace][(None, False)]
+    library_indexes = index.indexes[1:]
+    assert len(library_indexes) >= 2
+
+    await document.apply_full_change(2, TEXT + "\n*** Keywords ***\nMy New Keyword\n    No Operation\n")
+
+    await complete(protocol, document, 7, 6)
+
+    new_namespace = await protocol.documents_cache.get_namespace(document)
+    assert new_namespace is not namespace
+
+    new_index = CompletionCollector._keyword_completion_indexes[new_namespace][(None, False)]
+    assert "My New Keyword" in [i.label for i in new_index.indexes[0].items]
+    assert new_index.indexes[1:] == library_indexes
+    assert all(a is b for a, b in zip(new_index.indexes[1:], library_indexes))
@@ -0,0 +1,179 @@
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+
+from robotcode.language_server.common.lsp_types import (
+    Position,
+    Range,
+    SemanticTokenModifiers,
+    SemanticTokens,
+    SemanticTokensDelta,
+    SemanticTokensEdit,
+    SemanticTokenTypes,
+)
+from robotcode.language_server.common.parts.semantic_tokens import (
+    SemanticTokensEncoder,
+    semantic_tokens_edits,
+)
+from robotcode.language_server.common.text_document import TextDocument
+from robotcode.language_server.robotframework.parts.semantic_tokens import (
+    RobotSemTokenTypes,
+)
+from robotcode.language_server.robotframework.protocol import (
+    RobotLanguageServerProtocol,
+)
+
+TEXT = """\
+*** Test Cases ***
+first
+    Log    hello
+    No Operation
+
+second
+    Log    ${hello}
+"""
+
+
+def decode(data: List[int]) -> List[Tuple[int, ...]]:
+    result = []
+    line = col = 0
+    for i in range(0, len(data), 5):
+        line_delta, col_delta, *rest = data[i : i + 5]  # noqa: E203
+        col = col + col_delta if line_delta == 0 else col_delta
+        line += line_delta
+        result.append((line, col, *rest))
+    return result
+
+
+def apply_edits(data: List[int], edits: List[SemanticTokensEdit]) -> List[int]:
+    result = list(data)
+    for edit in sorted(edits, key=lambda e: e.start, reverse=True):
+        result[edit.start : edit.start + edit.delete_count] = edit.data or []  # noqa: E203
+    return result
+
+
+@pytest.mark.parametrize(
+    ("old", "new"),
+    [
+        ([1, 2, 3, 4, 5], [1, 2, 3, 4, 5]),
+        ([1, 2, 3, 4, 5], [1, 2, 9, 4, 5]),
+        ([1, 2, 3, 4, 5], [1, 2, 3, 4, 5, 6, 7]),
+        ([1, 2, 3, 4, 5], [0, 1, 2, 3, 4, 5]),
+        ([1, 2, 3, 4, 5], [1, 5]),
+        ([1, 1, 1], [1, 1]),
+        ([], [1, 2]),
+        ([1, 2], []),
+    ],
+)
+def test_semantic_tokens_edits_should_transform_old_into_new(old: List[int], new: List[int]) -> None:
+    edits = semantic_tokens_edits(old, new)
+
+    assert apply_edits(old, edits) == new
+    assert sum(len(e.data or []) for e in edits) <= len(new)
+    if old == new:
+        assert edits == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("protocol")
+async def test_full_delta_should_return_edits_to_the_previous_result(protocol: RobotLanguageServerProtocol) -> None:
+    part = protocol._robot_semantic_tokens
+    document = TextDocument(
+        document_uri=Path("semantic_tokens.robot").absolute().as_uri(),
+        language_id="robotframework",
+        version=1,
+        text=TEXT,
+    )
+
+    full = await part.collect_full(protocol.semantic_tokens, document)
+    assert isinstance(full, SemanticTokens)
+    assert full.result_id is not None
+
+    unchanged = await part.collect_full_delta(protocol.semantic_tokens, document, full.result_id)
+    assert unchanged == SemanticTokensDelta(edits=[], result_id=full.result_id)
+
+    await document.apply_full_change(2, TEXT.replace("    No Operation\n", "    No Operation\n    Log    again\n"))
+
+    delta = await part.collect_full_delta(protocol.semantic_tokens, document, full.result_id)
+    assert isinstance(delta, SemanticTokensDelta)
+    assert delta.result_id != full.result_id
+
+    new_full = await part.collect_full(protocol.semantic_tokens, document)
+    assert isinstance(new_full, SemanticTokens)
+    assert new_full.result_id == delta.result_id
+    assert apply_edits(full.data, delta.edits) == new_full.data
+    assert sum(len(e.data or []) for e in delta.edits) < len(new_full.data)
+
+    unknown = await part.collect_full_delta(protocol.semantic_tokens, document, "unknown")
+    assert unknown == new_full
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("protocol")
+async def test_builtin_keyword_calls_should_have_the_default_library_modifier(
+    protocol: RobotLanguageServerProtocol,
+) -> None:
+    part = protocol._robot_semantic_tokens
+    document = TextDocument(
+        document_uri=Path("semantic_tokens_builtin.robot").absolute().as_uri(),
+        language_id="robotframework",
+        version=1,
+        text=TEXT + "    Unknown Keyword\n",
+    )
+
+    result = await part.collect_threading(document, None)
+    assert isinstance(result, SemanticTokens)
+
+    token_types = protocol.semantic_tokens.token_types
+    default_library = 1 << protocol.semantic_tokens.token_modifiers.index(SemanticTokenModifiers.DEFAULT_LIBRARY)
+
+    keyword_calls_are_builtin = [
+        bool(result.data[i + 4] & default_library)
+        for i in range(0, len(result.data), 5)
+        if token_types[result.data[i + 3]] == RobotSemTokenTypes.KEYWORD
+    ]
+
+    assert keyword_calls_are_builtin == [True, True, True, False]
+
+
+def test_semantic_tokens_encoder_should_encode_relative_positions_and_modifier_masks() -> None:
+    encoder = SemanticTokensEncoder(
+        [SemanticTokenTypes.COMMENT, RobotSemTokenTypes.KEYWORD],
+        [SemanticTokenModifiers.DECLARATION, SemanticTokenModifiers.DEFAULT_LIBRARY],
+    )
+
+    encoder.add(1, 4, 3, RobotSemTokenTypes.KEYWORD, frozenset({SemanticTokenModifiers.DEFAULT_LIBRARY}))
+    encoder.add(1, 10, 5, SemanticTokenTypes.COMMENT)
+    encoder.add(1, 8, 1, SemanticTokenTypes.COMMENT)
+    encoder.add(3, 2, 4, RobotSemTokenTypes.KEYWORD, frozenset({SemanticTokenModifiers.DECLARATION}), 2)
+    encoder.add(2, 0, 1, SemanticTokenTypes.COMMENT)
+
+    assert encoder.data.typecode == "I"
+    assert encoder.data.tolist() == [1, 4, 3, 1, 2, 0, 6, 5, 0, 0, 2, 2, 4, 1, 3]
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("protocol")
+async def test_range_should_return_the_tokens_of_the_lines_in_range(protocol: RobotLanguageServerProtocol) -> None:
+    part = protocol._robot_semantic_tokens
+    document = TextDocument(
+        document_uri=Path("semantic_tokens_range.robot").absolute().as_uri(),
+        language_id="robotframework",
+        version=1,
+        text=TEXT * 3,
+    )
+
+    full = await part.collect_full(protocol.semantic_tokens, document)
+    assert isinstance(full, SemanticTokens)
+
+    for start, end in [(0, 0), (2, 5), (9, 11), (19, 30), (40, 50)]:
+        result = await part.collect_range(
+            protocol.semantic_tokens,
+            document,
+            Range(start=Position(line=start, character=0), end=Position(line=end, character=0)),
+        )
+        assert isinstance(result, SemanticTokens)
+
+        expected = [t for t in decode(full.data) if start <= t[0] < end]
+        assert decode(result.data) == expected
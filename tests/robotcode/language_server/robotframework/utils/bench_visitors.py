@@ -0,0 +1,166 @@
+"""
+Benchmark for the AST visitors of the robot language server.
+
+Generates a robot file with the given number of lines and compares the traversal of its model with the
+async generator based `walk` and `AsyncVisitor` against their synchronous equivalents, and measures the
+visitors of the namespace that were moved to the synchronous `Visitor`. Reports the time per run,
+nodes/sec and allocations.
+
+Run it from the repository root with::
+
+    python -m tests.robotcode.language_server.robotframework.utils.bench_visitors [--lines 10000]
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import asyncio
+import json
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, List, Optional
+
+from robot.parsing import get_model
+from robot.parsing.model.blocks import Keyword, TestCase
+
+from robotcode.language_server.robotframework.diagnostics.namespace import (
+    BlockVariableVisitor,
+    ImportVisitor,
+    VariablesVisitor,
+)
+from robotcode.language_server.robotframework.utils import async_ast, visitor
+
+from ..parts.bench_semantic_tokens import generate_robot_file
+
+__all__ = ["ScenarioResult", "run_benchmark", "main"]
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    repeat: int
+    nodes: int
+    ms_per_run: float
+    nodes_per_second: float
+    peak_kib: Optional[float] = None
+
+
+class _AsyncCounter(async_ast.AsyncVisitor):
+    def __init__(self) -> None:
+        self.count = 0
+
+    async def generic_visit(self, node: ast.AST) -> None:
+        self.count += 1
+        await super().generic_visit(node)
+
+
+class _Counter(visitor.Visitor):
+    def __init__(self) -> None:
+        self.count = 0
+
+    def generic_visit(self, node: ast.AST) -> None:
+        self.count += 1
+        super().generic_visit(node)
+
+
+async def _async_walk(model: ast.AST) -> None:
+    async for _ in async_ast.walk(model):
+        pass
+
+
+async def _async_visit(model: ast.AST) -> None:
+    await _AsyncCounter().visit(model)
+
+
+async def _sync(func: Callable[[], Any]) -> None:
+    func()
+
+
+async def _measure(
+    name: str, nodes: int, repeat: int, trace_allocations: bool, func: Callable[[], Awaitable[Any]]
+) -> ScenarioResult:
+    await func()
+
+    begin = time.perf_counter()
+    for _ in range(repeat):
+        await func()
+    seconds = (time.perf_counter() - begin) / repeat
+
+    scenario = ScenarioResult(
+        name=name,
+        repeat=repeat,
+        nodes=nodes,
+        ms_per_run=seconds * 1000,
+        nodes_per_second=nodes / seconds if seconds > 0 else 0.0,
+    )
+
+    if trace_allocations:
+        tracemalloc.start()
+        try:
+            await func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        scenario.peak_kib = peak / 1024
+
+    return scenario
+
+
+async def run_benchmark(lines: int = 10000, repeat: int = 5, trace_allocations: bool = True) -> List[ScenarioResult]:
+    model = get_model(generate_robot_file(lines), data_only=False, curdir=".")
+    nodes = sum(1 for _ in visitor.walk(model))
+    blocks = [n for n in visitor.walk(model) if isinstance(n, (Keyword, TestCase))]
+
+    def block_variables() -> None:
+        for block in blocks:
+            BlockVariableVisitor().get("bench.robot", block)
+
+    scenarios: List[Any] = [
+        ("async walk", lambda: _async_walk(model)),
+        ("walk", lambda: _sync(lambda: list(visitor.walk(model)))),
+        ("AsyncVisitor", lambda: _async_visit(model)),
+        ("Visitor", lambda: _sync(lambda: _Counter().visit(model))),
+        ("ImportVisitor", lambda: _sync(lambda: ImportVisitor().get("bench.robot", model))),
+        ("VariablesVisitor", lambda: _sync(lambda: VariablesVisitor().get("bench.robot", model))),
+        ("BlockVariableVisitor", lambda: _sync(block_variables)),
+    ]
+
+    return [await _measure(name, nodes, repeat, trace_allocations, func) for name, func in scenarios]
+
+
+def _format_results(results: List[ScenarioResult]) -> str:
+    header = f"{'scenario':<22} {'nodes':>8} {'ms/run':>11} {'nodes/s':>11} {'peak KiB':>10}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        line = f"{r.name:<22} {r.nodes:>8} {r.ms_per_run:>11.2f} {r.nodes_per_second:>11.0f}"
+        line += f" {r.peak_kib:>10.1f}" if r.peak_kib is not None else f" {'-':>10}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="AST visitors benchmark",
+        prog=__package__,
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--lines", default=10000, type=int, help="number of lines of the generated robot file")
+    parser.add_argument("--repeat", default=5, type=int, help="number of measured runs per scenario")
+    parser.add_argument("--no-allocations", action="store_true", help="do not trace allocations")
+    parser.add_argument("--json", default=None, metavar="FILE", help="writes the results as json to FILE")
+
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(args.lines, args.repeat, not args.no_allocations))
+
+    print(_format_results(results))
+
+    if args.json is not None:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([asdict(r) for r in results], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import ast
+from typing import List
+
+import pytest
+from robot.parsing import get_model
+
+from robotcode.language_server.common.lsp_types import Position
+from robotcode.language_server.robotframework.utils.ast import (
+    get_nodes_at_position,
+    get_position_index,
+    range_from_node,
+)
+from robotcode.language_server.robotframework.utils.async_ast import walk
+
+TEXT = """\
+*** Settings ***
+Library    Collections
+
+*** Test Cases ***
+first
+    Log    hello
+    FOR    ${i}    IN RANGE    10
+        Should Be Equal    ${i}    ${i}
+    END
+
+*** Keywords ***
+My Keyword
+    [Arguments]    ${a}
+    Log    ${a}
+"""
+
+
+async def walk_nodes_at_position(model: ast.AST, position: Position) -> List[ast.AST]:
+    return [n async for n in walk(model) if position.is_in_range(r := range_from_node(n)) or r.end == position]
+
+
+@pytest.mark.asyncio
+async def test_get_nodes_at_position_should_return_the_nodes_of_a_full_walk() -> None:
+    model = get_model(TEXT, data_only=False, curdir=".")
+
+    for line in range(len(TEXT.splitlines()) + 2):
+        for character in range(0, 40, 3):
+            position = Position(line=line, character=character)
+            assert await get_nodes_at_position(model, position) == await walk_nodes_at_position(model, position)
+
+    assert get_position_index(model) is get_position_index(model)
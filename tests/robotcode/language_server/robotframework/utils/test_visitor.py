@@ -0,0 +1,94 @@
+import ast
+import asyncio
+from typing import List
+
+import pytest
+from robot.parsing import get_model
+
+from robotcode.language_server.robotframework.utils import async_ast, visitor
+
+TEXT = """\
+*** Settings ***
+Library    Collections
+
+*** Test Cases ***
+first
+    Log    hello
+    FOR    ${i}    IN RANGE    10
+        Should Be Equal    ${i}    ${i}
+    END
+
+*** Keywords ***
+My Keyword
+    [Arguments]    ${a}
+    Log    ${a}
+"""
+
+
+@pytest.mark.asyncio
+async def test_walk_should_return_the_nodes_of_the_async_walk() -> None:
+    model = get_model(TEXT, data_only=False, curdir=".")
+
+    assert list(visitor.walk(model)) == [n async for n in async_ast.walk(model)]
+    assert list(visitor.walk(model)) == [n async for n in async_ast.walk(model, yield_every=3)]
+
+
+@pytest.mark.asyncio
+async def test_visitor_should_visit_the_same_nodes_as_the_async_visitor() -> None:
+    model = get_model(TEXT, data_only=False, curdir=".")
+
+    class Visitor(visitor.Visitor):
+        def __init__(self) -> None:
+            self.visited: List[str] = []
+
+        def visit_Statement(self, node: ast.AST) -> None:  # noqa: N802
+            self.visited.append(type(node).__name__)
+
+        def visit_Keyword(self, node: ast.AST) -> None:  # noqa: N802
+            self.visited.append("keyword")
+
+    class AsyncVisitor(async_ast.AsyncVisitor):
+        yield_every = 2
+
+        def __init__(self) -> None:
+            self.visited: List[str] = []
+
+        async def visit_Statement(self, node: ast.AST) -> None:  # noqa: N802
+            self.visited.append(type(node).__name__)
+
+        async def visit_Keyword(self, node: ast.AST) -> None:  # noqa: N802
+            self.visited.append("keyword")
+
+    sync_visitor = Visitor()
+    sync_visitor.visit(model)
+
+    async_visitor = AsyncVisitor()
+    await async_visitor.visit(model)
+
+    assert sync_visitor.visited == async_visitor.visited
+    assert sync_visitor.visited[-1] == "keyword"
+    assert "KeywordCall" in sync_visitor.visited
+
+
+@pytest.mark.asyncio
+async def test_async_visitor_should_yield_to_the_event_loop() -> None:
+    model = get_model(TEXT, data_only=False, curdir=".")
+    ticks = 0
+
+    async def tick() -> None:
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    class AsyncVisitor(async_ast.AsyncVisitor):
+        yield_every = 2
+
+    task = asyncio.ensure_future(tick())
+    try:
+        await asyncio.sleep(0)
+        before = ticks
+        await AsyncVisitor().visit(model)
+        assert ticks > before
+    finally:
+        task.cancel()
@@ -41,6 +41,12 @@ interface RobotLogMessageEvent {
   html: string;
 }
 
+interface RobotEnqueuedEvent {
+  root: string | null | undefined;
+  names: string[];
+  parents: number[];
+}
+
 export class TestControllerManager {
   private _disposables: vscode.Disposable;
   public readonly testController: vscode.TestController;
@@ -120,29 +126,7 @@ export class TestControllerManager {
 
       vscode.debug.onDidReceiveDebugSessionCustomEvent(async (event) => {
         if (event.session.configuration.type === "robotcode") {
-          switch (event.event) {
-            case "robotExited": {
-              this.TestRunExited(event.session.configuration.runId);
-              break;
-            }
-
-            case "robotStarted": {
-              this.OnRobotStartedEvent(event.session.configuration.runId, event.body as RobotExecutionEvent);
-              break;
-            }
-            case "robotEnded": {
-              this.OnRobotEndedEvent(event.session.configuration.runId, event.body as RobotExecutionEvent);
-              break;
-            }
-            case "robotEnqueued": {
-              this.TestItemEnqueued(event.session.configuration.runId, event.body?.items);
-              break;
-            }
-            case "robotLog": {
-              this.OnRobotLogMessageEvent(event.session.configuration.runId, event.body as RobotLogMessageEvent);
-              break;
-            }
-          }
+          this.OnRobotEvent(event.session.configuration.runId, event.event, event.body);
         }
       }),
       vscode.commands.registerCommand("robotcode.runCurrentFile", (...args) => {
@@ -154,6 +138,38 @@ export class TestControllerManager {
     );
   }
 
+  // eslint-disable-next-line @typescript-eslint/no-explicit-any
+  private OnRobotEvent(runId: string | undefined, event: string, body?: any) {
+    switch (event) {
+      case "robotExited": {
+        this.TestRunExited(runId);
+        break;
+      }
+      case "robotStarted": {
+        this.OnRobotStartedEvent(runId, body as RobotExecutionEvent);
+        break;
+      }
+      case "robotEnded": {
+        this.OnRobotEndedEvent(runId, body as RobotExecutionEvent);
+        break;
+      }
+      case "robotEnqueued": {
+        this.TestItemEnqueued(runId, body as RobotEnqueuedEvent);
+        break;
+      }
+      case "robotLog": {
+        this.OnRobotLogMessageEvent(runId, body as RobotLogMessageEvent);
+        break;
+      }
+      case "robotEvents": {
+        for (const e of (body?.events ?? []) as { event: string; body?: unknown }[]) {
+          this.OnRobotEvent(runId, e.event, e.body);
+        }
+        break;
+      }
+    }
+  }
+
   private removeWorkspaceFolderItems(folder: vscode.WorkspaceFolder, deleteTestItems: boolean) {
     if (this.robotTestItems.has(folder)) {
       const robotItems = this.robotTestItems.get(folder);
@@ -467,13 +483,22 @@ export class TestControllerManager {
     }
   }
 
-  private async TestItemEnqueued(runId: string | undefined, items: string[] | undefined) {
-    if (runId === undefined || items === undefined) return;
+  private async TestItemEnqueued(runId: string | undefined, event: RobotEnqueuedEvent | undefined) {
+    if (runId === undefined || event?.names === undefined) return;
 
     const run = this.testRuns.get(runId);
 
     if (run !== undefined) {
-      for (const id of items) {
+      const ids: string[] = [];
+
+      event.names.forEach((name, i) => {
+        const parent = event.parents[i];
+        const prefix = parent >= 0 ? ids[parent] : event.root;
+
+        ids.push(prefix ? `${prefix}.${name}` : name);
+      });
+
+      for (const id of ids) {
         const item = this.findTestItemById(id);
         if (item !== undefined) {
           run.enqueued(item);